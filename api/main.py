@@ -1,16 +1,29 @@
 from typing import Any, Dict, List, Optional, Literal, Set
 from datetime import datetime, timezone
+import asyncio
 from pathlib import Path
 import difflib
 import yaml
 
 from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import desc, func, select
 from pydantic import BaseModel, Field, field_validator
 
 from core.models import IncidentInput, TimeRange, RCAReport
 from core.environment import canonicalize_environment
-from core.orchestrator import run, run_incident, _now_rfc3339, _shift_rfc3339
+from core.orchestrator import (
+    arun,
+    arun_alerts,
+    grouped_reports,
+    is_grouped_webhook,
+    parse_webhook,
+    run_incident,
+    run_webhook,
+    warm_up,
+    _now_rfc3339,
+    _shift_rfc3339,
+)
 from core.persistence import (
     bootstrap,
     create_action_execution,
@@ -20,14 +33,19 @@ from core.persistence import (
     update_action_status,
 )
 from core.db import get_db
+from core.intake import enqueue as enqueue_webhook, get_status as get_intake_status, start_worker as start_intake_worker
 from core.persistence_models import ActionExecution, AuditEvent, EvidenceItem, Incident, IncidentReport
-from core.kb import KB
+from core.kb import KB, kb_cache_clear
+from core.registry import clear_shared_registries
 from core.config import settings
+from core.tracing import TOOL_LATENCY
 from core.onboarding_agent import apply_ops as apply_onboarding_ops
 from core.onboarding_agent import plan_ops as plan_onboarding_ops
 
 app = FastAPI(title="RCA Investigation Agent")
 LAST_REPORT: Optional[RCAReport] = None
+# Caps concurrent investigations (and therefore concurrent LLM calls) from /webhook.
+INCIDENT_SLOTS = asyncio.Semaphore(settings.max_concurrent_incidents)
 
 
 def _demo_incidents() -> List[Dict[str, Any]]:
@@ -128,6 +146,11 @@ def health():
     return {"ok": True}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(TOOL_LATENCY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/ui/mode")
 def ui_mode():
     return {"live_mode": settings.live_mode}
@@ -136,11 +159,40 @@ def ui_mode():
 @app.on_event("startup")
 def _startup():
     bootstrap()
+    start_intake_worker(lambda payload: run_webhook(payload))
+
+@app.on_event("startup")
+async def _warm_up_llm():
+    # Runs in the background so a slow or unreachable LLM endpoint never delays boot.
+    app.state.warm_up_task = asyncio.create_task(warm_up())
 
 @app.post("/webhook")
 async def webhook(req: Request):
-    payload = await req.json()
-    return run(payload)
+    try:
+        payload = parse_webhook(await req.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid webhook body: {exc}") from exc
+    # With persistence enabled the payload is stored and acknowledged immediately;
+    # the intake worker runs the investigation. Otherwise run inline as before.
+    # A grouped webhook (several alerts) gets one RCA per alert: {"reports": [...]}, see grouped_reports.
+    intake_id = enqueue_webhook(payload)
+    if intake_id is None:
+        if is_grouped_webhook(payload):
+            # Each alert takes its own incident slot, so a large group cannot exceed the server-wide cap.
+            return grouped_reports(await arun_alerts(payload, semaphore=INCIDENT_SLOTS))
+        async with INCIDENT_SLOTS:
+            return await arun(payload)
+    return {"id": intake_id, "status": "queued"}
+
+
+@app.get("/webhook/intake/{intake_id}")
+def webhook_intake_status(intake_id: str):
+    if not persistence_enabled():
+        raise HTTPException(status_code=503, detail="Persistence disabled. Set ENABLE_PERSISTENCE and DATABASE_URL.")
+    status = get_intake_status(intake_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Webhook intake not found")
+    return status
 
 
 class IncidentWebhookRequest(BaseModel):
@@ -186,7 +238,7 @@ def webhook_incident(payload: IncidentWebhookRequest):
     except Exception:
         LAST_REPORT = None
     if LAST_REPORT:
-        save_report(incident, LAST_REPORT)
+        save_report(incident, LAST_REPORT, report_dump=report_dict)
     return report_dict
 
 
@@ -1069,6 +1121,8 @@ def knowledge_onboarding_apply(payload: OnboardingYamlRequest):
     kb_backup.write_text(kb_path.read_text())
     catalog_path.write_text(payload.catalog_yaml)
     kb_path.write_text(payload.kb_yaml)
+    kb_cache_clear()
+    clear_shared_registries()
 
     return {
         "ok": True,
@@ -1099,6 +1153,8 @@ def knowledge_onboarding_model_apply(payload: OnboardingModelRequest):
     kb_backup.write_text(kb_path.read_text())
     catalog_path.write_text(yamls["catalog"])
     kb_path.write_text(yamls["kb"])
+    kb_cache_clear()
+    clear_shared_registries()
 
     return {
         "ok": True,
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after `ttl_seconds`.
+    Used for short-lived memoization of provider reads; not a general-purpose store.
+    """
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteTTLCache:
+    """
+    File-backed TTL cache for JSON-serializable values, shared by every process that opens the
+    same path (API workers, scripts/replay_incidents.py). Each operation uses its own short-lived
+    connection, so instances are safe across threads and forks.
+    """
+    # Expired rows are never returned; they are deleted at most this often, not on every write.
+    PURGE_INTERVAL_SECONDS = 60.0
+
+    def __init__(self, path: str, ttl_seconds: float = 3600.0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._next_purge = 0.0
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, expires_at REAL, value TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT expires_at, value FROM cache WHERE key = ?", (key,)).fetchone()
+        # Wall-clock expiry: monotonic time is not comparable across processes.
+        if row is None or row[0] <= time.time():
+            return default
+        return json.loads(row[1])
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, now + ttl, json.dumps(value, separators=(",", ":"))),
+            )
+            if now >= self._next_purge:
+                self._next_purge = now + self.PURGE_INTERVAL_SECONDS
+                conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return value
+
+
+def request_key(*parts: Any) -> str:
+    """Stable hash of call arguments; pydantic requests are hashed by their JSON dump."""
+    raw = json.dumps([_canonical(p) for p in parts], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
@@ -6,9 +6,18 @@ class Settings(BaseSettings):
 
     openai_api_key: str
     openai_model: str = "gpt-4.1-mini"
+    openai_mode: str = "online"  # online|batch; batch routes LLM calls of offline runs (run_incidents_offline) through the Batch API
+    openai_batch_flush_seconds: float = 2.0
+    openai_batch_poll_seconds: float = 30.0
+    openai_batch_max_wait_seconds: float = 1800.0  # a batch job still running after this is cancelled and its calls are sent online
+    llm_cache_enabled: bool = False
+    llm_cache_ttl_seconds: float = 3600.0
+    llm_cache_path: str | None = None  # SQLite file shared by processes; the in-memory cache is per process
+    tool_timeout_seconds: float = 30.0  # per collection round; a KB subject can override with tool_timeout_seconds
     kb_path: str = "./kb/subjects.yaml"
     catalog_path: str = "./catalog/instances.yaml"
     enable_persistence: bool = False
+    max_concurrent_incidents: int = 32
     trace_file: str | None = None
     database_url: str | None = None
     live_mode: bool = False
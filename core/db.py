@@ -8,6 +8,11 @@ from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from core.config import settings
 
+try:  # optional faster codec for JSONB columns (report blobs, evidence samples); falls back to the driver default
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Base(DeclarativeBase):
     pass
@@ -19,10 +24,18 @@ def _normalize_db_url(url: str) -> str:
     return url
 
 
+def _orjson_dumps(value) -> str:
+    # Non-str keys are stringified as json.dumps does.
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
 def _make_engine():
     if not settings.database_url:
         return None
-    return create_engine(_normalize_db_url(settings.database_url), pool_pre_ping=True)
+    json_codec = {}
+    if orjson is not None:
+        json_codec = {"json_serializer": _orjson_dumps, "json_deserializer": orjson.loads}
+    return create_engine(_normalize_db_url(settings.database_url), pool_pre_ping=True, **json_codec)
 
 
 ENGINE = None
@@ -36,7 +49,7 @@ def init_db() -> None:
     if ENGINE is None:
         return
     if SessionLocal is None:
-        SessionLocal = sessionmaker(bind=ENGINE, autoflush=False, autocommit=False)
+        SessionLocal = sessionmaker(bind=ENGINE, autoflush=False, autocommit=False, expire_on_commit=False)
     from core import persistence_models  # noqa: F401
 
     Base.metadata.create_all(bind=ENGINE)
@@ -50,7 +63,7 @@ def get_db() -> Generator:
     if ENGINE is None:
         raise RuntimeError("database_url is not configured")
     if SessionLocal is None:
-        SessionLocal = sessionmaker(bind=ENGINE, autoflush=False, autocommit=False)
+        SessionLocal = sessionmaker(bind=ENGINE, autoflush=False, autocommit=False, expire_on_commit=False)
     db = SessionLocal()
     try:
         yield db
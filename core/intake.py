@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select
+
+from core.config import settings
+from core.db import get_db
+from core.persistence import persistence_enabled
+from core.persistence_models import WebhookIntake
+from core.tracing import get_tracer
+
+MAX_ATTEMPTS = 5
+POLL_INTERVAL_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 300
+# A claimed row is leased to its worker until next_attempt_at; if the worker dies (or cannot record
+# the outcome) before then, the row becomes claimable again once the lease runs out.
+LEASE_SECONDS = 900
+
+TRACER = get_tracer(settings.trace_file)
+
+_worker: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Durably records a webhook payload for background processing.
+    Returns the intake id, or None when persistence is disabled (callers then run inline).
+    """
+    if not persistence_enabled():
+        return None
+    with get_db() as db:
+        row = WebhookIntake(payload=payload, status="queued", attempts=0)
+        db.add(row)
+        db.flush()
+        return row.id
+
+
+def claim_next() -> Optional[Tuple[str, Dict[str, Any]]]:
+    now = _utcnow()
+    with get_db() as db:
+        stmt = (
+            select(WebhookIntake)
+            .where(WebhookIntake.status.in_(("queued", "processing")), WebhookIntake.next_attempt_at <= now)
+            .order_by(WebhookIntake.received_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        while True:
+            row = db.execute(stmt).scalars().first()
+            if not row:
+                return None
+            row.updated_at = now
+            if row.status == "processing" and (row.attempts or 0) >= MAX_ATTEMPTS:
+                # The last allowed attempt never reported back; stop reclaiming it and look at the
+                # next row, so a dead lease doesn't cost the worker a poll interval.
+                row.status = "failed"
+                row.last_error = "lease expired"
+                db.flush()
+                continue
+            row.status = "processing"
+            row.attempts = (row.attempts or 0) + 1
+            row.next_attempt_at = now + timedelta(seconds=LEASE_SECONDS)
+            return row.id, dict(row.payload or {})
+
+
+def mark_done(intake_id: str, result: Dict[str, Any]) -> None:
+    with get_db() as db:
+        row = db.get(WebhookIntake, intake_id)
+        if not row:
+            return
+        row.status = "done"
+        row.result = result
+        row.last_error = None
+        row.updated_at = _utcnow()
+
+
+def mark_failed(intake_id: str, error: str) -> None:
+    with get_db() as db:
+        row = db.get(WebhookIntake, intake_id)
+        if not row:
+            return
+        attempts = row.attempts or 0
+        row.last_error = error
+        row.updated_at = _utcnow()
+        if attempts >= MAX_ATTEMPTS:
+            row.status = "failed"
+            return
+        # Exponential backoff before the row becomes claimable again.
+        delay = min(MAX_BACKOFF_SECONDS, 2 ** attempts)
+        row.status = "queued"
+        row.next_attempt_at = _utcnow() + timedelta(seconds=delay)
+
+
+def get_status(intake_id: str) -> Optional[Dict[str, Any]]:
+    with get_db() as db:
+        row = db.get(WebhookIntake, intake_id)
+        if not row:
+            return None
+        return {
+            "id": row.id,
+            "status": row.status,
+            "attempts": row.attempts,
+            "last_error": row.last_error,
+            "result": row.result,
+        }
+
+
+def process_one(handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> bool:
+    """Claims and processes a single queued payload. Returns False when the queue is empty."""
+    claimed = claim_next()
+    if not claimed:
+        return False
+    intake_id, payload = claimed
+    try:
+        result = handler(payload)
+    except Exception as exc:
+        mark_failed(intake_id, str(exc))
+    else:
+        mark_done(intake_id, result)
+    return True
+
+
+def _run_worker(handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> None:
+    while not _stop.is_set():
+        try:
+            if process_one(handler):
+                continue
+        except Exception as exc:
+            # e.g. the database is unreachable; a claimed row is retried once its lease expires.
+            TRACER.emit({"event": "intake_worker_error", "error": f"{type(exc).__name__}: {exc}"})
+        _stop.wait(POLL_INTERVAL_SECONDS)
+
+
+def start_worker(handler: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Optional[threading.Thread]:
+    global _worker
+    if not persistence_enabled():
+        return None
+    if _worker is not None and _worker.is_alive():
+        return _worker
+    _stop.clear()
+    _worker = threading.Thread(target=_run_worker, args=(handler,), name="webhook-intake", daemon=True)
+    _worker.start()
+    return _worker
+
+
+def stop_worker() -> None:
+    global _worker
+    _stop.set()
+    if _worker is not None:
+        _worker.join(timeout=5)
+    _worker = None
@@ -1,7 +1,9 @@
 from __future__ import annotations
+import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import yaml
 from core.environment import canonicalize_environment
 
@@ -16,6 +18,14 @@ class KB:
             raise ValueError("KB YAML must be a mapping/object at top level.")
         return KB(raw=data)
 
+    @staticmethod
+    def load_cached(path: str) -> "KB":
+        """
+        Like load(), but reuses the parsed file until its mtime or size changes.
+        Callers must treat the result as read-only.
+        """
+        return _load_kb(path, *_file_version(path))
+
     def get_subject_config(self, subject: str, environment: str) -> Dict[str, Any]:
         """
         Returns the subject block, plus resolved bindings and provider instance ids.
@@ -68,3 +78,26 @@ class KB:
         if not out:
             raise ValueError(f"No providers found in catalog: {path}")
         return out
+
+    @staticmethod
+    def load_providers_cached(path: str) -> Dict[str, Any]:
+        """Like load_providers(), cached on the catalog file's mtime and size. Read-only."""
+        return _load_providers(path, *_file_version(path))
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+@lru_cache(maxsize=4)
+def _load_kb(path: str, mtime_ns: int, size: int) -> KB:
+    return KB.load(path)
+
+@lru_cache(maxsize=4)
+def _load_providers(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    return KB.load_providers(path)
+
+def kb_cache_clear() -> None:
+    """Drops cached KB and catalog parses (used after the onboarding endpoints rewrite them)."""
+    _load_kb.cache_clear()
+    _load_providers.cache_clear()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchDispatcher:
+    """
+    Groups chat-completion requests from concurrent callers into OpenAI Batch API jobs.
+
+    Requests submitted within `flush_seconds` of each other (or until `max_batch` is reached)
+    are written to one JSONL file, uploaded with purpose="batch", and polled until the job
+    finishes. Each caller blocks only on its own future, resolved from the output file by
+    `custom_id`. Intended for non-interactive flows (backlog replay, re-RCA); batch jobs can
+    take up to the completion window to finish. With `max_wait_seconds` a job still running after
+    that long is cancelled and its callers get a TimeoutError.
+    """
+    def __init__(
+        self,
+        client: Any,
+        flush_seconds: float = 2.0,
+        max_batch: int = 500,
+        poll_seconds: float = 30.0,
+        completion_window: str = "24h",
+        max_wait_seconds: Optional[float] = None,
+    ):
+        self._client = client
+        self._flush_seconds = flush_seconds
+        self._max_batch = max_batch
+        self._poll_seconds = poll_seconds
+        self._completion_window = completion_window
+        self._max_wait_seconds = max_wait_seconds
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Dict[str, Any], Future]] = []
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, custom_id: str, body: Dict[str, Any]) -> Future:
+        future: Future = Future()
+        full: List[Tuple[str, Dict[str, Any], Future]] = []
+        with self._lock:
+            self._pending.append((custom_id, body, future))
+            if len(self._pending) >= self._max_batch:
+                full = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            threading.Thread(target=self._run, args=(full,), daemon=True).start()
+        return future
+
+    def submit_and_wait(self, custom_id: str, body: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.submit(custom_id, body).result(timeout=timeout)
+
+    def flush(self) -> None:
+        with self._lock:
+            items = self._take_pending()
+        if items:
+            self._run(items)
+
+    def _take_pending(self) -> List[Tuple[str, Dict[str, Any], Future]]:
+        items, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return items
+
+    def _run(self, items: List[Tuple[str, Dict[str, Any], Future]]) -> None:
+        try:
+            records, status = self._execute(items)
+        except Exception as exc:
+            for _, _, future in items:
+                future.set_exception(exc)
+            return
+
+        for custom_id, _, future in items:
+            record = records.get(custom_id) or {}
+            response = record.get("response") or {}
+            if response.get("status_code") == 200 and response.get("body"):
+                future.set_result(response["body"])
+            else:
+                error = record.get("error") or response.get("body") or f"batch {status}"
+                future.set_exception(RuntimeError(f"Batch request '{custom_id}' failed: {error}"))
+
+    def _execute(self, items: List[Tuple[str, Dict[str, Any], Future]]) -> Tuple[Dict[str, Dict[str, Any]], str]:
+        lines = [
+            json.dumps({"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body})
+            for custom_id, body, _ in items
+        ]
+        upload = self._client.files.create(file=("requests.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self._completion_window,
+        )
+        deadline = None if self._max_wait_seconds is None else time.monotonic() + self._max_wait_seconds
+        while batch.status not in TERMINAL_STATUSES:
+            if deadline is not None and time.monotonic() >= deadline:
+                try:
+                    self._client.batches.cancel(batch.id)
+                except Exception:
+                    pass
+                raise TimeoutError(f"Batch '{batch.id}' did not finish within {self._max_wait_seconds}s")
+            time.sleep(self._poll_seconds)
+            batch = self._client.batches.retrieve(batch.id)
+
+        records: Dict[str, Dict[str, Any]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self._client.files.content(file_id).text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    records[record.get("custom_id")] = record
+        return records, batch.status
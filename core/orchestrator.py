@@ -1,12 +1,26 @@
 from __future__ import annotations
+import asyncio
+import hashlib
+import importlib.util
 import json
+import operator
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from functools import lru_cache
+from typing import Annotated, Any, Callable, Dict, List, Optional, Tuple, TypedDict
 
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from openai.types.chat import ChatCompletion
+from core.cache import SQLiteTTLCache, TTLCache, request_key
 from core.config import settings
 from core.models import (
     AgentState, IncidentInput, EvidenceItem, Hypothesis, RCAReport,
@@ -15,123 +29,296 @@ from core.models import (
     AlertQueryRequest, EventQueryRequest, K8sLogQueryRequest
 )
 from core.environment import canonicalize_environment
-from core.prompts import SYSTEM_PROMPT, HYPOTHESIS_TASK, PLAN_TASK, EVIDENCE_TOOL_SYSTEM
+from core.llm_batch import BatchDispatcher
+from core.prompts import SYSTEM_PROMPT, HYPOTHESIS_TASK, COLLECT_TASK, EVIDENCE_TOOL_SYSTEM
 from core.scoring import rank
-from core.tracing import get_tracer
+from core.tracing import TOOL_LATENCY, get_tracer
+
+try:  # optional C parser for RFC3339 timestamps; the stdlib path below is the fallback
+    from ciso8601 import parse_datetime as _c_parse_datetime
+except ImportError:
+    _c_parse_datetime = None
+
+try:  # optional faster JSON codec for webhook bodies, tool-call arguments and prompt payloads; orjson's decode error subclasses json's
+    from orjson import OPT_NON_STR_KEYS, dumps as _orjson_dumps, loads as _json_loads
+except ImportError:
+    _orjson_dumps = None
+    _json_loads = json.loads
+
+# Shared by both LLM clients. Idle connections are kept for a minute (httpx defaults to 5s), so
+# incidents arriving in bursts a few seconds apart reuse the TLS session instead of reconnecting.
+_LLM_HTTP2 = importlib.util.find_spec("h2") is not None
+_LLM_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60.0)
+_LLM_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+def _make_openai_client() -> OpenAI:
+    # One pooled client for all LLM calls; HTTP/2 is used when the optional h2 package is installed.
+    http_client = httpx.Client(
+        http2=_LLM_HTTP2,
+        limits=_LLM_LIMITS,
+        timeout=_LLM_TIMEOUT,
+    )
+    return OpenAI(api_key=settings.openai_api_key, http_client=http_client)
+
+def _make_async_openai_client() -> AsyncOpenAI:
+    # Used by the async graph (arun): many incidents share one event loop and one connection pool.
+    http_client = httpx.AsyncClient(
+        http2=_LLM_HTTP2,
+        limits=_LLM_LIMITS,
+        timeout=_LLM_TIMEOUT,
+    )
+    return AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
 
-client = OpenAI(api_key=settings.openai_api_key)
+client = _make_openai_client()
+aclient = _make_async_openai_client()
 TRACER = get_tracer(settings.trace_file)
 
 CONFIDENCE_THRESHOLD = 0.62
 MAX_ITERATIONS = 2
 
+# Structured-output schema for hypothesize (strict mode: every property required, no extras).
+HYPOTHESES_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "additionalProperties": False,
+    "properties": {
+        "hypotheses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "id": {"type": "string"},
+                    "statement": {"type": "string"},
+                    "supporting_evidence_ids": {"type": "array", "items": {"type": "string"}},
+                    "contradictions": {"type": "array", "items": {"type": "string"}},
+                    "validations": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["id", "statement", "supporting_evidence_ids", "contradictions", "validations"],
+            },
+        }
+    },
+    "required": ["hypotheses"],
+}
+
 def _now_rfc3339() -> str:
     return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
-def _shift_rfc3339(rfc3339: str, minutes: int) -> str:
-    dt = datetime.fromisoformat(rfc3339.replace("Z", "+00:00"))
+@lru_cache(maxsize=1024)
+def _parse_rfc3339(rfc3339: str) -> datetime:
+    # An incident's start/end strings are shifted several times per run; datetimes are immutable so caching is safe.
+    dt = None
+    if _c_parse_datetime is not None:
+        try:
+            dt = _c_parse_datetime(rfc3339)
+        except ValueError:
+            dt = None
+    if dt is None:
+        dt = datetime.fromisoformat(rfc3339.replace("Z", "+00:00"))
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
-    return (dt + timedelta(minutes=minutes)).isoformat().replace("+00:00", "Z")
+    return dt
+
+@lru_cache(maxsize=512)
+def _shift_rfc3339(rfc3339: str, minutes: int) -> str:
+    # Collectors shift the same (timestamp, window) pairs on every dispatch; memoize the formatted result too.
+    return (_parse_rfc3339(rfc3339) + timedelta(minutes=minutes)).isoformat().replace("+00:00", "Z")
+
+# State dicts are produced by model_dump() in an earlier node, so they are rebuilt
+# without re-running validation. Nested models must be constructed explicitly.
+
+def _to_incident(d: Dict[str, Any]) -> IncidentInput:
+    return IncidentInput.model_construct(**{**d, "time_range": TimeRange.model_construct(**d["time_range"])})
+
+def _to_evidence(d: Dict[str, Any]) -> EvidenceItem:
+    return EvidenceItem.model_construct(**{**d, "time_range": TimeRange.model_construct(**d["time_range"])})
+
+def _to_hypothesis(d: Dict[str, Any]) -> Hypothesis:
+    return Hypothesis.model_construct(**d)
+
+def _incident_of(state: Dict[str, Any]) -> IncidentInput:
+    return state.get("_incident") or _to_incident(state["incident"])
 
-def build_graph():
-    g = StateGraph(dict)
+def _evidence_of(state: Dict[str, Any]) -> List[EvidenceItem]:
+    # Prefer the live models carried next to the serialized evidence; rebuild only if they are missing.
+    evidence = state.get("evidence", [])
+    live = state.get("_evidence")
+    if live is not None and len(live) == len(evidence):
+        return list(live)
+    return [_to_evidence(x) for x in evidence]
+
+def _evidence_update(items: List[EvidenceItem]) -> Dict[str, Any]:
+    return {"evidence": [e.model_dump() for e in items], "_evidence": items}
+
+class GraphState(TypedDict, total=False):
+    """
+    Graph state. Nodes return only the keys they change; `evidence` is append-only,
+    so collectors return just the items they added and LangGraph concatenates them.
+    `_incident` and `_evidence` carry the live models alongside the serialized copies so
+    downstream nodes skip re-hydrating them; `_prompt_incident` and `kb_slice["knowledge"]`
+    are the prompt-ready views, built once per run.
+    """
+    raw_webhook: Dict[str, Any]
+    incident: Dict[str, Any]
+    kb_slice: Dict[str, Any]
+    _registry: Any
+    _incident: IncidentInput
+    _prompt_incident: Dict[str, Any]
+    evidence: Annotated[List[Dict[str, Any]], operator.add]
+    _evidence: Annotated[List[EvidenceItem], operator.add]
+    hypotheses: List[Dict[str, Any]]
+    hypotheses_fingerprint: str
+    report: Dict[str, Any]
+    iteration: int
+    should_iterate: bool
+
+_graphs: Dict[bool, Any] = {}
+_graphs_lock = threading.Lock()
+
+def build_graph(async_llm: bool = False):
+    """
+    Returns the compiled graph, compiling it on first use (once per process; see _reset_after_fork).
+    With async_llm=True the two LLM nodes await the async OpenAI client; the graph must then
+    be driven with ainvoke (see arun). The remaining nodes are cheap and stay synchronous.
+    """
+    graph = _graphs.get(async_llm)
+    if graph is None:
+        with _graphs_lock:
+            graph = _graphs.get(async_llm)
+            if graph is None:
+                graph = _graphs[async_llm] = _compile_graph(async_llm)
+    return graph
+
+def _compile_graph(async_llm: bool):
+    g = StateGraph(GraphState)
 
     g.add_node("normalize_incident", normalize_incident)
     g.add_node("load_kb_slice", load_kb_slice)
     g.add_node("seed_alert_evidence", seed_alert_evidence)
 
-    g.add_node("plan_evidence", plan_evidence)
-    g.add_node("collect_evidence_tools", collect_evidence_tools)
+    g.add_node("collect_evidence_tools", acollect_evidence_tools if async_llm else collect_evidence_tools)
     g.add_node("summarize_evidence", summarize_evidence)
 
-    g.add_node("hypothesize", hypothesize)
+    g.add_node("hypothesize", ahypothesize if async_llm else hypothesize)
     g.add_node("score_and_report", score_and_report)
 
     g.set_entry_point("normalize_incident")
     g.add_edge("normalize_incident", "load_kb_slice")
     g.add_edge("load_kb_slice", "seed_alert_evidence")
 
-    g.add_edge("seed_alert_evidence", "plan_evidence")
-    g.add_edge("plan_evidence", "collect_evidence_tools")
+    g.add_edge("seed_alert_evidence", "collect_evidence_tools")
     g.add_edge("collect_evidence_tools", "summarize_evidence")
     g.add_edge("summarize_evidence", "hypothesize")
     g.add_edge("hypothesize", "score_and_report")
-    g.add_conditional_edges("score_and_report", decide_next, {"iterate": "plan_evidence", "end": END})
+    g.add_conditional_edges("score_and_report", decide_next, {"iterate": "collect_evidence_tools", "end": END})
 
-    checkpointer = MemorySaver() if settings.enable_persistence else None
-    return g.compile(checkpointer=checkpointer)
+    # No checkpointer: runs are never resumed (no thread_id is passed), and reports are persisted
+    # by core.persistence when ENABLE_PERSISTENCE is set, not as per-node state snapshots.
+    return g.compile()
 
 # ---- Nodes (core-neutral) ----
 
+# Tolerant label/annotation lookups for normalize_incident, in priority order.
+SUBJECT_KEYS = ("subject", "service", "job")
+ENVIRONMENT_KEYS = ("environment", "env")
+SEVERITY_KEYS = ("severity", "level")
+TITLE_ANNOTATION_KEYS = ("summary", "description")
+
+def _first(d: Dict[str, Any], keys: Tuple[str, ...], default: Any = None) -> Any:
+    # Same semantics as an `or` chain: empty values fall through to the next key.
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return default
+
 def normalize_incident(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Accepts a webhook payload and maps it into a vendor-neutral IncidentInput.
     This parser is intentionally tolerant and does not assume a specific alerting product.
     """
     if state.get("incident"):
-        return state
-    raw = state.get("raw_webhook", {})
+        dump = state["incident"]
+        return {"incident": dump, "_incident": _incident_of(state), "_prompt_incident": _llm_incident(dump)}
+    incident = _incident_from_webhook(state.get("raw_webhook", {}), _now_rfc3339())
+    TRACER.emit({"event": "normalize_incident", "subject": incident.subject, "environment": incident.environment})
+    dump = incident.model_dump()
+    return {"incident": dump, "_incident": incident, "_prompt_incident": _llm_incident(dump)}
+
+def normalize_many(payloads: List[Dict[str, Any]]) -> List[IncidentInput]:
+    """Normalizes a batch of webhook payloads (e.g. a replay) sharing one "now" for open-ended alerts."""
+    now = _now_rfc3339()
+    return [_incident_from_webhook(raw, now) for raw in payloads]
+
+def normalize_alerts(raw: Dict[str, Any]) -> List[IncidentInput]:
+    """
+    Normalizes every alert of a grouped webhook (normalize_incident only looks at the first).
+    Each incident keeps the group-level fields with just its own alert in `raw`.
+    """
+    alerts = raw.get("alerts") or []
+    if len(alerts) <= 1:
+        return normalize_many([raw])
+    return normalize_many([{**raw, "alerts": [alert]} for alert in alerts])
+
+def _incident_from_webhook(raw: Dict[str, Any], now: str) -> IncidentInput:
     alerts = raw.get("alerts") or []
     a0 = alerts[0] if alerts else raw
 
     labels = a0.get("labels") or raw.get("labels") or {}
     annotations = a0.get("annotations") or raw.get("annotations") or {}
 
-    subject = labels.get("subject") or labels.get("service") or labels.get("job") or "unknown"
-    environment_raw = labels.get("environment") or labels.get("env") or "unknown"
-    severity = labels.get("severity") or labels.get("level") or "unknown"
+    subject = _first(labels, SUBJECT_KEYS, "unknown")
+    environment_raw = _first(labels, ENVIRONMENT_KEYS, "unknown")
+    severity = _first(labels, SEVERITY_KEYS, "unknown")
 
-    title = annotations.get("summary") or annotations.get("description") or labels.get("alertname") or "incident"
+    title = _first(annotations, TITLE_ANNOTATION_KEYS) or labels.get("alertname") or "incident"
     starts_at = a0.get("startsAt") or raw.get("startsAt")
-    ends_at = a0.get("endsAt") or raw.get("endsAt") or _now_rfc3339()
-
-    if not starts_at:
-        ends_at = _now_rfc3339()
-        starts_at = _shift_rfc3339(ends_at, -60)
+    ends_at = a0.get("endsAt") or raw.get("endsAt") or now
 
-    # Small buffer before start
-    tr = TimeRange(start=_shift_rfc3339(starts_at, -10), end=ends_at)
+    # Small buffer before start; an alert without a start gets the last hour plus the same buffer.
+    if starts_at:
+        tr = TimeRange(start=_shift_rfc3339(starts_at, -10), end=ends_at)
+    else:
+        tr = TimeRange(start=_shift_rfc3339(now, -70), end=now)
 
-    environment = canonicalize_environment(environment_raw)
-    incident = IncidentInput(
+    return IncidentInput(
         title=title,
         severity=severity,
-        environment=environment,
+        environment=canonicalize_environment(environment_raw),
         subject=subject,
         time_range=tr,
         labels=labels,
         annotations=annotations,
         raw=raw,
     )
-    state["incident"] = incident.model_dump()
-    TRACER.emit({"event": "normalize_incident", "subject": incident.subject, "environment": incident.environment})
-    return state
 
 def load_kb_slice(state: Dict[str, Any]) -> Dict[str, Any]:
     from core.kb import KB
-    from core.registry import ProviderRegistry
+    from core.registry import shared_registry
     from providers import FACTORIES  # mapping lives outside core logic
 
-    incident = IncidentInput(**state["incident"])
-    kb = KB.load(settings.kb_path)
+    incident = state["incident"]
+    # Parsed files and provider instances are reused across incidents until the files change.
+    kb = KB.load_cached(settings.kb_path)
 
-    subject_cfg = kb.get_subject_config(incident.subject, incident.environment)
-    provider_instances = KB.load_providers(settings.catalog_path)
+    subject_cfg = kb.get_subject_config(incident["subject"], incident["environment"])
+    provider_instances = KB.load_providers_cached(settings.catalog_path)
 
-    registry = ProviderRegistry(factories=FACTORIES, instances_config=provider_instances)
+    registry = shared_registry(FACTORIES, provider_instances)
 
     # Persist only what core needs (no vendor specifics)
-    state["kb_slice"] = {
-        "subject_cfg": subject_cfg,
-        "providers": provider_instances,
+    return {
+        "kb_slice": {
+            "subject_cfg": subject_cfg,
+            "providers": provider_instances,
+            "knowledge": _kb_knowledge(subject_cfg),
+        },
+        "_registry": registry,  # runtime object (not serializable, OK in-process)
     }
-    state["_registry"] = registry  # runtime object (not serializable, OK in-process)
-    return state
 
 def seed_alert_evidence(state: Dict[str, Any]) -> Dict[str, Any]:
-    incident = IncidentInput(**state["incident"])
-    e = EvidenceItem(
+    incident = _incident_of(state)
+    # Every field comes from the already-validated incident, so skip re-validation.
+    e = EvidenceItem.model_construct(
         id="alert_0",
         kind="alert",
         source="alert_webhook",
@@ -143,186 +330,271 @@ def seed_alert_evidence(state: Dict[str, Any]) -> Dict[str, Any]:
         pointers=[],
         tags=["alert", "webhook"],
     )
-    state["evidence"] = [e.model_dump()]
-    return state
+    return _evidence_update([e])
 
-def plan_evidence(state: Dict[str, Any]) -> Dict[str, Any]:
-    incident = IncidentInput(**state["incident"])
+def collect_evidence_tools(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Plans and collects in one LLM call: the model sees the evidence gathered so far and emits
+    tool calls directly. If it emits none, the deterministic fallback plan is executed instead.
+    """
+    incident = _incident_of(state)
     subject_cfg = state["kb_slice"]["subject_cfg"]
-    evidence = [EvidenceItem(**x) for x in state.get("evidence", [])]
-    iteration = int(state.get("iteration", 0))
+    registry = state["_registry"]
+    evidence = _evidence_of(state)
+    request, fallback = _collect_request(state, evidence)
+    cache_key, calls = _llm_cache_lookup("collect_evidence_tools", request)
+    if calls is not None:
+        collected = _run_tool_calls(calls, incident, subject_cfg, registry)
+    elif _batch_mode():
+        resp = _batch_completion("collect_evidence_tools", state["incident"], int(state.get("iteration", 0)), request)
+        calls = _parse_tool_calls(getattr(resp.choices[0].message, "tool_calls", None) or [])
+        collected = _run_tool_calls(calls, incident, subject_cfg, registry)
+        _llm_cache_store(cache_key, calls)
+    else:
+        # Streamed: each tool call is dispatched to a provider as soon as its arguments are complete.
+        stream = client.chat.completions.create(**request, stream=True)
+        calls, collected = _stream_tool_calls(stream, incident, subject_cfg, registry)
+        _llm_cache_store(cache_key, calls)
+    return _finish_collection(state, evidence, calls, collected, fallback)
+
+async def acollect_evidence_tools(state: Dict[str, Any]) -> Dict[str, Any]:
+    incident = _incident_of(state)
+    subject_cfg = state["kb_slice"]["subject_cfg"]
+    registry = state["_registry"]
+    evidence = _evidence_of(state)
+    request, fallback = _collect_request(state, evidence)
+    cache_key, calls = await _allm_cache_lookup("collect_evidence_tools", request)
+    if calls is not None:
+        collected = await _arun_tool_calls(calls, incident, subject_cfg, registry)
+    else:
+        stream = await aclient.chat.completions.create(**request, stream=True)
+        calls, collected = await _astream_tool_calls(stream, incident, subject_cfg, registry)
+        await _allm_cache_store(cache_key, calls)
+
+    return await asyncio.to_thread(_finish_collection, state, evidence, calls, collected, fallback)
+
+def _collect_request(state: Dict[str, Any], evidence: List[EvidenceItem]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    subject_cfg = state["kb_slice"]["subject_cfg"]
+    incident, knowledge = _prompt_context(state)
 
     available_tools = _available_tools(subject_cfg)
     missing = _missing_evidence_kinds(available_tools, evidence)
 
     payload = {
-        "incident": incident.model_dump(),
+        "incident": incident,
         "knowledge": {
-            "known_failure_modes": subject_cfg.get("known_failure_modes", []),
-            "dependencies": subject_cfg.get("dependencies", []),
+            "known_failure_modes": knowledge["known_failure_modes"],
+            "dependencies": knowledge["dependencies"],
         },
-        "evidence_summary": _compact_evidence(evidence),
+        "evidence_summary": _coverage_summary(evidence),
         "available_tools": available_tools,
         "missing_evidence_kinds": missing,
-        "task": PLAN_TASK,
-        "iteration": iteration,
+        "task": COLLECT_TASK,
+        "iteration": int(state.get("iteration", 0)),
     }
 
-    resp = client.chat.completions.create(
-        model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": json.dumps(payload)},
+    request: Dict[str, Any] = {
+        "model": settings.openai_model,
+        "messages": [
+            {"role": "system", "content": EVIDENCE_TOOL_SYSTEM},
+            {"role": "user", "content": _dumps_payload(payload)},
         ],
-        temperature=0.2,
-    )
-
-    text = resp.choices[0].message.content or "{}"
-    parsed = _safe_json(text)
-    actions = parsed.get("actions") if isinstance(parsed, dict) else None
-    if not isinstance(actions, list):
-        actions = _fallback_plan(available_tools, missing)
-
-    state["plan"] = actions
-    TRACER.emit({"event": "plan_evidence", "actions": [a.get("tool") for a in actions]})
-    return state
-
-def collect_evidence_tools(state: Dict[str, Any]) -> Dict[str, Any]:
-    incident = IncidentInput(**state["incident"])
+        "temperature": 0.0,
+    }
+    tools = _tool_schemas(subject_cfg)
+    if tools:
+        request["tools"] = tools
+        request["tool_choice"] = "auto"
+    return request, _fallback_plan(available_tools, missing)
+
+def _finish_collection(
+    state: Dict[str, Any],
+    evidence: List[EvidenceItem],
+    calls: List[Tuple[str, Dict[str, Any]]],
+    collected: List[EvidenceItem],
+    fallback: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    incident = _incident_of(state)
     subject_cfg = state["kb_slice"]["subject_cfg"]
     registry = state["_registry"]
-    evidence = [EvidenceItem(**x) for x in state.get("evidence", [])]
-    plan = state.get("plan") or []
+    evidence = list(evidence)
+    existing = len(evidence)
 
-    tools = _tool_schemas(subject_cfg)
-    tool_choice = "required" if plan else "auto"
+    if not calls:
+        # Fallback: execute the deterministic plan if the model returned no tool calls
+        fallback_calls = [(action.get("tool"), action.get("args") or {}) for action in fallback]
+        evidence.extend(_run_tool_calls(fallback_calls, incident, subject_cfg, registry))
+        TRACER.emit({"event": "collect_evidence", "tools": [name for name, _ in fallback_calls], "fallback": True, "count": len(evidence)})
+        return _evidence_update(evidence[existing:])
 
-    payload = {
-        "incident": incident.model_dump(),
-        "plan": plan,
-        "note": "Follow the plan order when calling tools. Skip tools not available.",
-    }
+    evidence.extend(collected)
+    evidence = _fetch_followup_metadata(evidence, subject_cfg, registry)
+    TRACER.emit({"event": "collect_evidence", "tools": [name for name, _ in calls], "count": len(evidence)})
+    return _evidence_update(evidence[existing:])
 
-    resp = client.chat.completions.create(
-        model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": EVIDENCE_TOOL_SYSTEM},
-            {"role": "user", "content": json.dumps(payload)},
-        ],
-        tools=tools,
-        tool_choice=tool_choice,
-        temperature=0.0,
-    )
+def _parse_tool_calls(tool_calls: List[Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    return [(call.function.name, _safe_json(call.function.arguments or "{}")) for call in tool_calls]
 
-    msg = resp.choices[0].message
-    tool_calls = getattr(msg, "tool_calls", None) or []
-
-    if not tool_calls and plan:
-        # Fallback: execute plan directly if the model returned no tool calls
-        for action in plan:
-            ev = _execute_planned_action(action, incident, subject_cfg, registry)
-            if ev:
-                evidence.append(ev)
-        state["evidence"] = [e.model_dump() for e in evidence]
-        return state
-
-    for call in tool_calls:
-        name = call.function.name
-        args = _safe_json(call.function.arguments or "{}")
-        ev = _execute_tool_call(name, args, incident, subject_cfg, registry)
-        if ev:
-            evidence.append(ev)
-
-    evidence = _maybe_fetch_deploy_metadata(evidence, subject_cfg, registry)
-    evidence = _maybe_fetch_build_metadata(evidence, subject_cfg, registry)
-    state["evidence"] = [e.model_dump() for e in evidence]
-    TRACER.emit({"event": "collect_evidence", "count": len(evidence)})
-    return state
+class _ToolCallAccumulator:
+    """
+    Reassembles streamed tool-call deltas. A call is complete once a later call starts or the
+    choice finishes; feed() returns the calls completed by each chunk, finish() the rest.
+    """
+    def __init__(self):
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self.finished = False
+
+    def feed(self, chunk) -> List[Tuple[str, Dict[str, Any]]]:
+        if not chunk.choices:
+            return []
+        choice = chunk.choices[0]
+        done: List[Tuple[str, Dict[str, Any]]] = []
+        for delta in getattr(choice.delta, "tool_calls", None) or []:
+            if delta.index not in self._pending:
+                done.extend(self._complete(lambda index: index < delta.index))
+                self._pending[delta.index] = {"name": "", "arguments": []}
+            entry = self._pending[delta.index]
+            fn = delta.function
+            if fn is not None:
+                if fn.name:
+                    entry["name"] = fn.name
+                if fn.arguments:
+                    entry["arguments"].append(fn.arguments)
+        if getattr(choice, "finish_reason", None):
+            self.finished = True
+            done.extend(self.finish())
+        return done
+
+    def finish(self) -> List[Tuple[str, Dict[str, Any]]]:
+        return self._complete(lambda index: True)
+
+    def _complete(self, ready) -> List[Tuple[str, Dict[str, Any]]]:
+        done = []
+        for index in sorted(i for i in self._pending if ready(i)):
+            entry = self._pending.pop(index)
+            done.append((entry["name"], _safe_json("".join(entry["arguments"]) or "{}")))
+        return done
+
+async def _astream_tool_calls(stream, incident: IncidentInput, subject_cfg: Dict[str, Any], registry) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[EvidenceItem]]:
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    tasks = []
+    seen = set()
+
+    def dispatch(name: str, args: Dict[str, Any]) -> None:
+        key = request_key(name, args)
+        if key in seen:
+            return
+        seen.add(key)
+        calls.append((name, args))
+        tasks.append(asyncio.ensure_future(_aexecute_tool_call(name, args, incident, subject_cfg, registry)))
+
+    acc = _ToolCallAccumulator()
+    try:
+        async for chunk in stream:
+            for name, args in acc.feed(chunk):
+                dispatch(name, args)
+            if acc.finished:
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            await close()
+    for name, args in acc.finish():
+        dispatch(name, args)
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+    return calls, _tool_results(calls, list(outcomes))
+
+def _stream_tool_calls(stream, incident: IncidentInput, subject_cfg: Dict[str, Any], registry) -> Tuple[List[Tuple[str, Dict[str, Any]]], List[EvidenceItem]]:
+    calls: List[Tuple[str, Dict[str, Any]]] = []
+    futures = []
+    latencies: List[_ToolLatency] = []
+    seen = set()
+    acc = _ToolCallAccumulator()
+    pool = ThreadPoolExecutor(max_workers=TOOL_CALL_WORKERS)
+
+    def dispatch(name: str, args: Dict[str, Any]) -> None:
+        key = request_key(name, args)
+        if key in seen:
+            return
+        seen.add(key)
+        calls.append((name, args))
+        latencies.append(_ToolLatency(name, incident))
+        futures.append(pool.submit(_execute_tool_call, name, args, incident, subject_cfg, registry, latencies[-1]))
+
+    try:
+        try:
+            for chunk in stream:
+                for name, args in acc.feed(chunk):
+                    dispatch(name, args)
+                if acc.finished:
+                    break
+        finally:
+            # Stop reading once the choice has finished (or on error) and return the connection to the pool.
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        for name, args in acc.finish():
+            dispatch(name, args)
+        # The deadline starts once the stream is drained; earlier calls have had the streaming time on top.
+        outcomes = _deadline_outcomes(futures, latencies, _tool_timeout(subject_cfg))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return calls, _tool_results(calls, outcomes)
 
 def summarize_evidence(state: Dict[str, Any]) -> Dict[str, Any]:
-    incident = IncidentInput(**state["incident"])
+    incident = _incident_of(state)
     subject_cfg = state["kb_slice"]["subject_cfg"]
-    evidence = [EvidenceItem(**x) for x in state.get("evidence", [])]
+    evidence = _evidence_of(state)
+    existing = len(evidence)
 
     evidence = _add_kb_evidence_items(evidence, subject_cfg, incident.time_range)
-    state["evidence"] = [e.model_dump() for e in evidence]
     TRACER.emit({"event": "summarize_evidence", "count": len(evidence)})
-    return state
+    return _evidence_update(evidence[existing:])
 
 def hypothesize(state: Dict[str, Any]) -> Dict[str, Any]:
-    incident = IncidentInput(**state["incident"])
-    evidence = [EvidenceItem(**x) for x in state.get("evidence", [])]
-    subject_cfg = state["kb_slice"]["subject_cfg"]
-
+    inputs = _hypothesis_inputs(state)
+    if inputs is None:
+        return {"hypotheses": []}
+    compact, payload = inputs
+    fingerprint = _evidence_fingerprint(compact)
+    if _hypotheses_current(state, fingerprint):
+        return {}
+    items = _request_hypotheses(payload, int(state.get("iteration", 0)))
+    return _hypotheses_update(items, fingerprint)
+
+async def ahypothesize(state: Dict[str, Any]) -> Dict[str, Any]:
+    inputs = _hypothesis_inputs(state)
+    if inputs is None:
+        return {"hypotheses": []}
+    compact, payload = inputs
+    fingerprint = _evidence_fingerprint(compact)
+    if _hypotheses_current(state, fingerprint):
+        return {}
+    items = await _arequest_hypotheses(payload)
+    return _hypotheses_update(items, fingerprint)
+
+def _hypothesis_inputs(state: Dict[str, Any]) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    evidence = _evidence_of(state)
+    if not _has_collected_signal(evidence):
+        # Nothing beyond the alert and KB context: the LLM could only restate "insufficient evidence",
+        # which score_and_report already produces for an empty hypothesis list.
+        TRACER.emit({"event": "hypothesize", "count": 0, "skipped": "no_signal"})
+        return None
     compact = _compact_evidence(evidence)
+    return compact, _hypothesis_payload(state, compact)
 
-    payload = {
-        "incident": incident.model_dump(),
-        "knowledge": {
-            "known_failure_modes": subject_cfg.get("known_failure_modes", []),
-            "runbooks": subject_cfg.get("runbooks", []),
-            "dependencies": subject_cfg.get("dependencies", []),
-        },
-        "evidence": compact,
-        "task": HYPOTHESIS_TASK,
-    }
-
-    tools = [{
-        "type": "function",
-        "function": {
-            "name": "emit_hypotheses",
-            "description": "Return hypotheses as structured output.",
-            "strict": True,
-            "parameters": {
-                "type": "object",
-                "additionalProperties": False,
-                "properties": {
-                    "hypotheses": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "additionalProperties": False,
-                            "properties": {
-                                "id": {"type": "string"},
-                                "statement": {"type": "string"},
-                                "supporting_evidence_ids": {"type": "array", "items": {"type": "string"}},
-                                "contradictions": {"type": "array", "items": {"type": "string"}},
-                                "validations": {"type": "array", "items": {"type": "string"}},
-                            },
-                            "required": ["id", "statement", "supporting_evidence_ids", "contradictions", "validations"],
-                        },
-                    }
-                },
-                "required": ["hypotheses"],
-            },
-        },
-    }]
-
-    resp = client.chat.completions.create(
-        model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": json.dumps(payload)},
-        ],
-        tools=tools,
-        tool_choice="required",
-        parallel_tool_calls=False,
-        temperature=0.2,
-    )
-
-    msg = resp.choices[0].message
-    parsed = None
-    tool_calls = getattr(msg, "tool_calls", None) or []
-    for call in tool_calls:
-        if call.function.name == "emit_hypotheses":
-            parsed = _safe_json(call.function.arguments or "{}")
-            break
-    if parsed is None:
-        text = msg.content or "{}"
-        parsed = _safe_json(text) or {"hypotheses": []}
+def _hypotheses_current(state: Dict[str, Any], fingerprint: str) -> bool:
+    # A later pass whose collection added nothing new would re-ask the same question; keep the last answer.
+    if state.get("hypotheses_fingerprint") != fingerprint:
+        return False
+    TRACER.emit({"event": "hypothesize", "skipped": "unchanged_evidence"})
+    return True
 
+def _hypotheses_update(items: List[Dict[str, Any]], fingerprint: str) -> Dict[str, Any]:
     hyps: List[Hypothesis] = []
-    for i, h in enumerate(parsed.get("hypotheses", [])[:5]):
+    for i, h in enumerate(x for x in items if isinstance(x, dict)):
+        if i >= 5:
+            break
         hyps.append(Hypothesis(
             id=h.get("id") or f"h{i+1}",
             statement=h.get("statement", ""),
@@ -333,14 +605,13 @@ def hypothesize(state: Dict[str, Any]) -> Dict[str, Any]:
             validations=h.get("validations", []),
         ))
 
-    state["hypotheses"] = [h.model_dump() for h in hyps]
     TRACER.emit({"event": "hypothesize", "count": len(hyps)})
-    return state
+    return {"hypotheses": [h.model_dump() for h in hyps], "hypotheses_fingerprint": fingerprint}
 
 def score_and_report(state: Dict[str, Any]) -> Dict[str, Any]:
-    incident = IncidentInput(**state["incident"])
-    evidence = [EvidenceItem(**x) for x in state.get("evidence", [])]
-    hyps = [Hypothesis(**x) for x in state.get("hypotheses", [])]
+    incident = _incident_of(state)
+    evidence = _evidence_of(state)
+    hyps = [_to_hypothesis(x) for x in state.get("hypotheses", [])]
 
     ranked = rank(hyps, evidence, incident.time_range, state.get("kb_slice"))
     if ranked:
@@ -360,31 +631,188 @@ def score_and_report(state: Dict[str, Any]) -> Dict[str, Any]:
         others = []
         next_validations = top.validations
 
+    what_changed, impact_scope = _derive_what_changed_and_impact(evidence)
     report = RCAReport(
         incident_summary=f"{incident.title} (severity={incident.severity}, env={incident.environment})",
         time_range=incident.time_range,
         top_hypothesis=top,
         other_hypotheses=others,
         fallback_hypotheses=others[:3],
-        evidence=evidence,
+        evidence=[],
         supporting_evidence=_format_supporting_evidence(top, evidence),
-        what_changed=_derive_what_changed(evidence),
-        impact_scope=_derive_impact_scope(evidence),
+        what_changed=what_changed,
+        impact_scope=impact_scope,
         next_validations=next_validations,
     )
-    state["report"] = report.model_dump()
     iteration = int(state.get("iteration", 0))
     should_iterate = top.confidence < CONFIDENCE_THRESHOLD and iteration < MAX_ITERATIONS
-    state["should_iterate"] = should_iterate
-    if should_iterate:
-        state["iteration"] = iteration + 1
     TRACER.emit({"event": "score_and_report", "confidence": top.confidence, "iterate": should_iterate})
-    return state
+    # The evidence channel already holds every item serialized once; reuse it instead of dumping again.
+    report_dump = report.model_dump()
+    report_dump["evidence"] = list(state.get("evidence", []))
+    return {
+        "report": report_dump,
+        "should_iterate": should_iterate,
+        "iteration": iteration + 1 if should_iterate else iteration,
+    }
 
 def decide_next(state: Dict[str, Any]) -> str:
     return "iterate" if state.get("should_iterate") else "end"
 
 
+def _hypothesis_payload(state: Dict[str, Any], compact: List[Dict[str, Any]]) -> Dict[str, Any]:
+    incident, knowledge = _prompt_context(state)
+    return {
+        "incident": incident,
+        "knowledge": knowledge,
+        "evidence": compact,
+        "task": HYPOTHESIS_TASK,
+    }
+
+def _hypotheses_request(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "model": settings.openai_model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": _dumps_payload(payload)},
+        ],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": "hypotheses", "strict": True, "schema": HYPOTHESES_SCHEMA},
+        },
+        "temperature": 0.2,
+    }
+
+def _parse_hypotheses(resp) -> List[Dict[str, Any]]:
+    # Strict structured output always parses; an empty result only happens on a refusal.
+    msg = resp.choices[0].message
+    parsed = _safe_json(msg.content or "{}")
+    items = parsed.get("hypotheses")
+    if not isinstance(items, list):
+        return []
+    return [x for x in items if isinstance(x, dict)]
+
+def _request_hypotheses(payload: Dict[str, Any], iteration: int = 0) -> List[Dict[str, Any]]:
+    request = _hypotheses_request(payload)
+    cache_key, items = _llm_cache_lookup("hypothesize", request)
+    if items is not None:
+        return items
+    if _batch_mode():
+        items = _parse_hypotheses(_batch_completion("hypothesize", payload["incident"], iteration, request))
+    else:
+        items = _parse_hypotheses(client.chat.completions.create(**request))
+    # An empty list means the model output didn't parse; retry it next time rather than replay it.
+    if items:
+        _llm_cache_store(cache_key, items)
+    return items
+
+async def _arequest_hypotheses(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    request = _hypotheses_request(payload)
+    cache_key, items = await _allm_cache_lookup("hypothesize", request)
+    if items is not None:
+        return items
+    items = _parse_hypotheses(await aclient.chat.completions.create(**request))
+    if items:
+        await _allm_cache_store(cache_key, items)
+    return items
+
+# Content-addressed cache of parsed LLM results (tool calls, hypotheses), opt-in via LLM_CACHE_ENABLED.
+_LLM_CACHE = TTLCache(maxsize=2048, ttl_seconds=settings.llm_cache_ttl_seconds)
+# Optional second tier on disk (LLM_CACHE_PATH) so other workers and processes reuse the same results.
+_LLM_DISK_CACHE: Optional[SQLiteTTLCache] = None
+
+def _llm_disk_cache() -> Optional[SQLiteTTLCache]:
+    global _LLM_DISK_CACHE
+    if _LLM_DISK_CACHE is None and settings.llm_cache_path:
+        _LLM_DISK_CACHE = SQLiteTTLCache(settings.llm_cache_path, ttl_seconds=settings.llm_cache_ttl_seconds)
+    return _LLM_DISK_CACHE
+
+def _llm_cache_lookup(node: str, request: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+    if not settings.llm_cache_enabled:
+        return None, None
+    key = request_key(node, request)
+    hit = _LLM_CACHE.get(key)
+    if hit is None and settings.llm_cache_path:
+        hit = _llm_disk_lookup(key)
+    return key, _llm_cache_hit(node, hit)
+
+async def _allm_cache_lookup(node: str, request: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+    # Same as _llm_cache_lookup, but the disk tier (SQLite, which may wait on a locked file) runs
+    # off the event loop.
+    if not settings.llm_cache_enabled:
+        return None, None
+    key = request_key(node, request)
+    hit = _LLM_CACHE.get(key)
+    if hit is None and settings.llm_cache_path:
+        hit = await asyncio.to_thread(_llm_disk_lookup, key)
+    return key, _llm_cache_hit(node, hit)
+
+def _llm_disk_lookup(key: str) -> Any:
+    hit = _llm_disk_cache().get(key)
+    if hit is not None:
+        _LLM_CACHE.set(key, hit)
+    return hit
+
+def _llm_cache_hit(node: str, hit: Any) -> Any:
+    if hit is not None:
+        TRACER.emit({"event": "llm_cache_hit", "node": node})
+    return hit
+
+def _llm_cache_store(key: Optional[str], value: Any) -> None:
+    if key is not None:
+        _LLM_CACHE.set(key, value)
+        if settings.llm_cache_path:
+            _llm_disk_cache().set(key, value)
+
+async def _allm_cache_store(key: Optional[str], value: Any) -> None:
+    if key is not None:
+        _LLM_CACHE.set(key, value)
+        if settings.llm_cache_path:
+            await asyncio.to_thread(_llm_disk_cache().set, key, value)
+
+_batch_dispatcher: Optional[BatchDispatcher] = None
+_batch_dispatcher_lock = threading.Lock()
+# Batch mode only applies inside run_incidents_offline: a batch job amortizes its wait only when many
+# incidents submit into it, so the intake worker and other one-at-a-time callers stay online.
+_OFFLINE_RUN: ContextVar[bool] = ContextVar("offline_run", default=False)
+
+def _batch_mode() -> bool:
+    return settings.openai_mode == "batch" and _OFFLINE_RUN.get()
+
+def _get_batch_dispatcher() -> BatchDispatcher:
+    global _batch_dispatcher
+    if _batch_dispatcher is None:
+        with _batch_dispatcher_lock:
+            if _batch_dispatcher is None:
+                _batch_dispatcher = BatchDispatcher(
+                    client,
+                    flush_seconds=settings.openai_batch_flush_seconds,
+                    poll_seconds=settings.openai_batch_poll_seconds,
+                    max_wait_seconds=settings.openai_batch_max_wait_seconds,
+                )
+    return _batch_dispatcher
+
+def _batch_completion(node: str, incident: Dict[str, Any], iteration: int, request: Dict[str, Any]) -> ChatCompletion:
+    """
+    Sends one chat completion through the Batch API and blocks until its batch finishes. If the batch
+    fails, expires, errors on this item or outlives settings.openai_batch_max_wait_seconds, the
+    request is sent online instead. Used by the sync graph within run_incidents_offline only (see
+    _batch_mode).
+    """
+    custom_id = f"{request_key(incident)[:16]}:{node}:{iteration}:{uuid.uuid4().hex[:8]}"
+    body = {k: v for k, v in request.items() if k != "stream"}
+    try:
+        # No timeout here: the dispatcher's own deadline cancels the job before it raises, so the
+        # online fallback never runs while the same request is still live (and billed) in a batch.
+        return ChatCompletion.model_validate(_get_batch_dispatcher().submit_and_wait(custom_id, body))
+    except Exception as exc:
+        TRACER.emit({"event": "batch_fallback", "node": node, "error": f"{type(exc).__name__}: {exc}"})
+        return client.chat.completions.create(**body)
+
+def _evidence_fingerprint(compact: List[Dict[str, Any]]) -> str:
+    # Order- and duplicate-insensitive: re-collected identical items count as unchanged evidence.
+    return request_key(sorted({request_key(item) for item in compact}))
+
 def _compact_evidence(evidence: List[EvidenceItem]) -> List[Dict[str, Any]]:
     compact = []
     for e in evidence:
@@ -392,17 +820,93 @@ def _compact_evidence(evidence: List[EvidenceItem]) -> List[Dict[str, Any]]:
             "id": e.id,
             "kind": e.kind,
             "summary": e.summary,
-            "top_signals": e.top_signals,
-            "sample_preview": e.samples[:8],
+            "top_signals": _cap_signals(e.top_signals),
+            "sample_preview": _cap_samples(e.samples),
         })
     return compact
 
+def _cap_signals(signals: Dict[str, Any], max_keys: int = 12, max_chars: int = 256) -> Dict[str, Any]:
+    # Empty values carry no signal, so they are dropped before they can take one of the max_keys slots.
+    kept = [(key, value) for key, value in (signals or {}).items() if not _is_empty(value)][:max_keys]
+    return {key: _truncate(value, max_chars) for key, value in kept}
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or (isinstance(value, (list, tuple, dict)) and not value)
+
+def _truncate(value: Any, max_chars: int, max_items: int = 5) -> Any:
+    """
+    Shrinks a signal value for prompts: strings are cut to max_chars, floats are rounded to three
+    decimals, lists keep their first max_items entries, and dicts drop empty values and keep their
+    max_items largest values (by rendered size).
+    """
+    if isinstance(value, str):
+        return value[:max_chars]
+    if isinstance(value, float):
+        return round(value, 3)
+    if isinstance(value, (list, tuple)):
+        return [_truncate(v, max_chars, max_items) for v in value[:max_items]]
+    if isinstance(value, dict):
+        value = {k: v for k, v in value.items() if not _is_empty(v)}
+        if len(value) > max_items:
+            keep = set(sorted(value, key=lambda k: len(str(value[k])), reverse=True)[:max_items])
+            value = {k: v for k, v in value.items() if k in keep}
+        return {k: _truncate(v, max_chars, max_items) for k, v in value.items()}
+    return value
+
+def _coverage_summary(evidence: List[EvidenceItem]) -> List[Dict[str, Any]]:
+    # The collector only needs to know what is already covered, not the signal details.
+    return [{"id": e.id, "kind": e.kind, "summary": e.summary} for e in evidence]
+
+def _llm_incident(incident: Dict[str, Any]) -> Dict[str, Any]:
+    # The raw webhook repeats labels/annotations; leave it out of prompts.
+    return {k: v for k, v in incident.items() if k != "raw"}
+
+def _kb_knowledge(subject_cfg: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "known_failure_modes": subject_cfg.get("known_failure_modes", []),
+        "runbooks": subject_cfg.get("runbooks", []),
+        "dependencies": subject_cfg.get("dependencies", []),
+    }
+
+def _prompt_context(state: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # Precomputed by normalize_incident / load_kb_slice; rebuilt only for states assembled by hand.
+    incident = state.get("_prompt_incident") or _llm_incident(state["incident"])
+    kb_slice = state["kb_slice"]
+    knowledge = kb_slice.get("knowledge") or _kb_knowledge(kb_slice["subject_cfg"])
+    return incident, knowledge
+
+def _dumps_payload(payload: Dict[str, Any]) -> str:
+    # Compact separators and raw UTF-8 keep prompt tokens down and take the faster encoder path.
+    # orjson emits the same compact UTF-8 form; non-str keys are stringified as json.dumps does.
+    if _orjson_dumps is not None:
+        return _orjson_dumps(payload, option=OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+def _has_collected_signal(evidence: List[EvidenceItem]) -> bool:
+    return any(
+        e.kind not in {"alert", "service_graph", "runbook"} and (e.top_signals or e.samples)
+        for e in evidence
+    )
+
+def _cap_samples(samples: List[str], max_bytes: int = 2048, max_chars: int = 400) -> List[str]:
+    # Bound the prompt size per evidence item: long log lines are truncated and the preview stops at a byte budget.
+    out: List[str] = []
+    size = 0
+    for sample in samples[:8]:
+        text = str(sample)[:max_chars]
+        size += len(text.encode("utf-8"))
+        if size > max_bytes:
+            break
+        out.append(text)
+    return out
+
 def _add_kb_evidence_items(evidence: List[EvidenceItem], subject_cfg: Dict[str, Any], tr: TimeRange) -> List[EvidenceItem]:
+    # Built from the validated time range and KB config on every pass, so validation is skipped.
     # Service graph evidence (dependencies)
     deps = subject_cfg.get("dependencies", [])
     if deps and not any(e.kind == "service_graph" for e in evidence):
         graph = _build_service_graph(subject_cfg, deps)
-        evidence.append(EvidenceItem(
+        evidence.append(EvidenceItem.model_construct(
             id=_evidence_id("service_graph", str(deps)),
             kind="service_graph",
             source="knowledge_base",
@@ -417,7 +921,7 @@ def _add_kb_evidence_items(evidence: List[EvidenceItem], subject_cfg: Dict[str,
 
     runbooks = subject_cfg.get("runbooks", [])
     if runbooks and not any(e.kind == "runbook" for e in evidence):
-        evidence.append(EvidenceItem(
+        evidence.append(EvidenceItem.model_construct(
             id=_evidence_id("runbook", str(runbooks)),
             kind="runbook",
             source="knowledge_base",
@@ -452,64 +956,86 @@ def _build_service_graph(subject_cfg: Dict[str, Any], deps: List[Dict[str, Any]]
         })
     return {"nodes": nodes, "edges": edges}
 
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
 def _safe_json(text: str) -> Dict[str, Any]:
     try:
-        parsed = json.loads(text)
-        return parsed if isinstance(parsed, dict) else {}
+        parsed = _json_loads(text)
     except Exception:
-        return {}
+        # Only pay for the repair pass when the fast parse fails.
+        parsed = _repair_json(text)
+    return parsed if isinstance(parsed, dict) else {}
+
+def _repair_json(text: str) -> Any:
+    """
+    Recovers the common model quirks without re-prompting: prose or ``` fences around the
+    object, and trailing commas. Returns None when the text still does not parse.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text[start:end + 1]))
+    except Exception:
+        return None
 
 def _evidence_id(prefix: str, content: str) -> str:
-    import hashlib
     h = hashlib.sha1(content.encode("utf-8")).hexdigest()[:10]
     return f"{prefix}_{h}"
 
+def _bindings_key(subject_cfg: Dict[str, Any]) -> frozenset:
+    # Tool availability depends only on which bindings are set, so that is the cache key.
+    return frozenset(k for k, v in (subject_cfg.get("bindings") or {}).items() if v)
+
 def _available_tools(subject_cfg: Dict[str, Any]) -> List[str]:
+    return list(_available_tools_for(_bindings_key(subject_cfg)))
+
+@lru_cache(maxsize=64)
+def _available_tools_for(bindings: frozenset) -> Tuple[str, ...]:
     tools: List[str] = []
-    bindings = subject_cfg.get("bindings", {})
-    if bindings.get("log_store"):
+    if "log_store" in bindings:
         tools.append("query_logs")
-    if bindings.get("alerting"):
+    if "alerting" in bindings:
         tools.append("list_alerts")
-    if bindings.get("runtime"):
+    if "runtime" in bindings:
         tools.append("query_k8s_logs")
         tools.append("list_k8s_events")
-    if bindings.get("deploy_tracker"):
+    if "deploy_tracker" in bindings:
         tools.append("list_deployments")
         tools.append("get_deployment_metadata")
-    if bindings.get("build_tracker"):
+    if "build_tracker" in bindings:
         tools.append("list_builds")
         tools.append("get_build_metadata")
-    if bindings.get("vcs"):
+    if "vcs" in bindings:
         tools.append("list_changes")
-    if bindings.get("metrics_store"):
+    if "metrics_store" in bindings:
         tools.append("query_metrics")
-    if bindings.get("trace_store"):
+    if "trace_store" in bindings:
         tools.append("query_traces")
-    return tools
+    if "metrics_store" in bindings and "trace_store" in bindings:
+        tools.append("observability_snapshot")
+    return tuple(tools)
+
+# Evidence kind each collection tool produces, in the order missing kinds are reported.
+_TOOL_EVIDENCE_KIND = {
+    "query_logs": "log",
+    "query_k8s_logs": "log",
+    "list_alerts": "alert",
+    "list_k8s_events": "event",
+    "list_deployments": "deployment",
+    "list_builds": "build",
+    "list_changes": "change",
+    "query_metrics": "metric",
+    "query_traces": "trace",
+}
 
 def _missing_evidence_kinds(available_tools: List[str], evidence: List[EvidenceItem]) -> List[str]:
     kinds = {e.kind for e in evidence}
-    missing = []
-    if "query_logs" in available_tools and "log" not in kinds:
-        missing.append("log")
-    if "query_k8s_logs" in available_tools and "log" not in kinds:
-        missing.append("log")
-    if "list_alerts" in available_tools and "alert" not in kinds:
-        missing.append("alert")
-    if "list_k8s_events" in available_tools and "event" not in kinds:
-        missing.append("event")
-    if "list_deployments" in available_tools and "deployment" not in kinds:
-        missing.append("deployment")
-    if "list_builds" in available_tools and "build" not in kinds:
-        missing.append("build")
-    if "list_changes" in available_tools and "change" not in kinds:
-        missing.append("change")
-    if "query_metrics" in available_tools and "metric" not in kinds:
-        missing.append("metric")
-    if "query_traces" in available_tools and "trace" not in kinds:
-        missing.append("trace")
-    return missing
+    available = set(available_tools)
+    # dict.fromkeys keeps the table order and reports a kind once even if two tools produce it.
+    return list(dict.fromkeys(
+        kind for tool, kind in _TOOL_EVIDENCE_KIND.items() if tool in available and kind not in kinds
+    ))
 
 def _fallback_plan(available_tools: List[str], missing: List[str]) -> List[Dict[str, Any]]:
     plan: List[Dict[str, Any]] = []
@@ -536,10 +1062,14 @@ def _fallback_plan(available_tools: List[str], missing: List[str]) -> List[Dict[
     return plan
 
 def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Shared across incidents with the same bindings profile; callers must not mutate the schemas.
+    return _tool_schemas_for(_bindings_key(subject_cfg))
+
+@lru_cache(maxsize=64)
+def _tool_schemas_for(bindings: frozenset) -> List[Dict[str, Any]]:
     tools = []
-    bindings = subject_cfg.get("bindings", {})
 
-    if bindings.get("log_store"):
+    if "log_store" in bindings:
         tools.append({
             "type": "function",
             "function": {
@@ -556,7 +1086,7 @@ def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 },
             },
         })
-    if bindings.get("runtime"):
+    if "runtime" in bindings:
         tools.append({
             "type": "function",
             "function": {
@@ -573,7 +1103,7 @@ def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 },
             },
         })
-    if bindings.get("alerting"):
+    if "alerting" in bindings:
         tools.append({
             "type": "function",
             "function": {
@@ -603,7 +1133,7 @@ def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 },
             },
         })
-    if bindings.get("deploy_tracker"):
+    if "deploy_tracker" in bindings:
         tools.append({
             "type": "function",
             "function": {
@@ -631,7 +1161,7 @@ def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 },
             },
         })
-    if bindings.get("vcs"):
+    if "vcs" in bindings:
         tools.append({
             "type": "function",
             "function": {
@@ -648,7 +1178,7 @@ def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 },
             },
         })
-    if bindings.get("build_tracker"):
+    if "build_tracker" in bindings:
         tools.append({
             "type": "function",
             "function": {
@@ -676,115 +1206,276 @@ def _tool_schemas(subject_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
                 },
             },
         })
-    if bindings.get("metrics_store"):
+    metrics_params = {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "step_seconds": {"type": "integer", "minimum": 10, "maximum": 600},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 200},
+        },
+        "required": ["query"],
+    }
+    trace_params = {
+        "type": "object",
+        "properties": {
+            "service_name": {"type": "string"},
+            "limit": {"type": "integer", "minimum": 1, "maximum": 100},
+        },
+    }
+    if "metrics_store" in bindings:
         tools.append({
             "type": "function",
             "function": {
                 "name": "query_metrics",
                 "description": "Query metrics in the incident time window.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string"},
-                        "step_seconds": {"type": "integer", "minimum": 10, "maximum": 600},
-                        "limit": {"type": "integer", "minimum": 1, "maximum": 200},
-                    },
-                    "required": ["query"],
-                },
+                "parameters": metrics_params,
             },
         })
-    if bindings.get("trace_store"):
+    if "trace_store" in bindings:
         tools.append({
             "type": "function",
             "function": {
                 "name": "query_traces",
                 "description": "Search traces for the incident time window.",
+                "parameters": trace_params,
+            },
+        })
+    if "metrics_store" in bindings and "trace_store" in bindings:
+        tools.append({
+            "type": "function",
+            "function": {
+                "name": "observability_snapshot",
+                "description": "Query metrics and search traces for the incident time window in one call. Prefer this over separate query_metrics and query_traces calls when both are needed.",
                 "parameters": {
                     "type": "object",
-                    "properties": {
-                        "service_name": {"type": "string"},
-                        "limit": {"type": "integer", "minimum": 1, "maximum": 100},
-                    },
+                    "properties": {"metrics": metrics_params, "traces": trace_params},
+                    "required": ["metrics"],
                 },
             },
         })
     return tools
 
-def _execute_planned_action(action: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
-    tool = action.get("tool")
-    args = action.get("args") or {}
-    return _execute_tool_call(tool, args, incident, subject_cfg, registry)
-
-def _execute_tool_call(tool: str, args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
-    if tool == "query_logs":
-        return _call_query_logs(args, incident, subject_cfg, registry)
-    if tool == "query_k8s_logs":
-        return _call_query_k8s_logs(args, incident, subject_cfg, registry)
-    if tool == "list_alerts":
-        return _call_list_alerts(args, incident, subject_cfg, registry)
-    if tool == "list_k8s_events":
-        return _call_list_k8s_events(args, incident, subject_cfg, registry)
-    if tool == "list_deployments":
-        return _call_list_deployments(args, incident, subject_cfg, registry)
-    if tool == "get_deployment_metadata":
-        return _call_get_deployment_metadata(args, subject_cfg, registry)
-    if tool == "list_changes":
-        return _call_list_changes(args, incident, subject_cfg, registry)
-    if tool == "list_builds":
-        return _call_list_builds(args, incident, subject_cfg, registry)
-    if tool == "get_build_metadata":
-        return _call_get_build_metadata(args, subject_cfg, registry)
-    if tool == "query_metrics":
-        return _call_query_metrics(args, incident, subject_cfg, registry)
-    if tool == "query_traces":
-        return _call_query_traces(args, incident, subject_cfg, registry)
-    return None
+class _ToolLatency:
+    """
+    Records one tool call's latency exactly once. A thread-backed call cannot be stopped at the
+    round's deadline, so whichever comes first wins: the call returning (ok/error) or the round
+    giving up on it (timeout). The loser's record is skipped.
+    """
+    def __init__(self, tool: str, incident: IncidentInput):
+        self.tool = tool
+        self.incident = incident
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._recorded = False
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            if self._recorded:
+                return
+            self._recorded = True
+        _record_tool_latency(self.tool, self.incident, outcome, time.perf_counter() - self.started)
+
+def _execute_tool_call(tool: str, args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry, latency: Optional[_ToolLatency] = None):
+    call = _TOOL_DISPATCH.get(tool)
+    if call is None:
+        return None
+    latency = latency or _ToolLatency(tool, incident)
+    outcome = "error"
+    try:
+        result = call(args, incident, subject_cfg, registry)
+        outcome = "ok"
+        return result
+    finally:
+        latency.record(outcome)
+
+async def _atimed_tool_call(acall: Callable[..., Any], tool: str, args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        result = await acall(args, incident, subject_cfg, registry)
+        outcome = "ok"
+        return result
+    except asyncio.CancelledError:
+        # wait_for cancels the call when the round's deadline passes.
+        outcome = "timeout"
+        raise
+    finally:
+        _record_tool_latency(tool, incident, outcome, time.perf_counter() - started)
+
+def _record_tool_latency(tool: str, incident: IncidentInput, outcome: str, seconds: float) -> None:
+    TOOL_LATENCY.observe((tool, incident.subject, incident.environment, outcome), seconds)
+    TRACER.emit({"event": "tool_call", "tool": tool, "outcome": outcome, "duration_ms": round(seconds * 1000, 1)})
+
+async def _aexecute_tool_call(tool: str, args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
+    acall = _ATOOL_DISPATCH.get(tool)
+    if acall is not None:
+        return await asyncio.wait_for(_atimed_tool_call(acall, tool, args, incident, subject_cfg, registry), timeout=_tool_timeout(subject_cfg))
+    # A thread-backed call keeps running after the timeout, but the round no longer waits for it.
+    latency = _ToolLatency(tool, incident)
+    try:
+        return await asyncio.wait_for(
+            asyncio.to_thread(_execute_tool_call, tool, args, incident, subject_cfg, registry, latency),
+            timeout=_tool_timeout(subject_cfg),
+        )
+    except asyncio.TimeoutError:
+        latency.record("timeout")
+        raise
+
+def _tool_timeout(subject_cfg: Dict[str, Any]) -> float:
+    return float(subject_cfg.get("tool_timeout_seconds") or settings.tool_timeout_seconds)
+
+def _deadline_outcomes(futures: List[Any], latencies: List[_ToolLatency], timeout: float) -> List[Any]:
+    # Calls run concurrently, so they share one deadline; whatever is still running is reported (and
+    # its latency recorded) as a timeout.
+    deadline = time.monotonic() + timeout
+    outcomes = []
+    for future, latency in zip(futures, latencies):
+        outcome = _future_outcome(future, max(0.0, deadline - time.monotonic()))
+        if isinstance(outcome, TimeoutError):
+            latency.record("timeout")
+        outcomes.append(outcome)
+    return outcomes
+
+TOOL_CALL_WORKERS = 8
+
+def _run_tool_calls(calls: List[Tuple[str, Dict[str, Any]]], incident: IncidentInput, subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
+    """
+    Executes independent tool calls concurrently and returns their evidence in call order.
+    A failing provider is traced and skipped so it does not drop the other results.
+    """
+    calls = _unique_calls(calls)
+    if not calls:
+        return []
+    pool = ThreadPoolExecutor(max_workers=min(TOOL_CALL_WORKERS, len(calls)))
+    latencies = [_ToolLatency(name, incident) for name, _ in calls]
+    try:
+        futures = [
+            pool.submit(_execute_tool_call, name, args, incident, subject_cfg, registry, latency)
+            for (name, args), latency in zip(calls, latencies)
+        ]
+        outcomes = _deadline_outcomes(futures, latencies, _tool_timeout(subject_cfg))
+    finally:
+        # Do not wait for calls that missed the deadline.
+        pool.shutdown(wait=False, cancel_futures=True)
+    return _tool_results(calls, outcomes)
+
+async def _arun_tool_calls(calls: List[Tuple[str, Dict[str, Any]]], incident: IncidentInput, subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
+    # Async counterpart of _run_tool_calls: all calls are in flight together on the event loop.
+    calls = _unique_calls(calls)
+    outcomes = await asyncio.gather(
+        *(_aexecute_tool_call(name, args, incident, subject_cfg, registry) for name, args in calls),
+        return_exceptions=True,
+    )
+    return _tool_results(calls, list(outcomes))
+
+def _unique_calls(calls: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    # The model sometimes repeats an identical call within one round; run each (tool, args) once.
+    unique: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    for name, args in calls:
+        unique.setdefault(request_key(name, args), (name, args))
+    return list(unique.values())
 
-def _maybe_fetch_deploy_metadata(evidence: List[EvidenceItem], subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
-    deploy_id = subject_cfg.get("bindings", {}).get("deploy_tracker")
-    if not deploy_id:
-        return evidence
-    if any(e.kind == "deployment" and "metadata" in (e.tags or []) for e in evidence):
+def _future_outcome(future, timeout: Optional[float] = None) -> Any:
+    try:
+        return future.result(timeout=timeout)
+    except Exception as exc:
+        return exc
+
+def _tool_results(calls: List[Tuple[str, Dict[str, Any]]], outcomes: List[Any]) -> List[EvidenceItem]:
+    # Outcomes are evidence, None, or the exception a provider raised; failures are traced and skipped.
+    results: List[EvidenceItem] = []
+    for (name, _), outcome in zip(calls, outcomes):
+        if isinstance(outcome, TimeoutError):
+            TRACER.emit({"event": "tool_call_timeout", "tool": name})
+            continue
+        if isinstance(outcome, Exception):
+            TRACER.emit({"event": "tool_call_failed", "tool": name, "error": str(outcome)})
+            continue
+        if isinstance(outcome, list):
+            results.extend(outcome)
+        elif outcome:
+            results.append(outcome)
+    return results
+
+def _fetch_followup_metadata(evidence: List[EvidenceItem], subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
+    fetches = [
+        fetch for fetch, binding, kind, refs_key in _FOLLOWUP_METADATA
+        if subject_cfg.get("bindings", {}).get(binding) and _metadata_ref(evidence, kind, refs_key)
+    ]
+    if len(fetches) < 2:
+        # Most rounds need at most one lookup; only start threads when there is something to overlap.
+        for fetch in fetches:
+            evidence = fetch(evidence, subject_cfg, registry)
         return evidence
-    refs: List[str] = []
+    # Deploy and build metadata come from different providers, so fetch them side by side.
+    with ThreadPoolExecutor(max_workers=len(fetches)) as pool:
+        futures = [pool.submit(fetch, list(evidence), subject_cfg, registry) for fetch in fetches]
+    base = len(evidence)
+    return evidence + [item for f in futures for item in f.result()[base:]]
+
+def _metadata_ref(evidence: List[EvidenceItem], kind: str, refs_key: str) -> Optional[str]:
+    # The first ref listed by a `kind` item, or None when metadata for that kind was already fetched.
+    # A single scan: a metadata item anywhere in the list wins over a ref seen earlier.
+    ref = None
     for e in evidence:
-        if e.kind != "deployment":
+        if e.kind != kind:
             continue
-        refs = (e.top_signals or {}).get("deployment_refs") or []
-        if refs:
-            break
-    if not refs:
+        if "metadata" in (e.tags or []):
+            return None
+        if ref is None:
+            refs = (e.top_signals or {}).get(refs_key)
+            if refs:
+                ref = refs[0]
+    return ref
+
+# Deployment/build metadata for a ref rarely changes; re-runs and alert fan-outs for the same
+# rollout reuse it instead of calling the tracker again.
+METADATA_CACHE_TTL_SECONDS = 120
+METADATA_FAILURE_TTL_SECONDS = 15
+_METADATA_CACHE = TTLCache(maxsize=1024, ttl_seconds=METADATA_CACHE_TTL_SECONDS)
+_METADATA_FAILED = object()
+
+def _maybe_fetch_metadata(
+    evidence: List[EvidenceItem],
+    subject_cfg: Dict[str, Any],
+    registry,
+    binding: str,
+    kind: str,
+    refs_key: str,
+    method: str,
+) -> List[EvidenceItem]:
+    provider_id = subject_cfg.get("bindings", {}).get(binding)
+    if not provider_id:
         return evidence
-    deploy_provider = registry.get(deploy_id)
-    try:
-        meta = deploy_provider.get_deployment_metadata(refs[0])
+    ref = _metadata_ref(evidence, kind, refs_key)
+    if ref is None:
+        return evidence
+    key = (provider_id, method, ref)
+    meta = _METADATA_CACHE.get(key)
+    if meta is None:
+        try:
+            meta = getattr(registry.get(provider_id), method)(ref)
+        except Exception:
+            # Remember the failure briefly so a failing backend is not retried by every incident.
+            _METADATA_CACHE.set(key, _METADATA_FAILED, ttl_seconds=METADATA_FAILURE_TTL_SECONDS)
+            return evidence
+        _METADATA_CACHE.set(key, meta)
+    if meta is not _METADATA_FAILED:
         evidence.append(meta)
-    except Exception:
-        pass
     return evidence
 
+def _maybe_fetch_deploy_metadata(evidence: List[EvidenceItem], subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
+    return _maybe_fetch_metadata(
+        evidence, subject_cfg, registry, "deploy_tracker", "deployment", "deployment_refs", "get_deployment_metadata"
+    )
+
 def _maybe_fetch_build_metadata(evidence: List[EvidenceItem], subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
-    build_id = subject_cfg.get("bindings", {}).get("build_tracker")
-    if not build_id:
-        return evidence
-    if any(e.kind == "build" and "metadata" in (e.tags or []) for e in evidence):
-        return evidence
-    refs: List[str] = []
-    for e in evidence:
-        if e.kind != "build":
-            continue
-        refs = (e.top_signals or {}).get("build_refs") or []
-        if refs:
-            break
-    if not refs:
-        return evidence
-    build_provider = registry.get(build_id)
-    try:
-        meta = build_provider.get_build_metadata(refs[0])
-        evidence.append(meta)
-    except Exception:
-        pass
-    return evidence
+    return _maybe_fetch_metadata(evidence, subject_cfg, registry, "build_tracker", "build", "build_refs", "get_build_metadata")
+
+_FOLLOWUP_METADATA = (
+    (_maybe_fetch_deploy_metadata, "deploy_tracker", "deployment", "deployment_refs"),
+    (_maybe_fetch_build_metadata, "build_tracker", "build", "build_refs"),
+)
 
 def _call_query_logs(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
     log_provider_id = subject_cfg["bindings"]["log_store"]
@@ -871,9 +1562,13 @@ def _call_list_deployments(args: Dict[str, Any], incident: IncidentInput, subjec
         time_range=tr,
         limit=int(args.get("limit") or 20),
     )
+    # Providers that can enrich the listing with run metadata save the follow-up metadata fetch.
+    list_with_metadata = getattr(deploy_provider, "list_deployments_with_metadata", None)
+    if list_with_metadata is not None:
+        return list_with_metadata(req, enrich_top=1)
     return deploy_provider.list_deployments(req)
 
-def _call_get_deployment_metadata(args: Dict[str, Any], subject_cfg: Dict[str, Any], registry):
+def _call_get_deployment_metadata(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
     deploy_id = subject_cfg["bindings"].get("deploy_tracker")
     if not deploy_id:
         return None
@@ -919,7 +1614,7 @@ def _call_list_builds(args: Dict[str, Any], incident: IncidentInput, subject_cfg
     )
     return build_provider.list_builds(req)
 
-def _call_get_build_metadata(args: Dict[str, Any], subject_cfg: Dict[str, Any], registry):
+def _call_get_build_metadata(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
     build_id = subject_cfg["bindings"].get("build_tracker")
     if not build_id:
         return None
@@ -934,61 +1629,124 @@ def _call_query_metrics(args: Dict[str, Any], incident: IncidentInput, subject_c
     if not metrics_id:
         return None
     metrics_provider = registry.get(metrics_id)
-    query = args.get("query") or f'up{{service="{incident.subject}"}}'
-    req = MetricsQueryRequest(
+    return metrics_provider.query_range(_metrics_request(args, incident))
+
+# Defaults for tool arguments the model omits or sends as null/0 (hence `or`, not .get(key, default)).
+# The default PromQL is specialized once per subject and reused across calls and incidents.
+_default_metrics_query = lru_cache(maxsize=256)('up{{service="{}"}}'.format)
+DEFAULT_METRICS_STEP_SECONDS = 60
+DEFAULT_METRICS_LIMIT = 50
+DEFAULT_TRACE_LIMIT = 20
+
+# Metrics and trace requests are built on every tool call: the incident fields are already validated
+# and the LLM-supplied args are coerced here, so the per-call model validation is skipped.
+def _metrics_request(args: Dict[str, Any], incident: IncidentInput) -> MetricsQueryRequest:
+    query = args.get("query")
+    return MetricsQueryRequest.model_construct(
         subject=incident.subject,
         environment=incident.environment,
         time_range=incident.time_range,
-        query=query,
-        step_seconds=int(args.get("step_seconds") or 60),
-        limit=int(args.get("limit") or 50),
+        query=str(query) if query else _default_metrics_query(incident.subject),
+        step_seconds=int(args.get("step_seconds") or DEFAULT_METRICS_STEP_SECONDS),
+        limit=int(args.get("limit") or DEFAULT_METRICS_LIMIT),
     )
-    return metrics_provider.query_range(req)
 
 def _call_query_traces(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
     trace_id = subject_cfg["bindings"].get("trace_store")
     if not trace_id:
         return None
     trace_provider = registry.get(trace_id)
-    req = TraceQueryRequest(
+    return trace_provider.search_traces(_traces_request(args, incident))
+
+def _traces_request(args: Dict[str, Any], incident: IncidentInput) -> TraceQueryRequest:
+    service_name = args.get("service_name")
+    return TraceQueryRequest.model_construct(
         subject=incident.subject,
         environment=incident.environment,
         time_range=incident.time_range,
-        service_name=args.get("service_name"),
-        limit=int(args.get("limit") or 20),
+        service_name=str(service_name) if service_name else None,
+        limit=int(args.get("limit") or DEFAULT_TRACE_LIMIT),
     )
-    return trace_provider.search_traces(req)
 
-def _derive_what_changed(evidence: List[EvidenceItem]) -> Dict[str, Any]:
-    deploys = []
-    builds = []
-    changes = []
-    for e in evidence:
-        if e.kind == "deployment":
-            deploys.append(e.top_signals)
-        elif e.kind == "build":
-            builds.append(e.top_signals)
-        elif e.kind == "change":
-            changes.append(e.top_signals)
-    return {
-        "deployments": deploys,
-        "builds": builds,
-        "changes": changes,
-    }
+async def _acall_query_metrics(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
+    metrics_id = subject_cfg["bindings"].get("metrics_store")
+    if not metrics_id:
+        return None
+    metrics_provider = registry.get(metrics_id)
+    req = _metrics_request(args, incident)
+    aquery_range = getattr(metrics_provider, "aquery_range", None)
+    if aquery_range is None:
+        return await asyncio.to_thread(metrics_provider.query_range, req)
+    return await aquery_range(req)
 
-def _derive_impact_scope(evidence: List[EvidenceItem]) -> Dict[str, Any]:
+async def _acall_query_traces(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry):
+    trace_id = subject_cfg["bindings"].get("trace_store")
+    if not trace_id:
+        return None
+    trace_provider = registry.get(trace_id)
+    req = _traces_request(args, incident)
+    asearch_traces = getattr(trace_provider, "asearch_traces", None)
+    if asearch_traces is None:
+        return await asyncio.to_thread(trace_provider.search_traces, req)
+    return await asearch_traces(req)
+
+def _snapshot_calls(args: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    return [("query_metrics", args.get("metrics") or {}), ("query_traces", args.get("traces") or {})]
+
+def _call_observability_snapshot(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
+    # Metrics and traces share the incident window; query both backends side by side and return both items.
+    calls = _snapshot_calls(args)
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(_execute_tool_call, name, call_args, incident, subject_cfg, registry) for name, call_args in calls]
+    return _tool_results(calls, [_future_outcome(f) for f in futures])
+
+async def _acall_observability_snapshot(args: Dict[str, Any], incident: IncidentInput, subject_cfg: Dict[str, Any], registry) -> List[EvidenceItem]:
+    return await _arun_tool_calls(_snapshot_calls(args), incident, subject_cfg, registry)
+
+# Tool name -> collector; every collector takes (args, incident, subject_cfg, registry) and returns
+# an EvidenceItem, a list of them (fused tools), or None.
+_TOOL_DISPATCH: Dict[str, Callable[..., Any]] = {
+    "query_logs": _call_query_logs,
+    "query_k8s_logs": _call_query_k8s_logs,
+    "list_alerts": _call_list_alerts,
+    "list_k8s_events": _call_list_k8s_events,
+    "list_deployments": _call_list_deployments,
+    "get_deployment_metadata": _call_get_deployment_metadata,
+    "list_changes": _call_list_changes,
+    "list_builds": _call_list_builds,
+    "get_build_metadata": _call_get_build_metadata,
+    "query_metrics": _call_query_metrics,
+    "query_traces": _call_query_traces,
+    "observability_snapshot": _call_observability_snapshot,
+}
+
+# Collectors with a native async path; the async graph awaits these on the event loop and runs
+# every other tool in a worker thread.
+_ATOOL_DISPATCH: Dict[str, Callable[..., Any]] = {
+    "query_metrics": _acall_query_metrics,
+    "query_traces": _acall_query_traces,
+    "observability_snapshot": _acall_observability_snapshot,
+}
+
+def _derive_what_changed_and_impact(evidence: List[EvidenceItem]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # One pass over the evidence fills both report sections.
+    what_changed: Dict[str, Any] = {"deployments": [], "builds": [], "changes": []}
     impact: Dict[str, Any] = {"error_signatures": [], "event_reasons": [], "trace_ids": []}
     for e in evidence:
-        if e.kind == "log":
-            sigs = (e.top_signals or {}).get("signatures") or []
-            impact["error_signatures"].extend(sigs)
-        if e.kind == "event":
-            reasons = (e.top_signals or {}).get("reasons") or {}
-            impact["event_reasons"].append(reasons)
-        if e.kind == "trace":
-            trace_ids = (e.top_signals or {}).get("trace_ids") or []
-            impact["trace_ids"].extend(trace_ids)
-    return impact
+        kind = e.kind
+        if kind == "deployment":
+            what_changed["deployments"].append(e.top_signals)
+        elif kind == "build":
+            what_changed["builds"].append(e.top_signals)
+        elif kind == "change":
+            what_changed["changes"].append(e.top_signals)
+        elif kind == "log":
+            impact["error_signatures"].extend((e.top_signals or {}).get("signatures") or [])
+        elif kind == "event":
+            impact["event_reasons"].append((e.top_signals or {}).get("reasons") or {})
+        elif kind == "trace":
+            impact["trace_ids"].extend((e.top_signals or {}).get("trace_ids") or [])
+    return what_changed, impact
 
 def _format_supporting_evidence(top: Hypothesis, evidence: List[EvidenceItem]) -> List[str]:
     ev = {e.id: e for e in evidence}
@@ -1006,18 +1764,173 @@ def _format_supporting_evidence(top: Hypothesis, evidence: List[EvidenceItem]) -
     return out
 
 
-GRAPH = build_graph()
-
+def __getattr__(name: str):
+    # GRAPH / AGRAPH stay importable, but are compiled on first use rather than at import.
+    if name == "GRAPH":
+        return build_graph()
+    if name == "AGRAPH":
+        return build_graph(async_llm=True)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def _reset_after_fork() -> None:
+    # A forked worker must not share the parent's sockets, worker threads or locks: rebuild the pooled
+    # clients and executors, and let graphs, caches and provider registries be recreated on first use.
+    # Nothing here may acquire a lock inherited from the parent (another thread may have held it at
+    # fork time), so every lock-guarded object is rebound rather than cleared.
+    from core.registry import reset_shared_registries_after_fork
+
+    global client, aclient, _batch_dispatcher, _batch_dispatcher_lock, _graphs, _graphs_lock
+    global _LLM_CACHE, _METADATA_CACHE
+    client = _make_openai_client()
+    aclient = _make_async_openai_client()
+    _batch_dispatcher = None
+    _batch_dispatcher_lock = threading.Lock()
+    _graphs = {}
+    _graphs_lock = threading.Lock()
+    _LLM_CACHE = TTLCache(maxsize=2048, ttl_seconds=settings.llm_cache_ttl_seconds)
+    _METADATA_CACHE = TTLCache(maxsize=1024, ttl_seconds=METADATA_CACHE_TTL_SECONDS)
+    reset_shared_registries_after_fork()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+async def warm_up() -> None:
+    """
+    Opens the pooled LLM connections (TCP/TLS, HTTP/2 when available) before the first incident.
+    Uses a model lookup rather than a completion so warming up costs no tokens.
+    """
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(client.models.retrieve, settings.openai_model),
+            aclient.models.retrieve(settings.openai_model),
+        )
+        TRACER.emit({"event": "warm_up"})
+    except Exception as exc:
+        TRACER.emit({"event": "warm_up_failed", "error": str(exc)})
+
+# The compiled graphs are built once per process. Runs read back only the report channel, so LangGraph
+# does not assemble (and copy the evidence lists into) a full final-state dict per request.
+# Entry states are one- or two-key dicts that invoke() copies into channels before the first node runs;
+# nodes return partial updates and never see or retain the caller's dict, so there is nothing worth pooling.
 def run(webhook_payload: dict) -> dict:
     state = {"raw_webhook": webhook_payload}
     TRACER.emit({"event": "run_start"})
-    out = GRAPH.invoke(state)
+    report = build_graph().invoke(state, output_keys="report")
+    TRACER.emit({"event": "run_end"})
+    return report
+
+async def arun(webhook_payload: dict) -> dict:
+    # LLM calls and async-capable providers are awaited on the event loop; other provider calls run in worker threads.
+    state = {"raw_webhook": webhook_payload}
+    TRACER.emit({"event": "run_start"})
+    report = await build_graph(async_llm=True).ainvoke(state, output_keys="report")
     TRACER.emit({"event": "run_end"})
-    return out.get("report", out)
+    return report
+
+def parse_webhook(body: bytes) -> Dict[str, Any]:
+    """Parses a raw webhook body; raises json.JSONDecodeError (or ValueError) on malformed input."""
+    payload = _json_loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("Webhook body must be a JSON object")
+    return payload
+
+def run_bytes(body: bytes) -> dict:
+    return run(parse_webhook(body))
+
+def _incident_state(incident: IncidentInput) -> Dict[str, Any]:
+    # Dumped once for the serialized channel; the caller's model rides along so nodes never rebuild it.
+    return {"incident": incident.model_dump(), "_incident": incident}
 
 def run_incident(incident: IncidentInput) -> dict:
-    state = {"incident": incident.model_dump()}
+    state = _incident_state(incident)
+    TRACER.emit({"event": "run_start"})
+    report = build_graph().invoke(state, output_keys="report")
+    TRACER.emit({"event": "run_end"})
+    return report
+
+async def arun_incident(incident: IncidentInput) -> dict:
+    state = _incident_state(incident)
     TRACER.emit({"event": "run_start"})
-    out = GRAPH.invoke(state)
+    report = await build_graph(async_llm=True).ainvoke(state, output_keys="report")
     TRACER.emit({"event": "run_end"})
-    return out.get("report", out)
+    return report
+
+RUN_INCIDENTS_CONCURRENCY = 8
+
+async def run_incidents(
+    incidents: List[IncidentInput],
+    max_concurrency: int = RUN_INCIDENTS_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> List[Any]:
+    """
+    Runs several incidents concurrently on the async graph, at most `max_concurrency` at a time
+    (or as many as a caller-supplied `semaphore` allows, e.g. a server-wide incident cap).
+    Results are in input order; an incident that fails yields its exception instead of a report
+    so it does not drop the rest of the batch.
+    """
+    semaphore = semaphore or asyncio.Semaphore(max_concurrency)
+
+    async def bounded(incident: IncidentInput) -> dict:
+        async with semaphore:
+            return await arun_incident(incident)
+
+    return list(await asyncio.gather(*(bounded(i) for i in incidents), return_exceptions=True))
+
+async def arun_alerts(
+    webhook_payload: dict,
+    max_concurrency: int = RUN_INCIDENTS_CONCURRENCY,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> List[Any]:
+    """Runs one RCA per alert of a grouped webhook; results follow run_incidents."""
+    return await run_incidents(normalize_alerts(webhook_payload), max_concurrency=max_concurrency, semaphore=semaphore)
+
+def is_grouped_webhook(webhook_payload: dict) -> bool:
+    return len(webhook_payload.get("alerts") or []) > 1
+
+def grouped_reports(results: List[Any]) -> Dict[str, Any]:
+    """
+    Response for a grouped webhook: {"reports": [...]}, one entry per alert in payload order, where
+    an alert whose run failed is {"error": "<type>: <message>"}. If every alert failed the first
+    error is raised, so callers (and the intake retry) treat it like a failed single-alert run.
+    """
+    if results and all(isinstance(r, BaseException) for r in results):
+        raise results[0]
+    return {
+        "reports": [
+            {"error": f"{type(r).__name__}: {r}"} if isinstance(r, BaseException) else r
+            for r in results
+        ]
+    }
+
+def run_webhook(webhook_payload: dict) -> dict:
+    """
+    Sync entry point for a raw webhook (used by the intake worker): a single-alert payload yields its
+    report, a grouped one yields grouped_reports() with the alerts investigated one after another.
+    """
+    if not is_grouped_webhook(webhook_payload):
+        return run(webhook_payload)
+    results: List[Any] = []
+    for incident in normalize_alerts(webhook_payload):
+        try:
+            results.append(run_incident(incident))
+        except Exception as exc:
+            results.append(exc)
+    return grouped_reports(results)
+
+def run_incidents_offline(incidents: List[IncidentInput], max_workers: int = RUN_INCIDENTS_CONCURRENCY) -> List[Any]:
+    """
+    Runs many incidents on the sync graph from a thread pool, for non-interactive work (backlog
+    replay, re-RCA; see scripts/replay_incidents.py). With OPENAI_MODE=batch their LLM calls are
+    submitted side by side and share Batch API jobs. Results and failures are returned in input
+    order like run_incidents.
+    """
+    def run_one(incident: IncidentInput) -> dict:
+        token = _OFFLINE_RUN.set(True)
+        try:
+            return run_incident(incident)
+        finally:
+            _OFFLINE_RUN.reset(token)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, max(1, len(incidents))), thread_name_prefix="offline-rca") as pool:
+        futures = [pool.submit(run_one, incident) for incident in incidents]
+    return [f.exception() or f.result() for f in futures]
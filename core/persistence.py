@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional
 
+from sqlalchemy import insert
+
 from core.config import settings
 from core.db import get_db, init_db
 from datetime import datetime, timezone
 from core.models import IncidentInput, RCAReport
-from core.persistence_models import Action, ActionExecution, AuditEvent, EvidenceItem, Hypothesis, Incident, IncidentReport
+from core.persistence_models import (
+    Action,
+    ActionExecution,
+    AuditEvent,
+    EvidenceItem,
+    Hypothesis,
+    Incident,
+    IncidentReport,
+    _uuid,
+)
 
 
 def persistence_enabled() -> bool:
@@ -15,6 +27,11 @@ def persistence_enabled() -> bool:
 def _parse_rfc3339(ts: str) -> datetime:
     if not ts:
         return datetime.now(timezone.utc)
+    return _parse_rfc3339_cached(ts)
+
+@lru_cache(maxsize=4096)
+def _parse_rfc3339_cached(ts: str) -> datetime:
+    # Evidence rows mostly share the incident window, so save_report parses the same few strings repeatedly.
     dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
@@ -27,12 +44,16 @@ def bootstrap() -> None:
     init_db()
 
 
-def save_report(incident: IncidentInput, report: RCAReport) -> Optional[str]:
+def save_report(incident: IncidentInput, report: RCAReport, report_dump: Optional[dict] = None) -> Optional[str]:
+    # Callers that already hold the serialized report (e.g. the graph output) pass it to skip another model_dump().
     if not persistence_enabled():
         return None
 
     with get_db() as db:
+        # Ids are generated client-side so the report row needs no flush to learn incident_row.id;
+        # the single flush below writes both parent rows before the bulk child inserts reference them.
         incident_row = Incident(
+            id=_uuid(),
             title=incident.title,
             severity=incident.severity,
             environment=incident.environment,
@@ -44,59 +65,71 @@ def save_report(incident: IncidentInput, report: RCAReport) -> Optional[str]:
             raw=incident.raw,
         )
         db.add(incident_row)
+        db.add(
+            IncidentReport(
+                incident_id=incident_row.id,
+                incident_summary=report.incident_summary,
+                report=report_dump if report_dump is not None else report.model_dump(),
+            )
+        )
         db.flush()
 
-        report_row = IncidentReport(
-            incident_id=incident_row.id,
-            incident_summary=report.incident_summary,
-            report=report.model_dump(),
-        )
-        db.add(report_row)
-
-        for ev in report.evidence:
-            db.add(
-                EvidenceItem(
-                    id=ev.id,
-                    incident_id=incident_row.id,
-                    kind=ev.kind,
-                    source=ev.source,
-                    time_start=_parse_rfc3339(ev.time_range.start),
-                    time_end=_parse_rfc3339(ev.time_range.end),
-                    query=ev.query,
-                    summary=ev.summary,
-                    samples=ev.samples,
-                    top_signals=ev.top_signals,
-                    pointers=ev.pointers,
-                    tags=ev.tags,
-                )
+        # One executemany INSERT per table instead of an ORM object (and INSERT) per row.
+        if report.evidence:
+            db.execute(
+                insert(EvidenceItem),
+                [
+                    {
+                        "id": ev.id,
+                        "incident_id": incident_row.id,
+                        "kind": ev.kind,
+                        "source": ev.source,
+                        "time_start": _parse_rfc3339(ev.time_range.start),
+                        "time_end": _parse_rfc3339(ev.time_range.end),
+                        "query": ev.query,
+                        "summary": ev.summary,
+                        "samples": ev.samples,
+                        "top_signals": ev.top_signals,
+                        "pointers": ev.pointers,
+                        "tags": ev.tags,
+                    }
+                    for ev in report.evidence
+                ],
             )
 
         all_hypotheses = [report.top_hypothesis, *report.other_hypotheses]
-        for hyp in all_hypotheses:
-            db.add(
-                Hypothesis(
-                    id=hyp.id,
-                    incident_id=incident_row.id,
-                    statement=hyp.statement,
-                    confidence=hyp.confidence,
-                    score_breakdown=hyp.score_breakdown,
-                    supporting_evidence_ids=hyp.supporting_evidence_ids,
-                    contradictions=hyp.contradictions,
-                    validations=hyp.validations,
-                    is_top=hyp.id == report.top_hypothesis.id,
-                )
-            )
+        db.execute(
+            insert(Hypothesis),
+            [
+                {
+                    "id": hyp.id,
+                    "incident_id": incident_row.id,
+                    "statement": hyp.statement,
+                    "confidence": hyp.confidence,
+                    "score_breakdown": hyp.score_breakdown,
+                    "supporting_evidence_ids": hyp.supporting_evidence_ids,
+                    "contradictions": hyp.contradictions,
+                    "validations": hyp.validations,
+                    "is_top": hyp.id == report.top_hypothesis.id,
+                }
+                for hyp in all_hypotheses
+            ],
+        )
 
-        for validation in report.next_validations:
-            db.add(
-                Action(
-                    incident_id=incident_row.id,
-                    name=validation,
-                    risk="Low",
-                    requires_approval=True,
-                    intent="validation",
-                    payload={},
-                )
+        if report.next_validations:
+            db.execute(
+                insert(Action),
+                [
+                    {
+                        "incident_id": incident_row.id,
+                        "name": validation,
+                        "risk": "Low",
+                        "requires_approval": True,
+                        "intent": "validation",
+                        "payload": {},
+                    }
+                    for validation in report.next_validations
+                ],
             )
 
         return incident_row.id
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, ForeignKey, String, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.types import DateTime
@@ -22,6 +22,7 @@ def _uuid() -> str:
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (Index("ix_incidents_created_at", "created_at"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     title: Mapped[str] = mapped_column(String, nullable=False)
@@ -44,6 +45,7 @@ class Incident(Base):
 
 class IncidentReport(Base):
     __tablename__ = "incident_reports"
+    __table_args__ = (Index("ix_incident_reports_incident_created", "incident_id", "created_at"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     incident_id: Mapped[str] = mapped_column(String, ForeignKey("incidents.id"), nullable=False)
@@ -56,6 +58,7 @@ class IncidentReport(Base):
 
 class EvidenceItem(Base):
     __tablename__ = "evidence_items"
+    __table_args__ = (Index("ix_evidence_items_incident_kind", "incident_id", "kind"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     incident_id: Mapped[str] = mapped_column(String, ForeignKey("incidents.id"), primary_key=True)
@@ -75,6 +78,7 @@ class EvidenceItem(Base):
 
 class Hypothesis(Base):
     __tablename__ = "hypotheses"
+    __table_args__ = (Index("ix_hypotheses_incident", "incident_id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
     incident_id: Mapped[str] = mapped_column(String, ForeignKey("incidents.id"), primary_key=True)
@@ -91,6 +95,7 @@ class Hypothesis(Base):
 
 class Action(Base):
     __tablename__ = "actions"
+    __table_args__ = (Index("ix_actions_incident", "incident_id"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     incident_id: Mapped[str] = mapped_column(String, ForeignKey("incidents.id"), nullable=False)
@@ -106,6 +111,7 @@ class Action(Base):
 
 class ActionExecution(Base):
     __tablename__ = "action_executions"
+    __table_args__ = (Index("ix_action_executions_incident_status", "incident_id", "status"),)
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     incident_id: Mapped[str] = mapped_column(String, ForeignKey("incidents.id"), nullable=False)
@@ -119,6 +125,10 @@ class ActionExecution(Base):
 
 class AuditEvent(Base):
     __tablename__ = "audit_events"
+    __table_args__ = (
+        Index("ix_audit_events_created_at", "created_at"),
+        Index("ix_audit_events_incident", "incident_id"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
     incident_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -126,3 +136,18 @@ class AuditEvent(Base):
     action: Mapped[str] = mapped_column(String, nullable=False)
     detail = Column(JSONB, default=dict)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+
+
+class WebhookIntake(Base):
+    __tablename__ = "webhook_intake"
+    __table_args__ = (Index("ix_webhook_intake_status_next_attempt", "status", "next_attempt_at"),)
+
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=_uuid)
+    payload = Column(JSONB, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
@@ -8,25 +8,16 @@ Constraints:
 - If evidence is insufficient, say so and list what evidence would reduce uncertainty.
 """
 
-PLAN_TASK = """Using the incident context, knowledge-base slice, and any evidence already collected:
-- Propose an ordered evidence collection plan.
+COLLECT_TASK = """Using the incident context, knowledge-base slice, and any evidence already collected:
+- Decide which evidence to collect next and call the matching tools directly; issue independent calls together.
 - Prefer collecting missing evidence types first (logs, deployments, changes) when available.
-- Keep actions vendor-neutral (refer to tool names only).
-- Avoid redundant actions already covered by existing evidence.
-Return strict JSON with this shape:
-{
-  "actions": [
-    {"tool": "query_logs", "args": {"intent": "signature_counts", "limit": 200}},
-    {"tool": "query_logs", "args": {"intent": "samples", "limit": 80}},
-    {"tool": "list_deployments", "args": {"window_minutes_before": 30, "window_minutes_after": 30, "limit": 20}},
-    {"tool": "list_changes", "args": {"window_minutes_before": 360, "include_prs": true, "include_commits": false, "limit": 30}}
-  ]
-}
+- Keep arguments vendor-neutral.
+- Avoid redundant calls already covered by existing evidence.
 """
 
-EVIDENCE_TOOL_SYSTEM = """You are an evidence collection coordinator.
-You MUST call tools to collect evidence when actions are provided.
-Return no narrative text; only tool calls when tools are required."""
+EVIDENCE_TOOL_SYSTEM = """You are an evidence collection coordinator for an SRE investigation.
+Plan the next evidence to collect and request it by calling tools; do not describe the plan.
+Return no narrative text; only tool calls."""
 
 HYPOTHESIS_TASK = """Using the incident context, a knowledge-base slice, and evidence items:
 - Produce 3–5 root-cause hypotheses.
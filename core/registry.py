@@ -1,6 +1,14 @@
 from __future__ import annotations
-from typing import Any, Dict, Protocol
+import asyncio
+import functools
+import inspect
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import Any, Dict, Optional, Protocol, Tuple
 
+from core.cache import TTLCache, request_key
 from core.models import (
     EvidenceItem,
     LogQueryRequest,
@@ -23,6 +31,10 @@ class DeployTrackerProvider(Protocol):
     def list_deployments(self, req: DeployQueryRequest) -> EvidenceItem: ...
     def get_deployment_metadata(self, deployment_ref: str) -> EvidenceItem: ...
 
+class DeployTrackerWithMetadataProvider(DeployTrackerProvider, Protocol):
+    # Optional capability: list runs and enrich the newest ones with metadata in one call.
+    def list_deployments_with_metadata(self, req: DeployQueryRequest, enrich_top: int = 1) -> EvidenceItem: ...
+
 class VCSProvider(Protocol):
     def list_changes(self, req: ChangeQueryRequest) -> EvidenceItem: ...
 
@@ -33,9 +45,16 @@ class BuildTrackerProvider(Protocol):
 class MetricsStoreProvider(Protocol):
     def query_range(self, req: MetricsQueryRequest) -> EvidenceItem: ...
 
+class AsyncMetricsStoreProvider(MetricsStoreProvider, Protocol):
+    # Optional capability: native async query used by the async graph instead of a worker thread.
+    async def aquery_range(self, req: MetricsQueryRequest) -> EvidenceItem: ...
+
 class TraceStoreProvider(Protocol):
     def search_traces(self, req: TraceQueryRequest) -> EvidenceItem: ...
 
+class AsyncTraceStoreProvider(TraceStoreProvider, Protocol):
+    async def asearch_traces(self, req: TraceQueryRequest) -> EvidenceItem: ...
+
 class AlertingProvider(Protocol):
     def list_alerts(self, req: AlertQueryRequest) -> EvidenceItem: ...
 
@@ -43,8 +62,215 @@ class RuntimeProvider(Protocol):
     def get_logs(self, req: K8sLogQueryRequest) -> EvidenceItem: ...
     def get_events(self, req: EventQueryRequest) -> EvidenceItem: ...
 
+# ---- Caching wrapper ----
+
+class CachingProvider:
+    """
+    Wraps a provider instance and memoizes its public methods for a short TTL, keyed by
+    method name and a canonical hash of the arguments. Providers opt in from the catalog
+    with `cache_ttl_seconds` on the provider instance.
+
+    Like the other wrappers below, each method is wrapped once on first access and stored on
+    the instance, so later calls skip __getattr__ and the wrapper chain is not rebuilt per call.
+    """
+    def __init__(self, inner: Any, ttl_seconds: float = 60.0, maxsize: int = 256):
+        self._inner = inner
+        self._cache = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        if inspect.iscoroutinefunction(attr):
+            async def acached(*args, **kwargs):
+                key = request_key(name, list(args), kwargs)
+                hit = self._cache.get(key)
+                if hit is not None:
+                    return hit
+                result = await attr(*args, **kwargs)
+                if result is not None:
+                    self._cache.set(key, result)
+                return result
+
+            self.__dict__[name] = acached
+            return acached
+
+        def cached(*args, **kwargs):
+            key = request_key(name, list(args), kwargs)
+            hit = self._cache.get(key)
+            if hit is not None:
+                return hit
+            result = attr(*args, **kwargs)
+            if result is not None:
+                self._cache.set(key, result)
+            return result
+
+        self.__dict__[name] = cached
+        return cached
+
+# ---- Concurrency / rate limiting wrapper ----
+
+class RateLimiter:
+    """Token bucket: allows `rate_per_second` calls per second with bursts up to `burst`."""
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self._rate = rate_per_second
+        self._capacity = float(max(1, burst))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while (wait := self._try_take()) > 0:
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        while (wait := self._try_take()) > 0:
+            await asyncio.sleep(wait)
+
+    def _try_take(self) -> float:
+        # Takes a token and returns 0, or returns how long to wait before one is available.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self._rate
+
+class LimitedProvider:
+    """
+    Wraps a provider instance so its public methods run at most `max_concurrency` at a time
+    and, with `rate_per_second`, no faster than that rate. Limits are per provider instance and
+    shared by every incident using the same registry. Providers opt in from the catalog with
+    `max_concurrency` and/or `rate_per_second` on the provider instance. Coroutine methods
+    wait on an asyncio semaphore (one per event loop) so they never block the loop.
+    """
+    def __init__(self, inner: Any, max_concurrency: Optional[int] = None, rate_per_second: Optional[float] = None):
+        self._inner = inner
+        self._max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._limiter = RateLimiter(rate_per_second) if rate_per_second else None
+
+    def _async_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if not self._max_concurrency:
+            return None
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self._max_concurrency)
+        return semaphore
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        if inspect.iscoroutinefunction(attr):
+            async def alimited(*args, **kwargs):
+                semaphore = self._async_semaphore()
+                if semaphore is None:
+                    if self._limiter is not None:
+                        await self._limiter.aacquire()
+                    return await attr(*args, **kwargs)
+                async with semaphore:
+                    if self._limiter is not None:
+                        await self._limiter.aacquire()
+                    return await attr(*args, **kwargs)
+
+            self.__dict__[name] = alimited
+            return alimited
+
+        def limited(*args, **kwargs):
+            if self._semaphore is None:
+                if self._limiter is not None:
+                    self._limiter.acquire()
+                return attr(*args, **kwargs)
+            with self._semaphore:
+                if self._limiter is not None:
+                    self._limiter.acquire()
+                return attr(*args, **kwargs)
+
+        self.__dict__[name] = limited
+        return limited
+
+# ---- In-flight coalescing wrapper ----
+
+class CoalescingProvider:
+    """
+    Wraps a provider instance so identical calls that are already in flight share one backend
+    request: the first caller runs it and concurrent callers with the same method and arguments
+    wait for its result (or exception). Unlike CachingProvider nothing is kept once the call
+    finishes. Providers opt in from the catalog with `coalesce_inflight: true`; metrics and
+    trace stores are coalesced unless it is set to false.
+    """
+    def __init__(self, inner: Any):
+        self._inner = inner
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[Tuple[int, str], "asyncio.Future[Any]"] = {}
+
+    def _forget(self, key: Tuple[int, str], task: "asyncio.Future[Any]") -> None:
+        if self._ainflight.get(key) is task:
+            del self._ainflight[key]
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._inner, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        if inspect.iscoroutinefunction(attr):
+            async def acoalesced(*args, **kwargs):
+                # asyncio futures belong to one loop, so in-flight calls are keyed by loop as well.
+                key = (id(asyncio.get_running_loop()), request_key(name, list(args), kwargs))
+                task = self._ainflight.get(key)
+                if task is None:
+                    task = self._ainflight[key] = asyncio.ensure_future(attr(*args, **kwargs))
+                    task.add_done_callback(functools.partial(self._forget, key))
+                # Shielded so one cancelled caller does not cancel the request for the others.
+                return await asyncio.shield(task)
+
+            self.__dict__[name] = acoalesced
+            return acoalesced
+
+        def coalesced(*args, **kwargs):
+            key = request_key(name, list(args), kwargs)
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    future: Future = Future()
+                    self._inflight[key] = future
+            if pending is not None:
+                return pending.result()
+            try:
+                result = attr(*args, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        self.__dict__[name] = coalesced
+        return coalesced
+
 # ---- Registry ----
 
+# Read-only query backends the collector tends to re-ask with identical queries while it iterates on
+# hypotheses; their responses are cached briefly unless the catalog sets cache_ttl_seconds (0 disables).
+DEFAULT_CACHE_TTL_SECONDS: Dict[str, float] = {
+    "metrics_store": 30.0,
+    "trace_store": 30.0,
+}
+# The same backends also share identical in-flight queries (e.g. concurrent incidents on one subject)
+# unless the catalog sets coalesce_inflight: false.
+DEFAULT_COALESCE_CATEGORIES = frozenset({"metrics_store", "trace_store"})
+
 class ProviderRegistry:
     """
     Core does NOT import vendor SDKs. It loads concrete provider classes via a static mapping
@@ -54,10 +280,19 @@ class ProviderRegistry:
         self._factories = factories  # key like "log_store:loki"
         self._instances_config = instances_config
         self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
 
     def get(self, provider_id: str):
-        if provider_id in self._instances:
-            return self._instances[provider_id]
+        instance = self._instances.get(provider_id)
+        if instance is not None:
+            return instance
+        # Tool calls run on worker threads; build each provider instance only once.
+        with self._lock:
+            if provider_id in self._instances:
+                return self._instances[provider_id]
+            return self._create(provider_id)
+
+    def _create(self, provider_id: str):
 
         cfg = self._instances_config.get(provider_id)
         if not cfg:
@@ -74,5 +309,60 @@ class ProviderRegistry:
             raise KeyError(f"No provider factory registered for '{key}'")
 
         instance = factory(provider_id=provider_id, config=cfg.get("config", {}))
+        max_concurrency = cfg.get("max_concurrency")
+        rate_per_second = cfg.get("rate_per_second")
+        if max_concurrency or rate_per_second:
+            instance = LimitedProvider(
+                instance,
+                max_concurrency=int(max_concurrency) if max_concurrency else None,
+                rate_per_second=float(rate_per_second) if rate_per_second else None,
+            )
+        if cfg.get("coalesce_inflight", category in DEFAULT_COALESCE_CATEGORIES):
+            instance = CoalescingProvider(instance)
+        # Caching wraps the limiter so cache hits never wait for a slot.
+        cache_ttl = cfg.get("cache_ttl_seconds", DEFAULT_CACHE_TTL_SECONDS.get(category))
+        if cache_ttl:
+            instance = CachingProvider(instance, ttl_seconds=float(cache_ttl))
         self._instances[provider_id] = instance
         return instance
+
+# ---- Shared registries ----
+
+_shared_lock = threading.Lock()
+_shared: Dict[str, Tuple[Any, ProviderRegistry]] = {}
+_shared_last: Optional[Tuple[Dict[str, Any], Dict[str, Any], ProviderRegistry]] = None
+
+def shared_registry(factories: Dict[str, Any], instances_config: Dict[str, Any]) -> ProviderRegistry:
+    """
+    Returns one ProviderRegistry per distinct catalog content, so provider instances (and their
+    clients and caches) are reused across incidents. A different factories mapping gets a new registry.
+    """
+    global _shared_last
+    # load_providers_cached hands back the same dict until the catalog changes, so the content hash
+    # is only computed when a different catalog object shows up.
+    last = _shared_last
+    if last is not None and last[0] is instances_config and last[1] is factories:
+        return last[2]
+    key = request_key(instances_config)
+    with _shared_lock:
+        entry = _shared.get(key)
+        if entry is None or entry[0] is not factories:
+            if len(_shared) >= 8:
+                _shared.clear()
+            entry = _shared[key] = (factories, ProviderRegistry(factories=factories, instances_config=instances_config))
+        _shared_last = (instances_config, factories, entry[1])
+        return entry[1]
+
+def clear_shared_registries() -> None:
+    global _shared_last
+    with _shared_lock:
+        _shared.clear()
+        _shared_last = None
+
+def reset_shared_registries_after_fork() -> None:
+    # In a forked child the parent's lock may be held by a thread that no longer exists, so rebind
+    # everything instead of clearing under the lock.
+    global _shared_lock, _shared, _shared_last
+    _shared_lock = threading.Lock()
+    _shared = {}
+    _shared_last = None
@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import Dict, List
+from typing import Dict, List, Sequence
 from core.models import EvidenceItem, Hypothesis, TimeRange
 
 EVIDENCE_TYPES = {"log", "event", "deployment", "change", "build", "metric", "trace"}
+DEPLOY_KINDS = {"deployment", "build"}
 
 def score_hypothesis(
     h: Hypothesis,
@@ -10,18 +11,45 @@ def score_hypothesis(
     incident_time_range: TimeRange | None = None,
     kb_slice: Dict | None = None,
 ) -> Dict[str, float]:
-    ev = {e.id: e for e in evidence}
-    used = [ev.get(eid) for eid in h.supporting_evidence_ids if eid in ev]
+    return _score(h, {e.id: e for e in evidence}, incident_time_range, _kb_indicators(kb_slice))
 
-    kinds = {e.kind for e in used if e}
-    coverage_types = kinds.intersection(EVIDENCE_TYPES)
-    coverage = min(1.0, len(coverage_types) / 4.0)  # 4 distinct signal types => full score
+def _kb_indicators(kb_slice: Dict | None) -> List[str] | None:
+    # None means "no KB slice" (kb_match stays 0.0); an empty list means no indicators matched.
+    if not kb_slice:
+        return None
+    subject_cfg = (kb_slice or {}).get("subject_cfg", {})
+    indicators = []
+    for fm in subject_cfg.get("known_failure_modes", []):
+        indicators.extend(fm.get("indicators") or [])
+    return [ind.lower() for ind in indicators if isinstance(ind, str)]
 
+def _score(
+    h: Hypothesis,
+    ev: Dict[str, EvidenceItem],
+    incident_time_range: TimeRange | None,
+    indicators: Sequence[str] | None,
+) -> Dict[str, float]:
+    # One pass over the supporting items collects coverage kinds, the deploy signal and time alignment.
+    kinds = set()
     deploy_signal = 0.0
-    for e in used:
-        if e and e.kind in {"deployment", "build"} and e.top_signals:
+    used = 0
+    aligned = 0
+    if incident_time_range:
+        start = incident_time_range.start
+        end = incident_time_range.end
+    for eid in h.supporting_evidence_ids:
+        e = ev.get(eid)
+        if e is None:
+            continue
+        used += 1
+        kinds.add(e.kind)
+        if e.kind in DEPLOY_KINDS and e.top_signals:
             deploy_signal = 0.8
-            break
+        if incident_time_range and e.time_range and e.time_range.start <= end and e.time_range.end >= start:
+            aligned += 1
+
+    coverage_types = kinds.intersection(EVIDENCE_TYPES)
+    coverage = min(1.0, len(coverage_types) / 4.0)  # 4 distinct signal types => full score
 
     specificity = 0.2
     if len(h.statement) >= 80:
@@ -29,27 +57,12 @@ def score_hypothesis(
     elif len(h.statement) >= 40:
         specificity = 0.4
 
-    temporal_alignment = 0.0
-    if incident_time_range and used:
-        start = incident_time_range.start
-        end = incident_time_range.end
-        aligned = 0
-        for e in used:
-            if not e or not e.time_range:
-                continue
-            if e.time_range.start <= end and e.time_range.end >= start:
-                aligned += 1
-        temporal_alignment = aligned / max(1, len(used))
+    temporal_alignment = aligned / used if incident_time_range and used else 0.0
 
     kb_match = 0.0
-    if kb_slice:
-        subject_cfg = (kb_slice or {}).get("subject_cfg", {})
-        failure_modes = subject_cfg.get("known_failure_modes", [])
-        indicators = []
-        for fm in failure_modes:
-            indicators.extend(fm.get("indicators") or [])
+    if indicators is not None:
         stmt = h.statement.lower()
-        if any(ind.lower() in stmt for ind in indicators if isinstance(ind, str)):
+        if any(ind in stmt for ind in indicators):
             kb_match = 1.0
 
     contradiction_penalty = min(0.6, 0.2 * len(h.contradictions))
@@ -79,9 +92,12 @@ def rank(
     incident_time_range: TimeRange | None = None,
     kb_slice: Dict | None = None,
 ) -> List[Hypothesis]:
+    # Evidence lookup and KB indicators are shared by every hypothesis; build them once.
+    ev = {e.id: e for e in evidence}
+    indicators = _kb_indicators(kb_slice)
     out: List[Hypothesis] = []
     for h in hypotheses:
-        breakdown = score_hypothesis(h, evidence, incident_time_range, kb_slice)
+        breakdown = _score(h, ev, incident_time_range, indicators)
         h.score_breakdown = breakdown
         h.confidence = breakdown["total"]
         out.append(h)
@@ -1,26 +1,163 @@
 from __future__ import annotations
+import atexit
+import bisect
+import functools
 import json
+import os
+import queue
+import threading
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class NoopTracer:
     def emit(self, event: Dict[str, Any]) -> None:
         return None
 
+    def flush(self) -> None:
+        return None
+
 
 class JSONLTracer:
-    def __init__(self, path: str):
+    """
+    Appends events to a JSONL file from a background writer thread, so emit() on the request path
+    never waits on file I/O. Events are written in batches; events that arrive while the queue is
+    full, or that fail to serialize or write, are counted in `dropped`. flush() blocks until every
+    queued event has been handled, and runs once more at interpreter exit.
+    """
+    def __init__(self, path: str, max_queue: int = 10_000, batch_size: int = 64):
         self.path = path
+        self.dropped = 0
+        self._max_queue = max_queue
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._writer: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        atexit.register(self.flush)
 
     def emit(self, event: Dict[str, Any]) -> None:
         payload = dict(event)
         payload["timestamp"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(payload) + "\n")
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self._count_dropped(1)
+
+    def flush(self) -> None:
+        if self._writer is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def _count_dropped(self, n: int) -> None:
+        with self._lock:
+            self.dropped += n
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked child inherits the queue but not the writer thread; start over with its own.
+                self._queue = queue.Queue(maxsize=self._max_queue)
+                self._writer = None
+                self._pid = os.getpid()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._drain, name="jsonl-tracer", daemon=True)
+                self._writer.start()
+
+    def _drain(self) -> None:
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            # Tracing must never take the writer (or the caller) down: a bad event or a failed
+            # write is counted, not raised.
+            lines = []
+            for payload in batch:
+                try:
+                    lines.append(json.dumps(payload, default=str) + "\n")
+                except Exception:
+                    self._count_dropped(1)
+            try:
+                if lines:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write("".join(lines))
+            except Exception:
+                self._count_dropped(len(lines))
+            finally:
+                for _ in batch:
+                    q.task_done()
 
 
 def get_tracer(path: Optional[str]) -> NoopTracer | JSONLTracer:
     if not path:
         return NoopTracer()
+    return _jsonl_tracer(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _jsonl_tracer(path: str) -> JSONLTracer:
+    # One tracer (and writer thread) per file, shared by every module that traces to it.
     return JSONLTracer(path)
+
+
+class LatencyHistogram:
+    """
+    In-process latency histogram with fixed buckets and string labels, rendered in the Prometheus
+    text exposition format (served by the API's /metrics endpoint).
+    """
+    DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], seconds: float) -> None:
+        # Per series: one count per bucket (the last one is +Inf), then the running sum.
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += seconds
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in items:
+            base = ",".join(f'{k}="{_escape_label(v)}"' for k, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {int(cumulative)}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {int(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+TOOL_LATENCY = LatencyHistogram(
+    "rca_tool_latency_seconds",
+    "Latency of evidence tool calls (provider round-trips).",
+    ("tool", "subject", "environment", "outcome"),
+)
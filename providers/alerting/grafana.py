@@ -1,9 +1,9 @@
 from __future__ import annotations
 import hashlib
 from typing import Any, Dict, List
-import httpx
 
 from core.models import EvidenceItem, AlertQueryRequest, TimeRange
+from providers.http import PooledClient
 
 class GrafanaAlerting:
     """
@@ -16,6 +16,7 @@ class GrafanaAlerting:
     def __init__(self, provider_id: str, config: Dict[str, Any]):
         self.provider_id = provider_id
         self.config = config
+        self._http = PooledClient(lambda: _auth_headers(self.auth))
         self.base_url = _env_required(config.get("base_url_env"))
         self.auth = config.get("auth", {"kind": "bearer_env"})
         self.alerts_path = config.get("alerts_path") or "/api/alertmanager/grafana/api/v2/alerts"
@@ -61,11 +62,10 @@ class GrafanaAlerting:
             if "=" in expr:
                 k, v = expr.split("=", 1)
                 params.setdefault("filter", []).append(f"{k.strip()}={v.strip()}")
-        headers = _auth_headers(self.auth)
-        with httpx.Client(timeout=20.0, headers=headers) as client:
-            r = client.get(url, params=params)
-            r.raise_for_status()
-            return r.json()
+        client = self._http.get()
+        r = client.get(url, params=params)
+        r.raise_for_status()
+        return r.json()
 
 
 def _extract_alerts(payload: Any) -> List[Dict[str, Any]]:
@@ -2,9 +2,9 @@ from __future__ import annotations
 import hashlib
 from datetime import datetime, timezone
 from typing import Any, Dict, List
-import httpx
 
 from core.models import EvidenceItem, BuildQueryRequest, TimeRange
+from providers.http import PooledClient
 
 GITHUB_API = "https://api.github.com"
 
@@ -20,6 +20,7 @@ class GitHubActionsBuildTracker:
     def __init__(self, provider_id: str, config: Dict[str, Any]):
         self.provider_id = provider_id
         self.config = config
+        self._http = PooledClient(self._headers, timeout=30.0)
         self.token = _env_required(config.get("token_env"))
         self.repo_map = config.get("repo_map", {})
         self.workflow_path_map = config.get("workflow_path_map", {})
@@ -92,10 +93,10 @@ class GitHubActionsBuildTracker:
         owner, repo = repo_full_name.split("/", 1)
         url = f"{GITHUB_API}/repos/{owner}/{repo}/actions/workflows/{workflow_path}/runs"
 
-        with httpx.Client(timeout=20.0, headers=self._headers()) as client:
-            r = client.get(url, params={"per_page": min(50, max(10, limit))})
-            r.raise_for_status()
-            data = r.json()
+        client = self._http.get()
+        r = client.get(url, params={"per_page": min(50, max(10, limit))})
+        r.raise_for_status()
+        data = r.json()
 
         start_dt = datetime.fromisoformat(tr.start.replace("Z", "+00:00"))
         end_dt = datetime.fromisoformat(tr.end.replace("Z", "+00:00"))
@@ -123,10 +124,10 @@ class GitHubActionsBuildTracker:
         owner, repo = repo_full_name.split("/", 1)
         logs_url = f"{GITHUB_API}/repos/{owner}/{repo}/actions/runs/{run_id}/logs"
 
-        with httpx.Client(timeout=30.0, headers=self._headers()) as client:
-            r = client.get(logs_url)
-            r.raise_for_status()
-            zip_bytes = r.content
+        client = self._http.get()
+        r = client.get(logs_url)
+        r.raise_for_status()
+        zip_bytes = r.content
 
         import io
         import re
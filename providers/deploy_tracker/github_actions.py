@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 import httpx
 
 from core.models import EvidenceItem, DeployQueryRequest, TimeRange
+from providers.http import PooledClient
 
 GITHUB_API = "https://api.github.com"
 
@@ -23,6 +24,7 @@ class GitHubActionsDeployTracker:
     def __init__(self, provider_id: str, config: Dict[str, Any]):
         self.provider_id = provider_id
         self.config = config
+        self._http = PooledClient(self._headers, timeout=30.0)
         self.token = _env_required(config.get("token_env"))
 
         self.repo_map = config.get("repo_map", {})
@@ -30,6 +32,37 @@ class GitHubActionsDeployTracker:
         self.markers = config.get("markers", {})
 
     def list_deployments(self, req: DeployQueryRequest) -> EvidenceItem:
+        return self._list_deployments(req, self._http.get())
+
+    def list_deployments_with_metadata(self, req: DeployQueryRequest, enrich_top: int = 1) -> EvidenceItem:
+        """
+        Lists deployment runs and extracts metadata markers for the newest `enrich_top` runs,
+        reusing one connection instead of a separate get_deployment_metadata round-trip.
+        """
+        client = self._http.get()
+        listing = self._list_deployments(req, client)
+        repo = self._resolve_repo(req.subject)
+        refs = listing.top_signals.get("deployment_refs") or []
+        metadata: Dict[str, Dict[str, str]] = {}
+        pointers = list(listing.pointers)
+        for ref in refs[: max(0, enrich_top)]:
+            run_id = int(ref.split(":", 1)[1])
+            try:
+                metadata[ref] = self._extract_markers_from_run_logs(repo, run_id, self.markers, client=client)
+            except (httpx.HTTPError, zipfile.BadZipFile):
+                continue
+            pointers.append({"title": f"Run {run_id}", "url": f"https://github.com/{repo}/actions/runs/{run_id}"})
+
+        if not metadata:
+            return listing
+        return listing.model_copy(update={
+            "summary": f"{listing.summary} Extracted metadata markers for {len(metadata)} run(s).",
+            "top_signals": {**listing.top_signals, "metadata_by_ref": metadata},
+            "pointers": pointers,
+            "tags": [*listing.tags, "metadata"],
+        })
+
+    def _list_deployments(self, req: DeployQueryRequest, client: httpx.Client) -> EvidenceItem:
         repo = self._resolve_repo(req.subject)
         workflow_paths = self._resolve_workflows(req.subject)
         tr = req.time_range
@@ -37,7 +70,7 @@ class GitHubActionsDeployTracker:
 
         runs = []
         for workflow_path in workflow_paths:
-            runs.extend(self._list_runs(repo, workflow_path, tr, limit=req.limit, branch_allowlist=branch_allowlist))
+            runs.extend(self._list_runs(repo, workflow_path, tr, limit=req.limit, branch_allowlist=branch_allowlist, client=client))
 
         # Provide deployment refs as "run:<id>"
         refs = [f"run:{r['run_id']}" for r in runs]
@@ -104,14 +137,15 @@ class GitHubActionsDeployTracker:
             "User-Agent": "sre-rca-agent",
         }
 
-    def _list_runs(self, repo_full_name: str, workflow_path: str, tr: TimeRange, limit: int, branch_allowlist: List[str]) -> List[Dict[str, Any]]:
+    def _list_runs(self, repo_full_name: str, workflow_path: str, tr: TimeRange, limit: int, branch_allowlist: List[str], client: Optional[httpx.Client] = None) -> List[Dict[str, Any]]:
         owner, repo = repo_full_name.split("/", 1)
         url = f"{GITHUB_API}/repos/{owner}/{repo}/actions/workflows/{workflow_path}/runs"
 
-        with httpx.Client(timeout=20.0, headers=self._headers()) as client:
-            r = client.get(url, params={"per_page": min(50, max(10, limit))})
-            r.raise_for_status()
-            data = r.json()
+        if client is None:
+            client = self._http.get()
+        r = client.get(url, params={"per_page": min(50, max(10, limit))})
+        r.raise_for_status()
+        data = r.json()
 
         start_dt = datetime.fromisoformat(tr.start.replace("Z", "+00:00"))
         end_dt = datetime.fromisoformat(tr.end.replace("Z", "+00:00"))
@@ -140,14 +174,15 @@ class GitHubActionsDeployTracker:
         out.sort(key=lambda r: r["created_at"], reverse=True)
         return out[:limit]
 
-    def _extract_markers_from_run_logs(self, repo_full_name: str, run_id: int, markers: Dict[str, str]) -> Dict[str, str]:
+    def _extract_markers_from_run_logs(self, repo_full_name: str, run_id: int, markers: Dict[str, str], client: Optional[httpx.Client] = None) -> Dict[str, str]:
         owner, repo = repo_full_name.split("/", 1)
         logs_url = f"{GITHUB_API}/repos/{owner}/{repo}/actions/runs/{run_id}/logs"
 
-        with httpx.Client(timeout=30.0, headers=self._headers()) as client:
-            r = client.get(logs_url)
-            r.raise_for_status()
-            zip_bytes = r.content
+        if client is None:
+            client = self._http.get()
+        r = client.get(logs_url)
+        r.raise_for_status()
+        zip_bytes = r.content
 
         zf = zipfile.ZipFile(io.BytesIO(zip_bytes))
         texts = []
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Callable, Dict, Optional
+
+import httpx
+
+# HTTP/2 multiplexes concurrent tool calls to one host over a single connection; it needs the optional h2 package.
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class PooledClient:
+    """
+    One keep-alive httpx.Client per provider instance, built on first use and reused for the
+    instance's lifetime (provider instances are shared across incidents by the registry).
+    Headers are resolved lazily so credentials are read when the first request is made.
+    """
+    def __init__(self, headers: Callable[[], Dict[str, str]], timeout: float = 20.0):
+        self._headers = headers
+        self._timeout = timeout
+        self._client: Optional[httpx.Client] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> httpx.Client:
+        client = self._client
+        if client is not None:
+            return client
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                    timeout=self._timeout,
+                    headers=self._headers(),
+                )
+            return self._client
+
+class PooledAsyncClient:
+    """
+    Async counterpart of PooledClient. An httpx.AsyncClient's connections belong to the event
+    loop that opened them, so one client is kept per running loop.
+    """
+    def __init__(self, headers: Callable[[], Dict[str, str]], timeout: float = 20.0):
+        self._headers = headers
+        self._timeout = timeout
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                    timeout=self._timeout,
+                    headers=self._headers(),
+                )
+                self._clients[loop] = client
+            return client
@@ -2,9 +2,9 @@ from __future__ import annotations
 import hashlib
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Tuple
-import httpx
 
 from core.models import EvidenceItem, LogQueryRequest, TimeRange
+from providers.http import PooledClient
 
 class LokiLogStore:
     """
@@ -16,6 +16,7 @@ class LokiLogStore:
     def __init__(self, provider_id: str, config: Dict[str, Any]):
         self.provider_id = provider_id
         self.config = config
+        self._http = PooledClient(self._headers)
         self.base_url = _env_required(config.get("base_url_env"))
         self.auth = config.get("auth", {"kind": "none"})
 
@@ -174,10 +175,10 @@ class LokiLogStore:
             "limit": str(limit),
             "direction": "BACKWARD",
         }
-        with httpx.Client(timeout=20.0, headers=self._headers()) as client:
-            r = client.get(url, params=params)
-            r.raise_for_status()
-            return r.json()
+        client = self._http.get()
+        r = client.get(url, params=params)
+        r.raise_for_status()
+        return r.json()
 
 # ---- helpers ----
 
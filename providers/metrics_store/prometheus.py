@@ -2,10 +2,10 @@ from __future__ import annotations
 import hashlib
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict, List
-import httpx
+from typing import Any, Dict, List, Tuple
 
-from core.models import EvidenceItem, MetricsQueryRequest, TimeRange
+from core.models import EvidenceItem, MetricsQueryRequest
+from providers.http import PooledAsyncClient, PooledClient
 
 class PrometheusMetricsStore:
     """
@@ -17,15 +17,27 @@ class PrometheusMetricsStore:
     def __init__(self, provider_id: str, config: Dict[str, Any]):
         self.provider_id = provider_id
         self.config = config
+        self._http = PooledClient(lambda: _auth_headers(self.auth))
+        self._ahttp = PooledAsyncClient(lambda: _auth_headers(self.auth))
         self.base_url = _env_required(config.get("base_url_env"))
         self.auth = config.get("auth", {"kind": "none"})
 
     def query_range(self, req: MetricsQueryRequest) -> EvidenceItem:
+        url, params = self._query_range_params(req)
+        client = self._http.get()
+        r = client.get(url, params=params)
+        r.raise_for_status()
+        return self._to_evidence(req, r.json())
+
+    async def aquery_range(self, req: MetricsQueryRequest) -> EvidenceItem:
+        url, params = self._query_range_params(req)
+        r = await self._ahttp.get().get(url, params=params)
+        r.raise_for_status()
+        return self._to_evidence(req, r.json())
+
+    def _to_evidence(self, req: MetricsQueryRequest, payload: Dict[str, Any]) -> EvidenceItem:
         tr = req.time_range
         query = req.query
-        step = max(10, int(req.step_seconds))
-
-        payload = self._query_range(query, tr, step)
         result = payload.get("data", {}).get("result", [])
 
         series_count = len(result)
@@ -49,19 +61,15 @@ class PrometheusMetricsStore:
             tags=["metrics"],
         )
 
-    def _query_range(self, query: str, tr: TimeRange, step: int) -> Dict[str, Any]:
+    def _query_range_params(self, req: MetricsQueryRequest) -> Tuple[str, Dict[str, Any]]:
         url = self.base_url.rstrip("/") + "/api/v1/query_range"
         params = {
-            "query": query,
-            "start": _to_unix(tr.start),
-            "end": _to_unix(tr.end),
-            "step": step,
+            "query": req.query,
+            "start": _to_unix(req.time_range.start),
+            "end": _to_unix(req.time_range.end),
+            "step": max(10, int(req.step_seconds)),
         }
-        headers = _auth_headers(self.auth)
-        with httpx.Client(timeout=20.0, headers=headers) as client:
-            r = client.get(url, params=params)
-            r.raise_for_status()
-            return r.json()
+        return url, params
 
 def _to_unix(ts: str) -> float:
     dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import hashlib
 import json
 import os
 import subprocess
@@ -150,6 +151,5 @@ def _parse_time(ts: str) -> datetime:
     return dt
 
 def _evidence_id(prefix: str, content: str) -> str:
-    import hashlib
     h = hashlib.sha1(content.encode("utf-8")).hexdigest()[:10]
     return f"{prefix}_{h}"
@@ -2,9 +2,9 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 import hashlib
-import httpx
 
 from core.models import EvidenceItem, ChangeQueryRequest, TimeRange
+from providers.http import PooledClient
 
 GITHUB_API = "https://api.github.com"
 
@@ -19,6 +19,7 @@ class GitHubVCS:
     def __init__(self, provider_id: str, config: Dict[str, Any]):
         self.provider_id = provider_id
         self.config = config
+        self._http = PooledClient(self._headers)
         self.token = _env_required(config.get("token_env"))
 
         # Optional: map subject -> repo full name
@@ -67,10 +68,10 @@ class GitHubVCS:
         owner, repo = repo_full_name.split("/", 1)
         url = f"{GITHUB_API}/repos/{owner}/{repo}/pulls"
 
-        with httpx.Client(timeout=20.0, headers=self._headers()) as client:
-            r = client.get(url, params={"state": "closed", "per_page": min(limit, 50), "sort": "updated", "direction": "desc"})
-            r.raise_for_status()
-            data = r.json()
+        client = self._http.get()
+        r = client.get(url, params={"state": "closed", "per_page": min(limit, 50), "sort": "updated", "direction": "desc"})
+        r.raise_for_status()
+        data = r.json()
 
         start_dt = datetime.fromisoformat(tr.start.replace("Z", "+00:00"))
         end_dt = datetime.fromisoformat(tr.end.replace("Z", "+00:00"))
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Re-run RCA for a backlog of stored alert webhooks without going through the API.
+
+Input is a JSON array of webhook payloads or one payload per line (JSONL); every alert of a
+grouped payload becomes its own incident. One JSON result per incident is written to stdout,
+in input order. Set OPENAI_MODE=batch to route the LLM calls through the Batch API.
+
+Usage:
+  uv run python scripts/replay_incidents.py webhooks.jsonl
+  uv run python scripts/replay_incidents.py webhooks.json --workers 16 > reports.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+
+def _load_payloads(path: Path) -> List[Dict[str, Any]]:
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main() -> int:
+    from core.orchestrator import RUN_INCIDENTS_CONCURRENCY, normalize_alerts, run_incidents_offline
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", help="JSON array or JSONL file of alert webhook payloads")
+    parser.add_argument("--workers", type=int, default=RUN_INCIDENTS_CONCURRENCY, help="incidents investigated concurrently")
+    args = parser.parse_args()
+
+    incidents = [incident for payload in _load_payloads(Path(args.payloads)) for incident in normalize_alerts(payload)]
+    failed = 0
+    for incident, result in zip(incidents, run_incidents_offline(incidents, max_workers=args.workers)):
+        if isinstance(result, BaseException):
+            failed += 1
+            out: Dict[str, Any] = {"subject": incident.subject, "error": f"{type(result).__name__}: {result}"}
+        else:
+            out = {"subject": incident.subject, "report": result}
+        print(json.dumps(out))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
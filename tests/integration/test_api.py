@@ -10,19 +10,64 @@ def test_health():
     assert resp.json() == {"ok": True}
 
 
+def test_metrics_exposes_tool_latency():
+    from core.tracing import TOOL_LATENCY
+
+    TOOL_LATENCY.observe(("query_metrics", "payments", "prod", "ok"), 0.2)
+    resp = TestClient(app).get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'rca_tool_latency_seconds_count{tool="query_metrics",subject="payments",environment="prod",outcome="ok"}' in resp.text
+
+
 def test_webhook_calls_orchestrator(monkeypatch):
     client = TestClient(app)
 
-    def fake_run(payload):
+    async def fake_arun(payload):
         return {"incident_summary": "ok", "top_hypothesis": {"id": "h1"}}
 
-    monkeypatch.setattr("api.main.run", fake_run)
+    monkeypatch.setattr("api.main.arun", fake_arun)
 
     resp = client.post("/webhook", json={"a": 1})
     assert resp.status_code == 200
     assert resp.json()["incident_summary"] == "ok"
 
 
+def test_webhook_grouped_alerts_return_one_report_per_alert(monkeypatch):
+    from core import orchestrator
+
+    async def fake_arun_incident(incident):
+        if incident.subject == "broken":
+            raise RuntimeError("llm down")
+        return {"incident_summary": incident.subject}
+
+    monkeypatch.setattr(orchestrator, "arun_incident", fake_arun_incident)
+    alert = {"labels": {"environment": "prod"}, "startsAt": "2024-01-01T12:00:00Z"}
+    payload = {
+        "alerts": [
+            {**alert, "labels": {**alert["labels"], "subject": "payments"}},
+            {**alert, "labels": {**alert["labels"], "subject": "broken"}},
+            {**alert, "labels": {**alert["labels"], "subject": "checkout"}},
+        ]
+    }
+
+    resp = TestClient(app).post("/webhook", json=payload)
+    assert resp.status_code == 200
+    assert resp.json() == {
+        "reports": [
+            {"incident_summary": "payments"},
+            {"error": "RuntimeError: llm down"},
+            {"incident_summary": "checkout"},
+        ]
+    }
+
+
+def test_webhook_rejects_malformed_body():
+    client = TestClient(app)
+    assert client.post("/webhook", content=b"{not json").status_code == 400
+    assert client.post("/webhook", content=b"[1, 2]").status_code == 400
+
+
 def test_webhook_incident(monkeypatch):
     client = TestClient(app)
 
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import json
 
+import pytest
+
 from core import orchestrator
 from core.models import EvidenceItem, TimeRange
 
@@ -112,6 +114,11 @@ class FakeChat:
             ]
             return type("Resp", (), {"choices": [Choice("", tool_calls)]})
 
+        if kwargs.get("stream"):
+            delta = type("Delta", (), {"content": self._content})()
+            chunk = type("Chunk", (), {"choices": [type("StreamChoice", (), {"delta": delta})()]})()
+            return iter([chunk])
+
         return type("Resp", (), {"choices": [Choice(self._content, [])]})
 
 
@@ -120,26 +127,86 @@ class FakeClient:
         self.chat = type("Chat", (), {"completions": FakeChat(content)})()
 
 
-def test_orchestrator_run_end_to_end(monkeypatch, kb_path, webhook_payload):
+class AsyncFakeChat:
+    def __init__(self, content: str):
+        self._sync = FakeChat(content)
+
+    async def create(self, **kwargs):
+        resp = self._sync.create(**kwargs)
+        if not kwargs.get("stream"):
+            return resp
+
+        async def chunks():
+            for chunk in resp:
+                yield chunk
+        return chunks()
+
+
+class AsyncFakeClient:
+    def __init__(self, content: str):
+        self.chat = type("Chat", (), {"completions": AsyncFakeChat(content)})()
+
+
+HYPOTHESES = json.dumps({"hypotheses": [{"id": "h1", "statement": "Deploy caused errors", "supporting_evidence_ids": ["deploy_1"], "contradictions": [], "validations": []}]})
+
+
+@pytest.fixture
+def stub_providers(monkeypatch, kb_path):
     monkeypatch.setattr(orchestrator.settings, "kb_path", kb_path)
     monkeypatch.setattr(orchestrator.settings, "catalog_path", kb_path)
 
-    # Stub provider factories
     def _factory(cls):
         def create(provider_id: str, config: dict):
             return cls(provider_id=provider_id, config=config)
         return create
 
-    stub_factories = {
+    monkeypatch.setattr("providers.FACTORIES", {
         "log_store:loki": _factory(StubLogProvider),
         "deploy_tracker:github_actions": _factory(StubDeployProvider),
         "vcs:github": _factory(StubVCSProvider),
-    }
-    monkeypatch.setattr("providers.FACTORIES", stub_factories)
+    })
+
 
-    hypotheses = {"hypotheses": [{"id": "h1", "statement": "Deploy caused errors", "supporting_evidence_ids": ["deploy_1"], "contradictions": [], "validations": []}]}
-    monkeypatch.setattr(orchestrator, "client", FakeClient(json.dumps(hypotheses)))
+def test_orchestrator_run_end_to_end(monkeypatch, stub_providers, webhook_payload):
+    monkeypatch.setattr(orchestrator, "client", FakeClient(HYPOTHESES))
 
     report = orchestrator.run(webhook_payload)
     assert report["top_hypothesis"]["id"] == "h1"
     assert report["evidence"][0]["kind"] == "alert"
+
+
+async def test_orchestrator_arun_matches_run(monkeypatch, stub_providers, webhook_payload):
+    monkeypatch.setattr(orchestrator, "client", FakeClient(HYPOTHESES))
+    monkeypatch.setattr(orchestrator, "aclient", AsyncFakeClient(HYPOTHESES))
+
+    report = await orchestrator.arun(webhook_payload)
+    assert report["top_hypothesis"]["id"] == "h1"
+    assert report == orchestrator.run(webhook_payload)
+
+
+async def test_run_incidents_keeps_order_and_isolates_failures(monkeypatch, stub_providers, webhook_payload):
+    monkeypatch.setattr(orchestrator, "aclient", AsyncFakeClient(HYPOTHESES))
+
+    incident = orchestrator.normalize_many([webhook_payload])[0]
+    unknown = incident.model_copy(update={"subject": "not-in-kb"})
+    results = await orchestrator.run_incidents([incident, unknown, incident], max_concurrency=2)
+
+    assert results[0]["top_hypothesis"]["id"] == "h1"
+    assert isinstance(results[1], ValueError)
+    assert results[2] == results[0]
+
+
+async def test_arun_alerts_runs_one_incident_per_alert(monkeypatch, stub_providers, webhook_payload):
+    monkeypatch.setattr(orchestrator, "aclient", AsyncFakeClient(HYPOTHESES))
+
+    first = webhook_payload["alerts"][0]
+    second = {**first, "labels": {**first["labels"], "subject": "not-in-kb"}}
+    grouped = {**webhook_payload, "alerts": [first, second]}
+
+    incidents = orchestrator.normalize_alerts(grouped)
+    assert [i.subject for i in incidents] == ["payments", "not-in-kb"]
+    assert incidents[1].raw["alerts"] == [second]
+
+    results = await orchestrator.arun_alerts(grouped)
+    assert results[0]["top_hypothesis"]["id"] == "h1"
+    assert isinstance(results[1], ValueError)
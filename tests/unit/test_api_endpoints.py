@@ -56,7 +56,10 @@ def test_api_endpoints_no_persistence(monkeypatch):
 
     monkeypatch.setattr(api, "persistence_enabled", lambda: False)
     api.LAST_REPORT = None
-    monkeypatch.setattr(api, "run", lambda payload: {"ok": True})
+    async def fake_arun(payload):
+        return {"ok": True}
+
+    monkeypatch.setattr(api, "arun", fake_arun)
 
     assert client.get("/health").json() == {"ok": True}
     assert "live_mode" in client.get("/ui/mode").json()
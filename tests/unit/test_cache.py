@@ -0,0 +1,52 @@
+from core.cache import SQLiteTTLCache, TTLCache, request_key
+from core.models import TimeRange
+
+
+def test_ttl_cache_expires_and_evicts(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("core.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None  # least recently used
+    now[0] += 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_request_key_is_canonical():
+    tr = TimeRange(start="s", end="e")
+    assert request_key("m", {"b": 1, "a": 2}, tr) == request_key("m", {"a": 2, "b": 1}, TimeRange(start="s", end="e"))
+    assert request_key("m", tr) != request_key("n", tr)
+
+
+def test_sqlite_ttl_cache_persists_and_expires(monkeypatch, tmp_path):
+    now = [100.0]
+    monkeypatch.setattr("core.cache.time.time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    SQLiteTTLCache(path, ttl_seconds=10).set("k", [["query_logs", {"q": 1}]])
+    reopened = SQLiteTTLCache(path, ttl_seconds=10)
+    assert reopened.get("k") == [["query_logs", {"q": 1}]]
+    now[0] += 11
+    assert reopened.get("k") is None
+
+
+def test_sqlite_ttl_cache_purges_expired_rows_periodically(monkeypatch, tmp_path):
+    import sqlite3
+
+    now = [100.0]
+    monkeypatch.setattr("core.cache.time.time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    cache = SQLiteTTLCache(path, ttl_seconds=10)
+    cache.set("old", 1)
+    now[0] += 11
+    cache.set("new", 2)  # within the purge interval: the expired row stays on disk
+    rows = lambda: sqlite3.connect(path).execute("SELECT key FROM cache ORDER BY key").fetchall()
+    assert rows() == [("new",), ("old",)]
+    now[0] += SQLiteTTLCache.PURGE_INTERVAL_SECONDS
+    cache.set("newer", 3)
+    assert rows() == [("newer",)]
+    indexes = sqlite3.connect(path).execute("SELECT name FROM sqlite_master WHERE type = 'index'").fetchall()
+    assert ("cache_expires_at",) in indexes
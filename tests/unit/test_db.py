@@ -78,3 +78,11 @@ def test_get_db_rollback_on_error(monkeypatch):
 class ErrorSession(DummySession):
     def commit(self):
         raise RuntimeError("commit failed")
+
+
+def test_make_engine_uses_orjson_codec(monkeypatch):
+    pytest.importorskip("orjson")
+    monkeypatch.setattr(settings, "database_url", "sqlite:///:memory:")
+    engine = db._make_engine()
+    assert engine.dialect._json_serializer is db._orjson_dumps
+    assert db._orjson_dumps({1: "a", "b": [1.5]}) == '{"1":"a","b":[1.5]}'
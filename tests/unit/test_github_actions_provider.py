@@ -97,6 +97,46 @@ def test_extract_markers_from_run_logs(monkeypatch):
     assert meta["sha"] == "abc123"
 
 
+def test_list_deployments_with_metadata_reuses_one_client(monkeypatch):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("log.txt", "ENV=prod\nSHA=abc123\n")
+    data = {
+        "workflow_runs": [
+            {"id": 7, "created_at": "2024-01-01T12:00:00Z", "status": "completed", "conclusion": "success", "html_url": "u7", "head_sha": "s7"},
+        ]
+    }
+    responses = {
+        "https://api.github.com/repos/example-org/payments/actions/runs/7/logs": DummyResponse(content=buf.getvalue()),
+        "https://api.github.com/": DummyResponse(json_data=data),
+    }
+    opened = []
+
+    def make_client(**kwargs):
+        opened.append(kwargs)
+        return DummyClient(responses)
+
+    monkeypatch.setattr("providers.deploy_tracker.github_actions.httpx.Client", make_client)
+
+    provider = GitHubActionsDeployTracker(
+        "deploy_main",
+        {
+            "token_env": "DEPLOY_TOKEN",
+            "repo_map": {"payments": "example-org/payments"},
+            "workflow_path_map": {"payments": ".github/workflows/deploy.yml"},
+            "markers": {"environment": "ENV=", "sha": "SHA="},
+        },
+    )
+
+    tr = TimeRange(start="2024-01-01T11:00:00Z", end="2024-01-01T13:00:00Z")
+    req = DeployQueryRequest(subject="payments", environment="prod", time_range=tr, limit=20)
+    ev = provider.list_deployments_with_metadata(req)
+    assert ev.top_signals["deployment_refs"] == ["run:7"]
+    assert ev.top_signals["metadata_by_ref"]["run:7"] == {"environment": "prod", "sha": "abc123"}
+    assert "metadata" in ev.tags
+    assert len(opened) == 1
+
+
 def test_build_list_runs_filters_time_window(monkeypatch):
     now = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
     in_range = now.isoformat().replace("+00:00", "Z")
@@ -110,7 +150,7 @@ def test_build_list_runs_filters_time_window(monkeypatch):
     }
 
     responses = {"https://api.github.com/": DummyResponse(json_data=data)}
-    monkeypatch.setattr("providers.build_tracker.github_actions_builds.httpx.Client", lambda **kwargs: DummyClient(responses))
+    monkeypatch.setattr("providers.http.httpx.Client", lambda **kwargs: DummyClient(responses))
 
     provider = GitHubActionsBuildTracker(
         "build_main",
@@ -135,7 +175,7 @@ def test_build_extract_markers_from_run_logs(monkeypatch):
     zip_bytes = buf.getvalue()
 
     responses = {"https://api.github.com/": DummyResponse(content=zip_bytes)}
-    monkeypatch.setattr("providers.build_tracker.github_actions_builds.httpx.Client", lambda **kwargs: DummyClient(responses))
+    monkeypatch.setattr("providers.http.httpx.Client", lambda **kwargs: DummyClient(responses))
 
     provider = GitHubActionsBuildTracker(
         "build_main",
@@ -40,7 +40,7 @@ def test_merged_prs_filters_by_window(monkeypatch):
         {"number": 2, "title": "Old", "merged_at": out_range, "user": {"login": "bob"}, "html_url": "u2"},
     ]
 
-    monkeypatch.setattr("providers.vcs.github.httpx.Client", lambda **kwargs: DummyClient(data))
+    monkeypatch.setattr("providers.http.httpx.Client", lambda **kwargs: DummyClient(data))
 
     provider = GitHubVCS(
         "vcs_main",
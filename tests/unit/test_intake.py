@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from core import intake
+from core.config import settings
+from core.persistence_models import WebhookIntake
+
+
+class FakeDB:
+    def __init__(self, rows=None):
+        self.rows = rows or {}
+        self.statements = []
+
+    def ctx(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def add(self, row):
+        if getattr(row, "id", None) is None:
+            row.id = f"id-{len(self.rows) + 1}"
+        self.rows[row.id] = row
+
+    def flush(self):
+        return None
+
+    def get(self, _model, _id):
+        return self.rows.get(_id)
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = [row for row in self.rows.values() if row.status in ("queued", "processing")]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(first=lambda: rows[0] if rows else None))
+
+
+def test_enqueue_returns_none_when_persistence_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "enable_persistence", False)
+    assert intake.enqueue({"a": 1}) is None
+    assert intake.start_worker(lambda payload: payload) is None
+
+
+def test_enqueue_stores_payload(monkeypatch):
+    monkeypatch.setattr(settings, "enable_persistence", True)
+    monkeypatch.setattr(settings, "database_url", "postgresql://example.invalid/db")
+    fake = FakeDB()
+    monkeypatch.setattr(intake, "get_db", fake.ctx)
+
+    intake_id = intake.enqueue({"a": 1})
+    assert fake.rows[intake_id].payload == {"a": 1}
+    assert fake.rows[intake_id].status == "queued"
+
+
+def test_process_one_marks_done_and_failed(monkeypatch):
+    calls = []
+    monkeypatch.setattr(intake, "claim_next", lambda: ("i1", {"a": 1}))
+    monkeypatch.setattr(intake, "mark_done", lambda i, result: calls.append(("done", i, result)))
+    monkeypatch.setattr(intake, "mark_failed", lambda i, error: calls.append(("failed", i, error)))
+
+    assert intake.process_one(lambda payload: {"ok": payload["a"]}) is True
+
+    def boom(_payload):
+        raise RuntimeError("llm down")
+
+    assert intake.process_one(boom) is True
+    assert calls == [("done", "i1", {"ok": 1}), ("failed", "i1", "llm down")]
+
+    monkeypatch.setattr(intake, "claim_next", lambda: None)
+    assert intake.process_one(boom) is False
+
+
+def test_mark_failed_backs_off_then_gives_up(monkeypatch):
+    row = WebhookIntake(id="i1", payload={}, status="processing", attempts=1)
+    fake = FakeDB({"i1": row})
+    monkeypatch.setattr(intake, "get_db", fake.ctx)
+
+    intake.mark_failed("i1", "timeout")
+    assert row.status == "queued"
+    assert row.next_attempt_at > intake._utcnow()
+
+    row.attempts = intake.MAX_ATTEMPTS
+    intake.mark_failed("i1", "timeout")
+    assert row.status == "failed"
+    assert row.last_error == "timeout"
+
+
+def test_claim_next_leases_rows_and_reclaims_expired_leases(monkeypatch):
+    row = WebhookIntake(id="i1", payload={"a": 1}, status="queued", attempts=0)
+    fake = FakeDB({"i1": row})
+    monkeypatch.setattr(intake, "get_db", fake.ctx)
+
+    assert intake.claim_next() == ("i1", {"a": 1})
+    assert row.status == "processing" and row.attempts == 1
+    lease = (row.next_attempt_at - intake._utcnow()).total_seconds()
+    assert intake.LEASE_SECONDS - 5 < lease <= intake.LEASE_SECONDS
+    # Rows still "processing" are selected too; next_attempt_at (the lease) decides when.
+    assert "processing" in str(fake.statements[0].compile(compile_kwargs={"literal_binds": True}))
+
+    row.attempts = intake.MAX_ATTEMPTS
+    assert intake.claim_next() is None
+    assert row.status == "failed"
+    assert row.last_error == "lease expired"
+
+
+def test_claim_next_skips_exhausted_leases_in_the_same_call(monkeypatch):
+    dead = WebhookIntake(id="i1", payload={"a": 1}, status="processing", attempts=intake.MAX_ATTEMPTS)
+    queued = WebhookIntake(id="i2", payload={"b": 2}, status="queued", attempts=0)
+    fake = FakeDB({"i1": dead, "i2": queued})
+    monkeypatch.setattr(intake, "get_db", fake.ctx)
+
+    assert intake.claim_next() == ("i2", {"b": 2})
+    assert dead.status == "failed" and dead.last_error == "lease expired"
+    assert queued.status == "processing" and queued.attempts == 1
+
+
+def test_worker_traces_errors_instead_of_swallowing_them(monkeypatch):
+    events = []
+    monkeypatch.setattr(intake, "TRACER", SimpleNamespace(emit=events.append))
+
+    def broken_process_one(_handler):
+        intake._stop.set()
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(intake, "process_one", broken_process_one)
+    try:
+        intake._run_worker(lambda payload: payload)
+    finally:
+        intake._stop.clear()
+    assert events == [{"event": "intake_worker_error", "error": "RuntimeError: db down"}]
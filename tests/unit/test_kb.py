@@ -77,3 +77,15 @@ def test_load_providers_empty(tmp_path: Path):
     path.write_text("providers: []\n")
     with pytest.raises(ValueError):
         KB.load_providers(str(path))
+
+
+def test_kb_load_cached_reloads_on_change(tmp_path: Path):
+    path = tmp_path / "kb.yaml"
+    path.write_text("subjects: []\n")
+    first = KB.load_cached(str(path))
+    assert KB.load_cached(str(path)) is first
+
+    path.write_text("subjects:\n  - name: svc\n    bindings: {}\n")
+    second = KB.load_cached(str(path))
+    assert second is not first
+    assert second.raw["subjects"][0]["name"] == "svc"
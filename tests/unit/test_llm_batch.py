@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.llm_batch import BatchDispatcher
+
+
+class FakeBatchClient:
+    def __init__(self, fail_ids=()):
+        self.uploads = []
+        self.polls = 0
+        self._fail_ids = set(fail_ids)
+        self.files = SimpleNamespace(create=self._upload, content=self._content)
+        self.cancelled = []
+        self.batches = SimpleNamespace(create=self._create, retrieve=self._retrieve, cancel=self.cancelled.append)
+
+    def _upload(self, file, purpose):
+        assert purpose == "batch"
+        self.uploads.append([json.loads(line) for line in file[1].decode("utf-8").splitlines()])
+        return SimpleNamespace(id="file_in")
+
+    def _create(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch_1", status="in_progress")
+
+    def _retrieve(self, batch_id):
+        self.polls += 1
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file_out", error_file_id=None)
+
+    def _content(self, file_id):
+        lines = []
+        for req in self.uploads[-1]:
+            if req["custom_id"] in self._fail_ids:
+                lines.append(json.dumps({"custom_id": req["custom_id"], "response": {"status_code": 400, "body": {"error": "bad"}}}))
+                continue
+            body = {"echo": req["body"]["messages"][0]["content"]}
+            lines.append(json.dumps({"custom_id": req["custom_id"], "response": {"status_code": 200, "body": body}}))
+        return SimpleNamespace(text="\n".join(lines))
+
+
+def test_batch_dispatcher_groups_requests_and_resolves_by_custom_id():
+    fake = FakeBatchClient(fail_ids={"c"})
+    dispatcher = BatchDispatcher(fake, flush_seconds=60, poll_seconds=0)
+
+    futures = {cid: dispatcher.submit(cid, {"messages": [{"role": "user", "content": cid}]}) for cid in ("a", "b", "c")}
+    dispatcher.flush()
+
+    assert len(fake.uploads) == 1
+    assert [r["custom_id"] for r in fake.uploads[0]] == ["a", "b", "c"]
+    assert futures["a"].result(timeout=1) == {"echo": "a"}
+    assert futures["b"].result(timeout=1) == {"echo": "b"}
+    with pytest.raises(RuntimeError):
+        futures["c"].result(timeout=1)
+
+
+def test_batch_dispatcher_flushes_when_full():
+    fake = FakeBatchClient()
+    dispatcher = BatchDispatcher(fake, flush_seconds=60, max_batch=2, poll_seconds=0)
+
+    first = dispatcher.submit("a", {"messages": [{"role": "user", "content": "a"}]})
+    second = dispatcher.submit("b", {"messages": [{"role": "user", "content": "b"}]})
+    assert first.result(timeout=5) == {"echo": "a"}
+    assert second.result(timeout=5) == {"echo": "b"}
+
+
+def test_batch_dispatcher_cancels_jobs_past_max_wait():
+    fake = FakeBatchClient()
+    fake._retrieve = lambda batch_id: SimpleNamespace(id=batch_id, status="in_progress")
+    fake.batches.retrieve = fake._retrieve
+    dispatcher = BatchDispatcher(fake, flush_seconds=60, poll_seconds=0, max_wait_seconds=0)
+
+    future = dispatcher.submit("a", {"messages": [{"role": "user", "content": "a"}]})
+    dispatcher.flush()
+
+    with pytest.raises(TimeoutError):
+        future.result(timeout=1)
+    assert fake.cancelled == ["batch_1"]
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+
 from core import orchestrator
 from core.models import EvidenceItem, TimeRange, IncidentInput, Hypothesis, LogQueryRequest, DeployQueryRequest, BuildQueryRequest, ChangeQueryRequest, MetricsQueryRequest, TraceQueryRequest, AlertQueryRequest, EventQueryRequest, K8sLogQueryRequest
 
@@ -225,7 +230,7 @@ def test_available_tools_and_missing():
     tools = orchestrator._available_tools(subject_cfg)
     assert "query_logs" in tools
     missing = orchestrator._missing_evidence_kinds(tools, [])
-    assert "log" in missing
+    assert missing == ["log", "event", "deployment", "build", "change", "metric", "trace"]
 
 
 def test_fallback_plan():
@@ -285,8 +290,10 @@ def test_derive_helpers():
             tags=[],
         ),
     ]
-    assert orchestrator._derive_what_changed(evidence)["deployments"]
-    assert orchestrator._derive_impact_scope(evidence)["error_signatures"]
+    what_changed, impact = orchestrator._derive_what_changed_and_impact(evidence)
+    assert what_changed["deployments"]
+    assert impact["error_signatures"]
+    assert impact["event_reasons"] == [{"Crash": 1}]
 
 
 def test_format_supporting_evidence():
@@ -330,6 +337,50 @@ def test_maybe_fetch_metadata():
     assert any(e.tags and "metadata" in e.tags for e in evidence)
 
 
+def test_maybe_fetch_metadata_caches_lookups_and_failures():
+    incident = _incident()
+    subject_cfg = {"bindings": {"deploy_tracker": "d", "build_tracker": "b"}}
+    calls = []
+
+    class CountingDeployProvider(DummyDeployProvider):
+        def get_deployment_metadata(self, deployment_ref: str) -> EvidenceItem:
+            calls.append(deployment_ref)
+            return super().get_deployment_metadata(deployment_ref)
+
+    class FailingBuildProvider(DummyBuildProvider):
+        def get_build_metadata(self, build_ref: str) -> EvidenceItem:
+            calls.append(build_ref)
+            raise RuntimeError("tracker down")
+
+    registry = DummyRegistry({"d": CountingDeployProvider(), "b": FailingBuildProvider()})
+    deploys = DummyDeployProvider().list_deployments(DeployQueryRequest(subject="svc", environment="prod", time_range=incident.time_range))
+    builds = DummyBuildProvider().list_builds(BuildQueryRequest(subject="svc", environment="prod", time_range=incident.time_range))
+
+    for _ in range(2):
+        assert len(orchestrator._maybe_fetch_deploy_metadata([deploys], subject_cfg, registry)) == 2
+        assert len(orchestrator._maybe_fetch_build_metadata([builds], subject_cfg, registry)) == 1
+    assert len(calls) == 2
+
+
+def test_fetch_followup_metadata_runs_only_needed_lookups(monkeypatch):
+    incident = _incident()
+    subject_cfg = {"bindings": {"deploy_tracker": "d", "build_tracker": "b"}}
+    registry = DummyRegistry({"d": DummyDeployProvider(), "b": DummyBuildProvider()})
+    deploys = DummyDeployProvider().list_deployments(DeployQueryRequest(subject="svc", environment="prod", time_range=incident.time_range))
+    builds = DummyBuildProvider().list_builds(BuildQueryRequest(subject="svc", environment="prod", time_range=incident.time_range))
+
+    both = orchestrator._fetch_followup_metadata([deploys, builds], subject_cfg, registry)
+    assert [e.kind for e in both[2:]] == ["deployment", "build"]
+
+    def no_threads(*args, **kwargs):
+        raise AssertionError("a single lookup should not start a pool")
+
+    monkeypatch.setattr(orchestrator, "ThreadPoolExecutor", no_threads)
+    one = orchestrator._fetch_followup_metadata([deploys], subject_cfg, registry)
+    assert len(one) == 2 and "metadata" in one[1].tags
+    assert orchestrator._fetch_followup_metadata(both, subject_cfg, registry) == both
+
+
 def test_execute_tool_calls():
     incident = _incident()
     subject_cfg = {
@@ -368,3 +419,311 @@ def test_execute_tool_calls():
     assert orchestrator._execute_tool_call("query_metrics", {"query": "up"}, incident, subject_cfg, registry)
     assert orchestrator._execute_tool_call("query_traces", {}, incident, subject_cfg, registry)
     assert orchestrator._execute_tool_call("unknown", {}, incident, subject_cfg, registry) is None
+
+
+def test_run_tool_calls_keeps_order_and_skips_failures():
+    incident = _incident()
+    subject_cfg = {
+        "bindings": {"log_store": "l", "deploy_tracker": "d", "alerting": "a"},
+        "log_evidence": {"stream_selectors": {}, "parse": {}, "default_filters": {}},
+    }
+
+    class FailingAlerting:
+        def list_alerts(self, req):
+            raise RuntimeError("alerting down")
+
+    registry = DummyRegistry({"l": DummyLogProvider(), "d": DummyDeployProvider(), "a": FailingAlerting()})
+    calls = [("list_deployments", {}), ("list_alerts", {}), ("query_logs", {}), ("unknown", {})]
+    out = orchestrator._run_tool_calls(calls, incident, subject_cfg, registry)
+    assert [e.kind for e in out] == ["deployment", "log"]
+
+
+def test_tool_requests_match_validated_models():
+    incident = _incident()
+    metrics = orchestrator._metrics_request({"query": "rate(x[5m])", "step_seconds": "30"}, incident)
+    assert metrics.model_dump() == MetricsQueryRequest(
+        subject=incident.subject, environment=incident.environment, time_range=incident.time_range, query="rate(x[5m])", step_seconds=30,
+    ).model_dump()
+    traces = orchestrator._traces_request({"service_name": "api", "limit": 5}, incident)
+    assert traces.model_dump() == TraceQueryRequest(
+        subject=incident.subject, environment=incident.environment, time_range=incident.time_range, service_name="api", limit=5,
+    ).model_dump()
+    assert orchestrator._traces_request({}, incident).service_name is None
+    defaults = orchestrator._metrics_request({"query": None, "step_seconds": 0}, incident)
+    assert defaults.query == f'up{{service="{incident.subject}"}}'
+    assert (defaults.step_seconds, defaults.limit) == (60, 50)
+    assert orchestrator._metrics_request({}, incident).query is defaults.query
+
+
+def test_run_tool_calls_skips_calls_past_the_deadline():
+    incident = _incident()
+    release = threading.Event()
+
+    class SlowMetrics(DummyMetricsProvider):
+        def query_range(self, req):
+            release.wait(2)
+            return super().query_range(req)
+
+    subject_cfg = {"bindings": {"metrics_store": "m", "trace_store": "t"}, "tool_timeout_seconds": 0.05}
+    registry = DummyRegistry({"m": SlowMetrics(), "t": DummyTraceProvider()})
+    started = time.monotonic()
+    out = orchestrator._run_tool_calls([("query_metrics", {}), ("query_traces", {})], incident, subject_cfg, registry)
+    release.set()
+    assert [e.id for e in out] == ["trace1"]
+    assert time.monotonic() - started < 1
+
+
+async def test_arun_tool_calls_times_out_slow_async_provider():
+    incident = _incident()
+
+    class SlowAsyncMetrics(DummyMetricsProvider):
+        async def aquery_range(self, req):
+            await asyncio.sleep(2)
+
+    subject_cfg = {"bindings": {"metrics_store": "m", "trace_store": "t"}, "tool_timeout_seconds": 0.05}
+    registry = DummyRegistry({"m": SlowAsyncMetrics(), "t": DummyTraceProvider()})
+    out = await orchestrator._arun_tool_calls([("query_metrics", {}), ("query_traces", {})], incident, subject_cfg, registry)
+    assert [e.id for e in out] == ["trace1"]
+
+
+def test_tool_calls_record_latency_by_outcome(monkeypatch):
+    from core.tracing import LatencyHistogram
+
+    hist = LatencyHistogram("t", "t", ("tool", "subject", "environment", "outcome"))
+    monkeypatch.setattr(orchestrator, "TOOL_LATENCY", hist)
+    incident = _incident()
+
+    class FailingTraces:
+        def search_traces(self, req):
+            raise RuntimeError("traces down")
+
+    subject_cfg = {"bindings": {"metrics_store": "m", "trace_store": "t"}}
+    registry = DummyRegistry({"m": DummyMetricsProvider(), "t": FailingTraces()})
+    orchestrator._run_tool_calls([("query_metrics", {}), ("query_traces", {})], incident, subject_cfg, registry)
+    text = hist.render()
+    assert f't_count{{tool="query_metrics",subject="{incident.subject}",environment="prod",outcome="ok"}} 1' in text
+    assert f't_count{{tool="query_traces",subject="{incident.subject}",environment="prod",outcome="error"}} 1' in text
+
+
+def test_run_tool_calls_records_a_missed_deadline_as_timeout_only(monkeypatch):
+    from core.tracing import LatencyHistogram
+
+    hist = LatencyHistogram("t", "t", ("tool", "subject", "environment", "outcome"))
+    monkeypatch.setattr(orchestrator, "TOOL_LATENCY", hist)
+    incident = _incident()
+    release, finished = threading.Event(), threading.Event()
+
+    class SlowMetrics(DummyMetricsProvider):
+        def query_range(self, req):
+            release.wait(2)
+            try:
+                return super().query_range(req)
+            finally:
+                finished.set()
+
+    subject_cfg = {"bindings": {"metrics_store": "m", "trace_store": "t"}, "tool_timeout_seconds": 0.05}
+    registry = DummyRegistry({"m": SlowMetrics(), "t": DummyTraceProvider()})
+    orchestrator._run_tool_calls([("query_metrics", {}), ("query_traces", {})], incident, subject_cfg, registry)
+    release.set()
+    finished.wait(2)
+    time.sleep(0.05)  # let the late call reach its (skipped) latency record
+    text = hist.render()
+    assert f't_count{{tool="query_metrics",subject="{incident.subject}",environment="prod",outcome="timeout"}} 1' in text
+    assert 'tool="query_metrics",subject="' + incident.subject + '",environment="prod",outcome="ok"' not in text
+    assert f't_count{{tool="query_traces",subject="{incident.subject}",environment="prod",outcome="ok"}} 1' in text
+
+
+def test_observability_snapshot_returns_metrics_and_traces():
+    incident = _incident()
+    subject_cfg = {"bindings": {"metrics_store": "m", "trace_store": "t"}}
+    assert "observability_snapshot" in orchestrator._available_tools(subject_cfg)
+    assert "observability_snapshot" not in orchestrator._available_tools({"bindings": {"metrics_store": "m"}})
+
+    class FailingTraces:
+        def search_traces(self, req):
+            raise RuntimeError("traces down")
+
+    registry = DummyRegistry({"m": DummyMetricsProvider(), "t": DummyTraceProvider()})
+    calls = [("observability_snapshot", {"metrics": {"query": "up"}}), ("query_metrics", {"query": "up"})]
+    out = orchestrator._run_tool_calls(calls, incident, subject_cfg, registry)
+    assert [e.id for e in out] == ["metric1", "trace1", "metric1"]
+
+    registry = DummyRegistry({"m": DummyMetricsProvider(), "t": FailingTraces()})
+    out = orchestrator._run_tool_calls(calls[:1], incident, subject_cfg, registry)
+    assert [e.id for e in out] == ["metric1"]
+
+
+async def test_arun_tool_calls_awaits_async_providers_and_threads_the_rest():
+    incident = _incident()
+    subject_cfg = {"bindings": {"metrics_store": "m", "trace_store": "t", "deploy_tracker": "d"}}
+
+    class AsyncMetricsProvider(DummyMetricsProvider):
+        async def aquery_range(self, req):
+            return self.query_range(req).model_copy(update={"id": "metric_async"})
+
+    class FailingAsyncTraces(DummyTraceProvider):
+        async def asearch_traces(self, req):
+            raise RuntimeError("traces down")
+
+    registry = DummyRegistry({"m": AsyncMetricsProvider(), "t": FailingAsyncTraces(), "d": DummyDeployProvider()})
+    calls = [("query_metrics", {}), ("query_traces", {}), ("list_deployments", {})]
+    out = await orchestrator._arun_tool_calls(calls, incident, subject_cfg, registry)
+    assert [e.id for e in out] == ["metric_async", "deploy1"]
+
+    registry = DummyRegistry({"t": DummyTraceProvider()})
+    out = await orchestrator._arun_tool_calls([("query_traces", {})], incident, {"bindings": {"trace_store": "t"}}, registry)
+    assert [e.id for e in out] == ["trace1"]
+
+    registry = DummyRegistry({"m": AsyncMetricsProvider(), "t": DummyTraceProvider()})
+    out = await orchestrator._arun_tool_calls([("observability_snapshot", {})], incident, subject_cfg, registry)
+    assert [e.id for e in out] == ["metric_async", "trace1"]
+
+
+def test_state_rebuild_helpers_keep_nested_models():
+    incident = _incident()
+    rebuilt = orchestrator._to_incident(incident.model_dump())
+    assert isinstance(rebuilt.time_range, TimeRange)
+    assert rebuilt.model_dump() == incident.model_dump()
+
+    ev = DummyLogProvider().query(LogQueryRequest(subject="svc", environment="prod", time_range=incident.time_range, intent="samples"))
+    rebuilt_ev = orchestrator._to_evidence(ev.model_dump())
+    assert isinstance(rebuilt_ev.time_range, TimeRange)
+    assert rebuilt_ev.model_dump() == ev.model_dump()
+
+
+def test_shift_rfc3339_preserves_format():
+    assert orchestrator._shift_rfc3339("2024-01-01T12:00:00Z", -10) == "2024-01-01T11:50:00Z"
+    assert orchestrator._shift_rfc3339("2024-01-01T12:00:00.250000Z", 5) == "2024-01-01T12:05:00.250000Z"
+    assert orchestrator._shift_rfc3339("2024-01-01T12:00:00", 0) == "2024-01-01T12:00:00Z"
+    assert orchestrator._shift_rfc3339("2024-01-01T12:00:00+02:00", 60) == "2024-01-01T13:00:00+02:00"
+
+
+def test_cap_samples_limits_chars_and_bytes():
+    assert orchestrator._cap_samples(["a"] * 20) == ["a"] * 8
+    out = orchestrator._cap_samples(["x" * 1000] * 10)
+    assert all(len(s) == 400 for s in out)
+    assert len(out) == 5
+
+
+def test_prompt_payload_trimming():
+    signals = {f"k{i}": "v" for i in range(20)}
+    signals["k0"] = "x" * 2000
+    capped = orchestrator._cap_signals(signals)
+    assert len(capped) == 12
+    assert len(capped["k0"]) == 256
+
+    nested = orchestrator._cap_signals({"refs": list(range(10)), "counts": {f"sig{i}": "x" * i for i in range(8)}})
+    assert nested["refs"] == [0, 1, 2, 3, 4]
+    assert set(nested["counts"]) == {"sig3", "sig4", "sig5", "sig6", "sig7"}
+
+    sparse = orchestrator._cap_signals({"rate": 0.123456789, "empty": [], "none": None, "nested": {"p99": 1.23456, "tag": ""}})
+    assert sparse == {"rate": 0.123, "nested": {"p99": 1.235}}
+
+    assert "raw" not in orchestrator._llm_incident({"title": "t", "raw": {"alerts": []}})
+    assert orchestrator._dumps_payload({"a": [1, "é"]}) == '{"a":[1,"é"]}'
+
+
+def test_prompt_context_prefers_precomputed_views():
+    knowledge = {"known_failure_modes": ["kfm"], "runbooks": [], "dependencies": []}
+    state = {
+        "incident": {"title": "t", "raw": {}},
+        "_prompt_incident": {"title": "cached"},
+        "kb_slice": {"subject_cfg": {"known_failure_modes": ["other"]}, "knowledge": knowledge},
+    }
+    assert orchestrator._prompt_context(state) == ({"title": "cached"}, knowledge)
+
+    hand_built = {"incident": {"title": "t", "raw": {}}, "kb_slice": {"subject_cfg": {"dependencies": ["db"]}}}
+    incident, rebuilt = orchestrator._prompt_context(hand_built)
+    assert incident == {"title": "t"}
+    assert rebuilt == {"known_failure_modes": [], "runbooks": [], "dependencies": ["db"]}
+
+
+def test_safe_json_repairs_common_quirks():
+    assert orchestrator._safe_json('{"a": 1}') == {"a": 1}
+    assert orchestrator._safe_json('```json\n{"actions": [{"tool": "query_logs",},],}\n```') == {"actions": [{"tool": "query_logs"}]}
+    assert orchestrator._safe_json("not json") == {}
+
+
+def test_live_models_are_reused_from_state():
+    incident = _incident()
+    ev = DummyLogProvider().query(LogQueryRequest(subject="svc", environment="prod", time_range=incident.time_range, intent="samples"))
+    update = orchestrator._evidence_update([ev])
+
+    state = {"incident": incident.model_dump(), "_incident": incident, **update}
+    assert orchestrator._incident_of(state) is incident
+    assert orchestrator._evidence_of(state)[0] is ev
+
+    # Serialized evidence without matching live models is rebuilt from the dicts.
+    state["evidence"] = state["evidence"] * 2
+    rebuilt = orchestrator._evidence_of(state)
+    assert len(rebuilt) == 2 and rebuilt[0] is not ev
+
+
+def test_tool_call_accumulator_emits_calls_as_they_complete():
+    from types import SimpleNamespace
+
+    def chunk(index, name=None, arguments=None, finish_reason=None):
+        delta = SimpleNamespace(tool_calls=[SimpleNamespace(index=index, function=SimpleNamespace(name=name, arguments=arguments))])
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+    acc = orchestrator._ToolCallAccumulator()
+    assert acc.feed(chunk(0, "query_logs", '{"limit":')) == []
+    assert acc.feed(chunk(0, None, " 5}")) == []
+    assert acc.feed(chunk(1, "list_deployments", "{}")) == [("query_logs", {"limit": 5})]
+    assert acc.feed(chunk(1, None, None, finish_reason="tool_calls")) == [("list_deployments", {})]
+    assert acc.finish() == []
+
+
+def test_tool_schemas_are_shared_per_bindings_profile():
+    a = orchestrator._tool_schemas({"bindings": {"log_store": "loki_a", "vcs": "gh", "runtime": None}})
+    b = orchestrator._tool_schemas({"name": "other", "bindings": {"vcs": "gh_b", "log_store": "loki_b"}})
+    assert a is b
+    assert [t["function"]["name"] for t in a] == ["query_logs", "list_changes"]
+    assert orchestrator._available_tools({"bindings": {"vcs": "gh", "log_store": "l"}}) == ["query_logs", "list_changes"]
+
+
+def test_tool_dispatch_covers_every_tool_schema():
+    bindings = {k: k for k in ("log_store", "runtime", "alerting", "deploy_tracker", "vcs", "build_tracker", "metrics_store", "trace_store")}
+    names = {t["function"]["name"] for t in orchestrator._tool_schemas({"bindings": bindings})}
+    assert names == set(orchestrator._TOOL_DISPATCH)
+
+
+def test_shift_rfc3339_is_memoized():
+    orchestrator._shift_rfc3339.cache_clear()
+    first = orchestrator._shift_rfc3339("2024-01-01T12:00:00Z", -30)
+    assert first == "2024-01-01T11:30:00Z"
+    assert orchestrator._shift_rfc3339("2024-01-01T12:00:00Z", -30) is first
+    assert orchestrator._shift_rfc3339.cache_info().hits == 1
+
+
+def test_parse_rfc3339_prefers_c_parser_and_falls_back(monkeypatch):
+    seen = []
+
+    def c_parser(text):
+        seen.append(text)
+        if "T" not in text:
+            raise ValueError(text)
+        return datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    monkeypatch.setattr(orchestrator, "_c_parse_datetime", c_parser)
+    orchestrator._parse_rfc3339.cache_clear()
+    assert orchestrator._parse_rfc3339("2024-01-01T12:00:00Z") == datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert orchestrator._parse_rfc3339("2024-01-01 13:00:00") == datetime(2024, 1, 1, 13, 0, tzinfo=timezone.utc)
+    assert seen == ["2024-01-01T12:00:00Z", "2024-01-01 13:00:00"]
+    orchestrator._parse_rfc3339.cache_clear()
+
+
+def test_run_tool_calls_runs_identical_calls_once():
+    incident = _incident()
+    subject_cfg = {"bindings": {"log_store": "l"}, "log_evidence": {"stream_selectors": {}, "parse": {}, "default_filters": {}}}
+    queries = []
+
+    class CountingLogProvider(DummyLogProvider):
+        def query(self, req):
+            queries.append(req)
+            return super().query(req)
+
+    registry = DummyRegistry({"l": CountingLogProvider()})
+    calls = [("query_logs", {"intent": "samples"}), ("query_logs", {"intent": "samples"}), ("query_logs", {"intent": "signature_counts"})]
+    assert len(orchestrator._run_tool_calls(calls, incident, subject_cfg, registry)) == 2
+    assert len(queries) == 2
@@ -1,5 +1,9 @@
+from types import SimpleNamespace
+
+import pytest
+
 from core.orchestrator import normalize_incident, seed_alert_evidence, score_and_report, summarize_evidence, _shift_rfc3339
-from core.models import EvidenceItem, TimeRange
+from core.models import EvidenceItem, IncidentInput, TimeRange
 
 
 def test_normalize_incident_time_buffer():
@@ -81,6 +85,15 @@ def test_normalize_incident_skips_when_present():
     assert out["incident"]["subject"] == "payments"
 
 
+def test_run_incident_state_carries_the_callers_model():
+    from core import orchestrator
+
+    incident = orchestrator.normalize_many([{"labels": {"subject": "payments", "environment": "prod"}, "startsAt": "2024-01-01T12:00:00Z"}])[0]
+    state = orchestrator._incident_state(incident)
+    assert state["incident"] == incident.model_dump()
+    assert normalize_incident(state)["_incident"] is incident
+
+
 def test_score_and_report_sets_iteration_flag_for_low_confidence():
     tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
     state = {
@@ -181,6 +194,7 @@ def test_score_and_report_stops_when_confident():
     assert out["iteration"] == 1
     report = out["report"]
     assert any(line.startswith("- [") for line in report["supporting_evidence"])
+    assert report["evidence"] == state["evidence"]
 
 
 def test_summarize_evidence_adds_kb_items():
@@ -212,3 +226,420 @@ def test_summarize_evidence_adds_kb_items():
     graph = next(e for e in out["evidence"] if e["kind"] == "service_graph")["top_signals"]["graph"]
     assert graph["nodes"][0]["id"] == "payments"
     assert graph["edges"][0]["to"] == "postgres"
+
+
+def test_summarize_evidence_returns_only_new_items():
+    tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
+    existing = EvidenceItem(id="e_logs", kind="log", source="s1", time_range=tr, query="q", summary="s")
+    state = {
+        "incident": {
+            "title": "t",
+            "severity": "s",
+            "environment": "prod",
+            "subject": "payments",
+            "time_range": tr.model_dump(),
+            "labels": {},
+            "annotations": {},
+            "raw": {},
+        },
+        "kb_slice": {"subject_cfg": {"name": "payments", "runbooks": [{"title": "rb"}]}},
+        "evidence": [existing.model_dump()],
+    }
+
+    out = summarize_evidence(state)
+    assert [e["kind"] for e in out["evidence"]] == ["runbook"]
+
+
+def test_hypothesize_skips_llm_without_collected_signal(monkeypatch):
+    from core import orchestrator
+
+    tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
+    alert = EvidenceItem(id="alert_0", kind="alert", source="alert_webhook", time_range=tr, query="q", summary="s", top_signals={"labels": {}})
+    empty_logs = EvidenceItem(id="e_logs", kind="log", source="s1", time_range=tr, query="q", summary="s")
+
+    class NoCallClient:
+        @property
+        def chat(self):
+            raise AssertionError("LLM should not be called")
+
+    monkeypatch.setattr(orchestrator, "client", NoCallClient())
+    state = {
+        "incident": {
+            "title": "t",
+            "severity": "s",
+            "environment": "prod",
+            "subject": "payments",
+            "time_range": tr.model_dump(),
+            "labels": {},
+            "annotations": {},
+            "raw": {},
+        },
+        "kb_slice": {"subject_cfg": {}},
+        "evidence": [alert.model_dump(), empty_logs.model_dump()],
+    }
+    assert orchestrator.hypothesize(state)["hypotheses"] == []
+
+
+def test_hypothesize_keeps_last_hypotheses_when_evidence_is_unchanged(monkeypatch):
+    from core import orchestrator
+
+    tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
+    logs = EvidenceItem(id="e_logs", kind="log", source="s1", time_range=tr, query="q", summary="s", samples=["boom"])
+    incident = {"title": "t", "severity": "s", "environment": "prod", "subject": "payments", "time_range": tr.model_dump()}
+    calls = []
+
+    def fake_request(payload, iteration=0):
+        calls.append(payload)
+        return [{"id": "h1", "statement": "s"}]
+
+    monkeypatch.setattr(orchestrator, "_request_hypotheses", fake_request)
+    state = {"incident": incident, "kb_slice": {"subject_cfg": {}}, "evidence": [logs.model_dump()]}
+    state.update(orchestrator.hypothesize(state))
+    assert len(calls) == 1
+
+    assert orchestrator.hypothesize(state) == {}
+    assert len(calls) == 1
+
+
+def test_build_graph_is_compiled_once():
+    from core import orchestrator
+
+    assert orchestrator.build_graph() is orchestrator.GRAPH
+    assert orchestrator.build_graph(async_llm=True) is orchestrator.AGRAPH
+
+
+def test_graph_has_no_checkpointer_when_persistence_is_enabled(monkeypatch):
+    from core import orchestrator
+
+    # Reports are persisted separately; a checkpointer would require a thread_id on every invoke.
+    monkeypatch.setattr(orchestrator.settings, "enable_persistence", True)
+    assert orchestrator._compile_graph(async_llm=False).checkpointer is None
+
+
+def test_reset_after_fork_rebuilds_clients_and_graphs(monkeypatch):
+    from core import orchestrator, registry
+
+    monkeypatch.setattr(registry, "_shared_lock", registry._shared_lock)
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator._LLM_CACHE)
+    monkeypatch.setattr(orchestrator, "_METADATA_CACHE", orchestrator._METADATA_CACHE)
+    graph, sync_client = orchestrator.build_graph(), orchestrator.client
+    llm_cache, metadata_cache = orchestrator._LLM_CACHE, orchestrator._METADATA_CACHE
+    # Simulate a fork taken while another thread held the parent's locks: the reset must not block.
+    held = [registry._shared_lock, orchestrator._graphs_lock, orchestrator._batch_dispatcher_lock, llm_cache._lock]
+    for lock in held:
+        lock.acquire()
+    try:
+        orchestrator._reset_after_fork()
+    finally:
+        for lock in held:
+            lock.release()
+    assert orchestrator.client is not sync_client
+    assert orchestrator._LLM_CACHE is not llm_cache and orchestrator._METADATA_CACHE is not metadata_cache
+    assert registry._shared_lock not in held and registry._shared == {} and registry._shared_last is None
+    assert orchestrator.build_graph() is not graph
+    assert orchestrator.build_graph() is orchestrator.GRAPH
+
+
+async def test_warm_up_swallows_connection_errors(monkeypatch):
+    from core import orchestrator
+
+    class Unreachable:
+        def retrieve(self, model):
+            raise RuntimeError("unreachable")
+
+    class AsyncUnreachable:
+        async def retrieve(self, model):
+            raise RuntimeError("unreachable")
+
+    monkeypatch.setattr(orchestrator, "client", type("C", (), {"models": Unreachable()})())
+    monkeypatch.setattr(orchestrator, "aclient", type("C", (), {"models": AsyncUnreachable()})())
+    await orchestrator.warm_up()
+
+
+def test_collect_evidence_tools_plans_and_collects_in_one_call(monkeypatch):
+    from core import orchestrator
+
+    tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
+    requests = []
+
+    class LogProvider:
+        def query(self, req):
+            return EvidenceItem(id="logs_1", kind="log", source="l", time_range=req.time_range, query="q", summary="s", samples=["x"])
+
+    class Registry:
+        def get(self, provider_id):
+            return LogProvider()
+
+    def chunk(index=None, name=None, arguments=None, finish_reason=None):
+        calls = []
+        if index is not None:
+            calls = [SimpleNamespace(index=index, function=SimpleNamespace(name=name, arguments=arguments))]
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None, tool_calls=calls), finish_reason=finish_reason)])
+
+    class Completions:
+        def create(self, **kwargs):
+            requests.append(kwargs)
+            # Two calls, with arguments split across chunks as the API streams them.
+            return iter([
+                chunk(0, "query_logs", '{"intent": '),
+                chunk(0, None, '"samples"}'),
+                chunk(1, "query_logs", '{"intent": "signature_counts"}'),
+                chunk(finish_reason="tool_calls"),
+            ])
+
+    monkeypatch.setattr(orchestrator, "client", SimpleNamespace(chat=SimpleNamespace(completions=Completions())))
+    state = {
+        "incident": {"title": "t", "severity": "s", "environment": "prod", "subject": "payments", "time_range": tr.model_dump()},
+        "kb_slice": {"subject_cfg": {"bindings": {"log_store": "l"}, "log_evidence": {}}},
+        "_registry": Registry(),
+        "evidence": [],
+    }
+    out = orchestrator.collect_evidence_tools(state)
+    assert [e["id"] for e in out["evidence"]] == ["logs_1", "logs_1"]
+    assert len(requests) == 1
+    assert requests[0]["tool_choice"] == "auto" and requests[0]["stream"] is True
+
+
+def test_stream_tool_calls_stops_reading_at_finish_and_closes(monkeypatch):
+    from core import orchestrator
+
+    tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
+    incident = IncidentInput(title="t", severity="s", environment="prod", subject="payments", time_range=tr)
+
+    class LogProvider:
+        def query(self, req):
+            return EvidenceItem(id="logs_1", kind="log", source="l", time_range=req.time_range, query="q", summary="s", samples=["x"])
+
+    class Registry:
+        def get(self, provider_id):
+            return LogProvider()
+
+    class Stream:
+        closed = False
+
+        def __iter__(self):
+            calls = [SimpleNamespace(index=0, function=SimpleNamespace(name="query_logs", arguments='{"intent": "samples"}'))]
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(tool_calls=calls), finish_reason=None)])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(tool_calls=None), finish_reason="tool_calls")])
+            raise AssertionError("read past the finished choice")
+
+        def close(self):
+            self.closed = True
+
+    stream = Stream()
+    subject_cfg = {"bindings": {"log_store": "l"}, "log_evidence": {}}
+    calls, collected = orchestrator._stream_tool_calls(stream, incident, subject_cfg, Registry())
+    assert [name for name, _ in calls] == ["query_logs"]
+    assert [e.id for e in collected] == ["logs_1"]
+    assert stream.closed
+
+
+def test_llm_cache_reuses_identical_hypothesis_requests(monkeypatch):
+    from core import orchestrator
+
+    calls = []
+
+    class Completions:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            msg = SimpleNamespace(content='{"hypotheses": [{"id": "h1", "statement": "s"}]}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+    monkeypatch.setattr(orchestrator, "client", SimpleNamespace(chat=SimpleNamespace(completions=Completions())))
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator.TTLCache(maxsize=8, ttl_seconds=60))
+
+    payload = {"incident": {"title": "t"}, "evidence": [{"id": "e1"}]}
+    assert orchestrator._request_hypotheses(payload) == orchestrator._request_hypotheses(dict(payload))
+    assert len(calls) == 1
+    orchestrator._request_hypotheses({**payload, "evidence": []})
+    assert len(calls) == 2
+
+
+def test_llm_cache_skips_empty_hypothesis_results(monkeypatch):
+    import asyncio
+
+    from core import orchestrator
+
+    calls = []
+
+    class Completions:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="not json"))])
+
+    class AsyncCompletions:
+        async def create(self, **kwargs):
+            return Completions().create(**kwargs)
+
+    monkeypatch.setattr(orchestrator, "client", SimpleNamespace(chat=SimpleNamespace(completions=Completions())))
+    monkeypatch.setattr(orchestrator, "aclient", SimpleNamespace(chat=SimpleNamespace(completions=AsyncCompletions())))
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_path", None)
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator.TTLCache(maxsize=8, ttl_seconds=60))
+
+    payload = {"incident": {"title": "t"}, "evidence": [{"id": "e1"}]}
+    assert orchestrator._request_hypotheses(payload) == []
+    assert orchestrator._request_hypotheses(payload) == []
+    assert asyncio.run(orchestrator._arequest_hypotheses(payload)) == []
+    assert len(calls) == 3
+    assert len(orchestrator._LLM_CACHE) == 0
+
+
+def test_llm_disk_cache_is_shared_across_memory_caches(monkeypatch, tmp_path):
+    from core import orchestrator
+
+    calls = []
+
+    class Completions:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            msg = SimpleNamespace(content='{"hypotheses": [{"id": "h1", "statement": "s"}]}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+    monkeypatch.setattr(orchestrator, "client", SimpleNamespace(chat=SimpleNamespace(completions=Completions())))
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_path", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(orchestrator, "_LLM_DISK_CACHE", None)
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator.TTLCache(maxsize=8, ttl_seconds=60))
+
+    payload = {"incident": {"title": "t"}, "evidence": [{"id": "e1"}]}
+    first = orchestrator._request_hypotheses(payload)
+    # A fresh in-memory tier stands in for another worker process.
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator.TTLCache(maxsize=8, ttl_seconds=60))
+    assert orchestrator._request_hypotheses(payload) == first
+    assert len(calls) == 1
+
+
+def test_async_llm_cache_reads_disk_tier_off_the_event_loop(monkeypatch, tmp_path):
+    import asyncio
+
+    from core import orchestrator
+
+    calls = []
+
+    class Completions:
+        async def create(self, **kwargs):
+            calls.append(kwargs)
+            msg = SimpleNamespace(content='{"hypotheses": [{"id": "h1", "statement": "s"}]}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+    monkeypatch.setattr(orchestrator, "aclient", SimpleNamespace(chat=SimpleNamespace(completions=Completions())))
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(orchestrator.settings, "llm_cache_path", str(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(orchestrator, "_LLM_DISK_CACHE", None)
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator.TTLCache(maxsize=8, ttl_seconds=60))
+
+    offloaded = []
+    to_thread = asyncio.to_thread
+
+    async def tracking_to_thread(func, *args):
+        offloaded.append(getattr(func, "__name__", func))
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(orchestrator.asyncio, "to_thread", tracking_to_thread)
+    payload = {"incident": {"title": "t"}, "evidence": [{"id": "e1"}]}
+    first = asyncio.run(orchestrator._arequest_hypotheses(payload))
+    monkeypatch.setattr(orchestrator, "_LLM_CACHE", orchestrator.TTLCache(maxsize=8, ttl_seconds=60))
+    assert asyncio.run(orchestrator._arequest_hypotheses(payload)) == first
+    assert len(calls) == 1
+    assert offloaded == ["_llm_disk_lookup", "set", "_llm_disk_lookup"]
+
+
+def test_normalize_many_matches_single_normalization():
+    from core import orchestrator
+
+    payloads = [
+        {"alerts": [{"labels": {"service": "payments", "env": "production", "level": "high"}, "annotations": {"description": "errors"}, "startsAt": "2024-01-01T12:00:00Z"}]},
+        {"labels": {"subject": "", "job": "checkout", "environment": "", "env": "prod"}, "annotations": {}, "startsAt": "2024-01-01T12:00:00Z", "endsAt": "2024-01-01T12:30:00Z"},
+    ]
+    batch = orchestrator.normalize_many(payloads)
+    assert [i.subject for i in batch] == ["payments", "checkout"]
+    assert batch[0].title == "errors" and batch[0].severity == "high"
+    assert batch[1].title == "incident" and batch[1].environment == orchestrator.canonicalize_environment("prod")
+    single = normalize_incident({"raw_webhook": payloads[1]})["incident"]
+    assert single == batch[1].model_dump()
+
+
+def test_parse_webhook_accepts_bytes_and_rejects_non_objects():
+    import pytest
+
+    from core import orchestrator
+
+    assert orchestrator.parse_webhook(b'{"alerts": [], "title": "caf\xc3\xa9"}') == {"alerts": [], "title": "café"}
+    with pytest.raises(ValueError):
+        orchestrator.parse_webhook(b"[]")
+    with pytest.raises(ValueError):
+        orchestrator.parse_webhook(b"{")
+
+
+def test_run_webhook_runs_each_alert_of_a_grouped_payload(monkeypatch):
+    from core import orchestrator
+
+    def fake_run_incident(incident):
+        if incident.subject == "broken":
+            raise RuntimeError("llm down")
+        return {"incident_summary": incident.subject}
+
+    monkeypatch.setattr(orchestrator, "run_incident", fake_run_incident)
+    monkeypatch.setattr(orchestrator, "run", lambda payload: {"incident_summary": "single"})
+    alert = {"labels": {"environment": "prod", "subject": "payments"}, "startsAt": "2024-01-01T12:00:00Z"}
+    broken = {**alert, "labels": {"environment": "prod", "subject": "broken"}}
+
+    assert orchestrator.run_webhook({"alerts": [alert]}) == {"incident_summary": "single"}
+    assert orchestrator.run_webhook({"alerts": [alert, broken]}) == {
+        "reports": [{"incident_summary": "payments"}, {"error": "RuntimeError: llm down"}]
+    }
+    # Every alert failing surfaces as a failure, so the intake worker retries the payload.
+    with pytest.raises(RuntimeError):
+        orchestrator.run_webhook({"alerts": [broken, broken]})
+
+
+def test_batch_mode_applies_only_to_offline_runs(monkeypatch):
+    from core import orchestrator
+
+    modes = []
+    monkeypatch.setattr(orchestrator.settings, "openai_mode", "batch")
+    monkeypatch.setattr(orchestrator, "run_incident", lambda incident: modes.append(orchestrator._batch_mode()) or {})
+    tr = TimeRange(start="2024-01-01T12:00:00Z", end="2024-01-01T12:10:00Z")
+    incident = IncidentInput(title="t", severity="s", environment="prod", subject="payments", time_range=tr)
+
+    assert orchestrator._batch_mode() is False
+    assert orchestrator.run_incidents_offline([incident, incident]) == [{}, {}]
+    assert modes == [True, True]
+
+
+@pytest.mark.parametrize("final_status", ["in_progress", "failed"])
+def test_batch_completion_falls_back_online_only_after_the_batch_ends(monkeypatch, final_status):
+    from core import orchestrator
+
+    calls = []
+
+    def online(**body):
+        calls.append("online")
+        return "online"
+
+    fake = SimpleNamespace(
+        files=SimpleNamespace(create=lambda file, purpose: SimpleNamespace(id="file_in"), content=None),
+        batches=SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(id="batch_1", status="in_progress"),
+            retrieve=lambda batch_id: SimpleNamespace(id=batch_id, status=final_status, output_file_id=None, error_file_id=None),
+            cancel=lambda batch_id: calls.append("cancel"),
+        ),
+        chat=SimpleNamespace(completions=SimpleNamespace(create=online)),
+    )
+    emitted = []
+    monkeypatch.setattr(orchestrator, "client", fake)
+    monkeypatch.setattr(orchestrator, "_batch_dispatcher", None)
+    monkeypatch.setattr(orchestrator, "TRACER", SimpleNamespace(emit=emitted.append))
+    monkeypatch.setattr(orchestrator.settings, "openai_batch_flush_seconds", 0.0)
+    monkeypatch.setattr(orchestrator.settings, "openai_batch_poll_seconds", 0.01)
+    monkeypatch.setattr(orchestrator.settings, "openai_batch_max_wait_seconds", 0.05)
+
+    request = {"model": "m", "messages": [], "stream": True}
+    assert orchestrator._batch_completion("hypothesize", {"subject": "payments"}, 0, request) == "online"
+    # A job still running at the deadline is cancelled before the request goes online; a failed
+    # job has nothing left to cancel.
+    assert calls == (["cancel", "online"] if final_status == "in_progress" else ["online"])
+    expected = "TimeoutError" if final_status == "in_progress" else "RuntimeError"
+    assert [(e["event"], e["error"].split(":")[0]) for e in emitted] == [("batch_fallback", expected)]
@@ -91,6 +91,16 @@ def test_persistence_enabled_and_save_report(monkeypatch):
     monkeypatch.setattr("core.persistence.get_db", fake.ctx)
     incident_id = save_report(incident, report)
     assert incident_id is not None
+    # The incident id is assigned client-side, so the report row can reference it before any flush.
+    assert fake.rows[incident_id].title == "t"
+    assert any(getattr(row, "incident_id", None) == incident_id for row in fake.rows.values())
+    # Child rows go out as one bulk INSERT per table.
+    assert [(table, len(rows)) for table, rows in fake.inserts] == [
+        ("evidence_items", 1),
+        ("hypotheses", 1),
+        ("actions", 1),
+    ]
+    assert fake.inserts[1][1][0]["is_top"] is True
 
     exec_id = create_action_execution(incident_id, "validate", {"k": "v"}, status="pending")
     assert exec_id
@@ -102,6 +112,7 @@ def test_persistence_enabled_and_save_report(monkeypatch):
 class FakeDB:
     def __init__(self):
         self.rows = {}
+        self.inserts = []
 
     def ctx(self):
         return self
@@ -118,6 +129,10 @@ class FakeDB:
         self.rows[row.id] = row
         return None
 
+    def execute(self, stmt, params=None):
+        self.inserts.append((stmt.table.name, params))
+        return None
+
     def flush(self):
         return None
 
@@ -13,6 +13,7 @@ from core.models import (
     DeployQueryRequest,
     ChangeQueryRequest,
     BuildQueryRequest,
+    EvidenceItem,
     TimeRange,
 )
 from providers.log_store.loki import LokiLogStore
@@ -26,6 +27,7 @@ from providers.build_tracker.github_actions_builds import GitHubActionsBuildTrac
 class DummyResponse:
     def __init__(self, payload):
         self._payload = payload
+        self.content = json.dumps(payload).encode("utf-8")
 
     def raise_for_status(self):
         return None
@@ -83,6 +85,23 @@ def test_loki_query_samples(monkeypatch):
     assert len(ev.samples) == 2
 
 
+def test_provider_reuses_pooled_client(monkeypatch):
+    tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
+    req = LogQueryRequest(subject="svc", environment="prod", time_range=tr, intent="samples", stream_selectors={"app": "svc"}, limit=2)
+    opened = []
+
+    def make_client(*args, **kwargs):
+        opened.append(kwargs)
+        return DummyClient({"data": {"result": []}})
+
+    monkeypatch.setattr("httpx.Client", make_client)
+    store = LokiLogStore("loki", {"base_url_env": "LOG_STORE_URL", "auth": {"kind": "none"}})
+    store.query(req)
+    store.query(req)
+    assert len(opened) == 1
+    assert opened[0]["limits"].max_keepalive_connections == 16
+
+
 def test_loki_query_signatures(monkeypatch):
     tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
     req = LogQueryRequest(
@@ -125,6 +144,21 @@ def test_prometheus_query_range(monkeypatch):
     assert ev.kind == "metric"
 
 
+async def test_prometheus_aquery_range_matches_sync(monkeypatch):
+    tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
+    req = MetricsQueryRequest(subject="svc", environment="prod", time_range=tr, query="up")
+    payload = {"data": {"result": [{"metric": {"job": "svc"}, "values": [["1", "1"]]}]}}
+
+    class DummyAsyncClient(DummyClient):
+        async def get(self, url, params=None):
+            return DummyClient.get(self, url, params)
+
+    monkeypatch.setattr("httpx.Client", lambda *args, **kwargs: DummyClient(payload))
+    monkeypatch.setattr("httpx.AsyncClient", lambda *args, **kwargs: DummyAsyncClient(payload))
+    store = PrometheusMetricsStore("m", {"base_url_env": "METRICS_URL", "auth": {"kind": "none"}})
+    assert (await store.aquery_range(req)).model_dump() == store.query_range(req).model_dump()
+
+
 def test_jaeger_search_traces(monkeypatch):
     tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
     req = TraceQueryRequest(subject="svc", environment="prod", time_range=tr)
@@ -135,6 +169,31 @@ def test_jaeger_search_traces(monkeypatch):
     assert ev.samples == ["t1"]
 
 
+def test_jaeger_search_traces_uses_fast_decoder(monkeypatch):
+    tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
+    req = TraceQueryRequest(subject="svc", environment="prod", time_range=tr, limit=1)
+    payload = {"data": [{"traceID": "t1", "spans": [{}]}, {"traceID": "t2"}]}
+    decoded = []
+    monkeypatch.setattr("providers.trace_store.jaeger._fast_json_loads", lambda raw: decoded.append(raw) or json.loads(raw))
+    monkeypatch.setattr("httpx.Client", lambda *args, **kwargs: DummyClient(payload))
+    store = JaegerTraceStore("t", {"base_url_env": "TRACE_URL", "auth": {"kind": "none"}})
+    ev = store.search_traces(req)
+    assert len(decoded) == 1
+    assert ev.samples == ["t1", "t2"]
+    assert ev.top_signals == {"trace_ids": ["t1"]}
+
+
+def test_jaeger_search_traces_coerces_trace_ids_to_str(monkeypatch):
+    tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
+    req = TraceQueryRequest(subject="svc", environment="prod", time_range=tr)
+    payload = {"data": [{"traceID": 12345}, {"traceID": ""}, {"spans": []}]}
+    monkeypatch.setattr("httpx.Client", lambda *args, **kwargs: DummyClient(payload))
+    store = JaegerTraceStore("t", {"base_url_env": "TRACE_URL", "auth": {"kind": "none"}})
+    ev = store.search_traces(req)
+    assert ev.samples == ["12345"]
+    assert EvidenceItem.model_validate(ev.model_dump()) == ev
+
+
 def test_github_vcs_list_changes(monkeypatch):
     tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
     req = ChangeQueryRequest(subject="svc", environment="prod", time_range=tr)
@@ -1,6 +1,10 @@
+import asyncio
+import threading
+import time
+
 import pytest
 
-from core.registry import ProviderRegistry
+from core.registry import CoalescingProvider, LimitedProvider, ProviderRegistry, RateLimiter, clear_shared_registries, shared_registry
 
 
 def test_registry_gets_instance():
@@ -39,3 +43,213 @@ def test_registry_missing_factory():
     )
     with pytest.raises(KeyError):
         reg.get("p1")
+
+
+def test_registry_wraps_provider_with_cache_when_configured():
+    calls = []
+
+    class Provider:
+        provider_id = "p1"
+
+        def query(self, req):
+            calls.append(req)
+            return {"req": req}
+
+    instances = {
+        "p1": {"id": "p1", "category": "log_store", "type": "loki", "cache_ttl_seconds": 30},
+    }
+    reg = ProviderRegistry(factories={"log_store:loki": lambda provider_id, config: Provider()}, instances_config=instances)
+    inst = reg.get("p1")
+    assert inst.provider_id == "p1"
+    assert inst.query({"q": 1}) == inst.query({"q": 1})
+    inst.query({"q": 2})
+    assert calls == [{"q": 1}, {"q": 2}]
+
+
+def test_shared_registry_reused_per_catalog_and_factories():
+    clear_shared_registries()
+    factories = {"log_store:loki": lambda provider_id, config: object()}
+    instances = {"p1": {"id": "p1", "category": "log_store", "type": "loki", "config": {}}}
+
+    reg = shared_registry(factories, instances)
+    assert shared_registry(factories, dict(instances)) is reg
+    assert shared_registry(dict(factories), instances) is not reg
+    assert shared_registry(factories, {"p2": {**instances["p1"], "id": "p2"}}) is not reg
+
+
+def test_shared_registry_skips_hashing_for_the_same_catalog_object(monkeypatch):
+    clear_shared_registries()
+    factories = {"log_store:loki": lambda provider_id, config: object()}
+    instances = {"p1": {"id": "p1", "category": "log_store", "type": "loki", "config": {}}}
+    reg = shared_registry(factories, instances)
+
+    def no_hash(*parts):
+        raise AssertionError("catalog hashed again")
+
+    monkeypatch.setattr("core.registry.request_key", no_hash)
+    assert shared_registry(factories, instances) is reg
+
+
+def test_registry_bounds_provider_concurrency():
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    class Provider:
+        def query(self, req):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return req
+
+    instances = {"p1": {"id": "p1", "category": "log_store", "type": "loki", "max_concurrency": 2}}
+    reg = ProviderRegistry(factories={"log_store:loki": lambda provider_id, config: Provider()}, instances_config=instances)
+    inst = reg.get("p1")
+    threads = [threading.Thread(target=inst.query, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert state["peak"] == 2
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate_per_second=50)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    # First call uses the initial token; the next three wait ~20ms each.
+    assert time.monotonic() - started >= 0.05
+
+
+async def test_registry_limits_and_caches_async_provider_methods():
+    state = {"active": 0, "peak": 0, "calls": 0}
+
+    class Provider:
+        async def aquery(self, req):
+            state["calls"] += 1
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return {"req": req}
+
+    instances = {"p1": {"id": "p1", "category": "log_store", "type": "loki", "max_concurrency": 2, "cache_ttl_seconds": 30}}
+    reg = ProviderRegistry(factories={"log_store:loki": lambda provider_id, config: Provider()}, instances_config=instances)
+    inst = reg.get("p1")
+    out = await asyncio.gather(*(inst.aquery(i) for i in range(5)))
+    assert out == [{"req": i} for i in range(5)]
+    assert state["peak"] == 2
+    assert await inst.aquery(0) == {"req": 0}
+    assert state["calls"] == 5
+
+
+def test_registry_coalesces_identical_inflight_calls():
+    calls = []
+    release = threading.Event()
+
+    class Provider:
+        def query(self, req):
+            calls.append(req)
+            release.wait(1)
+            return {"req": req}
+
+    instances = {"p1": {"id": "p1", "category": "log_store", "type": "loki", "coalesce_inflight": True}}
+    reg = ProviderRegistry(factories={"log_store:loki": lambda provider_id, config: Provider()}, instances_config=instances)
+    inst = reg.get("p1")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(inst.query({"q": 1}))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert calls == [{"q": 1}]
+    assert results == [{"req": {"q": 1}}] * 4
+    inst.query({"q": 1})
+    assert len(calls) == 2
+
+
+async def test_registry_coalesces_identical_inflight_async_calls():
+    calls = []
+
+    class Provider:
+        async def aquery(self, req):
+            calls.append(req)
+            await asyncio.sleep(0.01)
+            if req == "bad":
+                raise RuntimeError("backend down")
+            return {"req": req}
+
+    instances = {"p1": {"id": "p1", "category": "log_store", "type": "loki", "coalesce_inflight": True}}
+    reg = ProviderRegistry(factories={"log_store:loki": lambda provider_id, config: Provider()}, instances_config=instances)
+    inst = reg.get("p1")
+    out = await asyncio.gather(inst.aquery("a"), inst.aquery("a"), inst.aquery("b"), inst.aquery("bad"), inst.aquery("bad"), return_exceptions=True)
+    assert out[:3] == [{"req": "a"}, {"req": "a"}, {"req": "b"}]
+    assert all(isinstance(e, RuntimeError) for e in out[3:])
+    assert calls == ["a", "b", "bad"]
+
+
+def test_registry_caches_metrics_and_traces_by_default():
+    calls = []
+
+    class Provider:
+        def query_range(self, req):
+            calls.append(req)
+            return {"req": req}
+
+    factories = {f"{c}:x": (lambda provider_id, config: Provider()) for c in ("metrics_store", "log_store")}
+    instances = {
+        "m": {"id": "m", "category": "metrics_store", "type": "x"},
+        "m_off": {"id": "m_off", "category": "metrics_store", "type": "x", "cache_ttl_seconds": 0},
+        "l": {"id": "l", "category": "log_store", "type": "x"},
+    }
+    reg = ProviderRegistry(factories=factories, instances_config=instances)
+    for pid in ("m", "m_off", "l"):
+        reg.get(pid).query_range({"q": pid})
+        reg.get(pid).query_range({"q": pid})
+    assert calls == [{"q": "m"}, {"q": "m_off"}, {"q": "m_off"}, {"q": "l"}, {"q": "l"}]
+
+
+def test_wrapped_methods_are_built_once_per_instance():
+    class Provider:
+        def query(self, req):
+            return {"req": req}
+
+    limited = LimitedProvider(CoalescingProvider(Provider()), max_concurrency=2)
+    first = limited.query
+    assert limited.query is first
+    assert first("a") == {"req": "a"}
+
+
+def test_registry_coalesces_metrics_by_default():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    class Provider:
+        def query_range(self, req):
+            calls.append(req)
+            started.set()
+            release.wait(5)
+            return {"req": req}
+
+    factories = {"metrics_store:x": lambda provider_id, config: Provider()}
+    instances = {"m": {"id": "m", "category": "metrics_store", "type": "x", "cache_ttl_seconds": 0}}
+    provider = ProviderRegistry(factories=factories, instances_config=instances).get("m")
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(provider.query_range({"q": 1})))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=lambda: results.append(provider.query_range({"q": 1})))
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert calls == [{"q": 1}]
+    assert results == [{"req": {"q": 1}}, {"req": {"q": 1}}]
@@ -73,3 +73,17 @@ def test_rank_sorts_by_confidence():
     tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
     ranked = rank([h1, h2], evidence, tr, {"subject_cfg": {}})
     assert ranked[0].id == "h2"
+
+
+def test_rank_matches_per_hypothesis_scores_with_kb_indicators():
+    evidence = [_evidence("e1", "log"), _evidence("e2", "deployment")]
+    tr = TimeRange(start="2024-01-01T00:00:00Z", end="2024-01-01T00:10:00Z")
+    kb_slice = {"subject_cfg": {"known_failure_modes": [{"indicators": ["Connection Pool", 7]}]}}
+    hyps = [
+        Hypothesis(id=f"h{i}", statement=stmt, confidence=0.0, score_breakdown={}, supporting_evidence_ids=ids, contradictions=[], validations=[])
+        for i, (stmt, ids) in enumerate([("connection pool exhausted after deploy", ["e1", "e2"]), ("unrelated", ["e1"])])
+    ]
+    expected = {h.id: score_hypothesis(h, evidence, tr, kb_slice) for h in hyps}
+    ranked = rank(hyps, evidence, tr, kb_slice)
+    assert {h.id: h.score_breakdown for h in ranked} == expected
+    assert ranked[0].score_breakdown["kb_match"] == 1.0
@@ -71,3 +71,30 @@ class DummyDB:
 
     def delete(self):
         return None
+
+
+def test_replay_incidents(tmp_path: Path, monkeypatch, capsys):
+    import json
+
+    from core import orchestrator
+
+    alert = {"labels": {"environment": "prod"}, "startsAt": "2024-01-01T12:00:00Z"}
+    grouped = {"alerts": [{**alert, "labels": {**alert["labels"], "subject": s}} for s in ("payments", "checkout")]}
+    path = tmp_path / "webhooks.jsonl"
+    path.write_text(json.dumps(grouped) + "\n")
+
+    def fake_offline(incidents, max_workers):
+        assert max_workers == 3
+        return [{"incident_summary": incidents[0].subject}, RuntimeError("llm down")]
+
+    monkeypatch.setattr(orchestrator, "run_incidents_offline", fake_offline)
+    monkeypatch.setattr("sys.argv", ["replay_incidents", str(path), "--workers", "3"])
+    with pytest.raises(SystemExit) as exit_info:
+        runpy.run_module("scripts.replay_incidents", run_name="__main__")
+
+    assert exit_info.value.code == 1
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines == [
+        {"subject": "payments", "report": {"incident_summary": "payments"}},
+        {"subject": "checkout", "error": "RuntimeError: llm down"},
+    ]
@@ -1,4 +1,6 @@
-from core.tracing import get_tracer, JSONLTracer
+import json
+
+from core.tracing import get_tracer, JSONLTracer, LatencyHistogram
 
 
 def test_tracer_noop_when_no_path(tmp_path):
@@ -12,7 +14,50 @@ def test_tracer_writes_jsonl(tmp_path):
     tracer = get_tracer(str(path))
     assert isinstance(tracer, JSONLTracer)
     tracer.emit({"event": "test", "value": 123})
+    tracer.flush()
 
     data = path.read_text().strip()
     assert '"event": "test"' in data
     assert '"value": 123' in data
+
+
+def test_latency_histogram_renders_cumulative_buckets():
+    hist = LatencyHistogram("tool_latency_seconds", "Tool latency.", ("tool", "outcome"), buckets=(0.1, 1.0))
+    hist.observe(("query_metrics", "ok"), 0.05)
+    hist.observe(("query_metrics", "ok"), 0.5)
+    hist.observe(("query_metrics", "ok"), 5.0)
+
+    text = hist.render()
+    assert '# TYPE tool_latency_seconds histogram' in text
+    assert 'tool_latency_seconds_bucket{tool="query_metrics",outcome="ok",le="0.1"} 1' in text
+    assert 'tool_latency_seconds_bucket{tool="query_metrics",outcome="ok",le="1.0"} 2' in text
+    assert 'tool_latency_seconds_bucket{tool="query_metrics",outcome="ok",le="+Inf"} 3' in text
+    assert 'tool_latency_seconds_count{tool="query_metrics",outcome="ok"} 3' in text
+
+
+def test_tracer_batches_events_and_counts_drops(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = JSONLTracer(str(path), max_queue=1000, batch_size=8)
+    for i in range(100):
+        tracer.emit({"event": "e", "i": i})
+    tracer.flush()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) + tracer.dropped == 100
+    assert [json.loads(line)["i"] for line in lines] == list(range(100))
+
+
+def test_tracer_drops_only_the_events_that_fail(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracer = JSONLTracer(str(path))
+    circular: dict = {}
+    circular["self"] = circular
+    tracer.emit({"event": "before"})
+    tracer.emit({"event": "bad", "value": circular})
+    tracer.emit({"event": "path", "value": tmp_path})
+    tracer.flush()
+
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [e["event"] for e in events] == ["before", "path"]
+    assert events[1]["value"] == str(tmp_path)
+    assert tracer.dropped == 1